@@ -0,0 +1 @@
+# Offline ingestion benchmarks
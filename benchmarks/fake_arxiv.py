@@ -0,0 +1,98 @@
+"""Local stand-in for the arXiv API: synthetic Atom feeds plus PDFs of a configured size."""
+
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def synthetic_pdf(size: int, pages: int = 1) -> bytes:
+    """A PDF of roughly ``size`` bytes; real text pages when PyMuPDF is installed."""
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        body = b"%PDF-1.4\n"
+    else:
+        doc = fitz.open()
+        for number in range(max(pages, 1)):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Synthetic benchmark page {number}\n" * 20)
+        body = doc.tobytes()
+        doc.close()
+    if len(body) < size:
+        # Trailing bytes after %%EOF are ignored by PDF readers.
+        body += b"\n%" + b"0" * (size - len(body) - 2)
+    return body
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeArxivServer"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == "/api/query":
+            query = parse_qs(url.query)
+            start = int(query.get("start", ["0"])[0])
+            size = int(query.get("max_results", ["10"])[0])
+            self._send(self.server.feed(start, size), "application/atom+xml")
+        elif url.path.startswith("/pdf/"):
+            self._send(self.server.pdf, "application/pdf")
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+
+class FakeArxivServer(ThreadingHTTPServer):
+    """Serves ``papers`` entries newest-first; every PDF link returns the same document."""
+
+    daemon_threads = True
+
+    def __init__(self, papers: int, pdf_size: int, pdf_pages: int = 1) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.papers = papers
+        self.pdf = synthetic_pdf(pdf_size, pdf_pages)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def query_url(self) -> str:
+        """A drop-in for ``ArxivDownloader.BASE_URL``."""
+        return self.base_url + "/api/query?search_query=cat:{}&start={}&max_results={}"
+
+    def feed(self, start: int, size: int) -> bytes:
+        entries = []
+        for position in range(start, min(start + size, self.papers)):
+            number = self.papers - 1 - position
+            entries.append(
+                f"<entry><id>{self.base_url}/abs/2401.{number:05d}v1</id>"
+                f"<updated>2024-01-01T{number // 3600 % 24:02d}:{number // 60 % 60:02d}:"
+                f"{number % 60:02d}Z</updated><title>Synthetic paper {number}</title></entry>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom">' + "".join(entries) + "</feed>"
+        ).encode()
+
+    def start(self) -> "FakeArxivServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,75 @@
+"""A ``KaggleClient`` stand-in that synthesises datasets locally instead of calling Kaggle."""
+
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+from typing import List, Sequence
+
+BLOCK = bytes(range(256)) * 4096  # 1 MiB of non-constant filler
+
+
+def _write_file(path: Path, size: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as fp:
+        remaining = size
+        while remaining:
+            chunk = BLOCK[: min(remaining, len(BLOCK))]
+            fp.write(chunk)
+            remaining -= len(chunk)
+
+
+class FakeKaggleClient:
+    """Produces ``files`` files of ``file_size`` bytes named ``part-NNNNN.csv``."""
+
+    def __init__(self, files: int, file_size: int) -> None:
+        self.files = files
+        self.file_size = file_size
+
+    def file_names(self) -> List[str]:
+        return [f"part-{number:05d}.csv" for number in range(self.files)]
+
+    def download_dataset(
+        self,
+        owner_slug: str,
+        dataset_slug: str,
+        destination: Path,
+        file_names: Sequence[str] | None = None,
+        force: bool = False,
+    ) -> List[Path]:
+        destination = Path(destination)
+        paths = []
+        for name in file_names or self.file_names():
+            path = destination / name
+            _write_file(path, self.file_size)
+            paths.append(path)
+        return paths
+
+    def download_files(
+        self,
+        owner_slug: str,
+        dataset_slug: str,
+        destination: Path,
+        file_names: Sequence[str],
+        force: bool = False,
+    ) -> List[Path]:
+        return self.download_dataset(owner_slug, dataset_slug, destination, file_names, force)
+
+    def download_archive(
+        self,
+        owner_slug: str,
+        dataset_slug: str,
+        destination: Path,
+        force: bool = False,
+    ) -> Path:
+        archive = Path(destination) / f"{dataset_slug}.zip"
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            for name in self.file_names():
+                with zf.open(name, "w", force_zip64=True) as member:
+                    remaining = self.file_size
+                    while remaining:
+                        chunk = BLOCK[: min(remaining, len(BLOCK))]
+                        member.write(chunk)
+                        remaining -= len(chunk)
+        return archive
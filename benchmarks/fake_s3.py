@@ -0,0 +1,399 @@
+"""Minimal S3-compatible object store on the standard library, for offline benchmarks.
+
+It implements what the MinIO SDK and the S3 syncer need: bucket create/head/location, object
+put/head/get (with ``Range``), listing, delete, multipart uploads, and server-side copies
+(``CopyObject`` and ``UploadPartCopy``, with ``If-Match`` preconditions). Authentication is not
+checked. Objects are written to a scratch directory so large datasets do not sit in memory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import shutil
+import threading
+import time
+import uuid
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlparse
+from xml.sax.saxutils import escape
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class _Store:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.uploads = root / ".uploads"
+        self.uploads.mkdir(parents=True, exist_ok=True)
+        # (bucket, key) -> (size, etag, content_type, mtime)
+        self.objects: Dict[Tuple[str, str], Tuple[int, str, str, float]] = {}
+        self.buckets: set = set()
+        self.lock = threading.Lock()
+
+    def path(self, bucket: str, key: str) -> Path:
+        return self.root / bucket / quote(key, safe="")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, each response waits on a
+    # delayed ACK.
+    disable_nagle_algorithm = True
+    server: "FakeS3Server"
+
+    def log_message(self, *args) -> None:  # keep benchmark output clean
+        pass
+
+    # -- helpers ---------------------------------------------------------------------------
+
+    def _route(self) -> Tuple[str, str, Dict[str, list]]:
+        url = urlparse(self.path)
+        parts = unquote(url.path).lstrip("/").split("/", 1)
+        bucket = parts[0]
+        key = parts[1] if len(parts) > 1 else ""
+        return bucket, key, parse_qs(url.query, keep_blank_values=True)
+
+    def _send(self, status: int, body: bytes = b"", headers: Dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _xml(self, status: int, body: str) -> None:
+        payload = ('<?xml version="1.0" encoding="UTF-8"?>' + body).encode()
+        self._send(status, payload, {"Content-Type": "application/xml"})
+
+    def _error(self, status: int, code: str) -> None:
+        self._xml(
+            status,
+            f"<Error><Code>{code}</Code><Message>{code}</Message>"
+            f"<Resource>{escape(self.path)}</Resource><RequestId>0</RequestId>"
+            f"<HostId>fake-s3</HostId></Error>",
+        )
+
+    def _receive(self, target: Path) -> Tuple[int, str]:
+        remaining = int(self.headers.get("Content-Length") or 0)
+        digest = hashlib.md5()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "wb") as fp:
+            while remaining:
+                chunk = self.rfile.read(min(remaining, CHUNK_SIZE))
+                if not chunk:
+                    break
+                fp.write(chunk)
+                digest.update(chunk)
+                remaining -= len(chunk)
+        return target.stat().st_size, digest.hexdigest()
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _copy(self, target: Path) -> Tuple[int, str] | None:
+        """Copy the ``x-amz-copy-source`` object (or its range) to ``target``.
+
+        Sends the error and returns None when the source is missing or fails its precondition.
+        """
+        self._read_body()
+        store = self.server.store
+        source = unquote(self.headers["x-amz-copy-source"].split("?", 1)[0]).lstrip("/")
+        bucket, _, key = source.partition("/")
+        meta = store.objects.get((bucket, key))
+        if meta is None:
+            self._error(404, "NoSuchKey")
+            return None
+        expected = self.headers.get("x-amz-copy-source-if-match")
+        if expected and expected.strip('"') != meta[1]:
+            self._error(412, "PreconditionFailed")
+            return None
+        start, stop = 0, meta[0]
+        match = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("x-amz-copy-source-range") or "")
+        if match:
+            start, stop = int(match.group(1)), int(match.group(2)) + 1
+        digest = hashlib.md5()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(store.path(bucket, key), "rb") as source_fp, open(target, "wb") as sink:
+            source_fp.seek(start)
+            remaining = stop - start
+            while remaining:
+                chunk = source_fp.read(min(remaining, CHUNK_SIZE))
+                if not chunk:
+                    break
+                sink.write(chunk)
+                digest.update(chunk)
+                remaining -= len(chunk)
+        return target.stat().st_size, digest.hexdigest()
+
+    # -- verbs -----------------------------------------------------------------------------
+
+    def do_HEAD(self) -> None:
+        bucket, key, _ = self._route()
+        store = self.server.store
+        if not key:
+            self._send(200 if bucket in store.buckets else 404)
+            return
+        meta = store.objects.get((bucket, key))
+        if meta is None:
+            self._send(404)
+            return
+        size, etag, content_type, mtime = meta
+        self.send_response(200)
+        self.send_header("Content-Length", str(size))
+        self.send_header("ETag", f'"{etag}"')
+        self.send_header("Content-Type", content_type)
+        self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        bucket, key, query = self._route()
+        store = self.server.store
+        if not bucket:
+            names = "".join(
+                f"<Bucket><Name>{name}</Name><CreationDate>2024-01-01T00:00:00.000Z"
+                f"</CreationDate></Bucket>"
+                for name in sorted(store.buckets)
+            )
+            self._xml(
+                200, f"<ListAllMyBucketsResult><Buckets>{names}</Buckets></ListAllMyBucketsResult>"
+            )
+            return
+        if bucket not in store.buckets:
+            self._error(404, "NoSuchBucket")
+            return
+        if not key and "location" in query:
+            self._xml(200, "<LocationConstraint>us-east-1</LocationConstraint>")
+            return
+        if not key:
+            self._list(bucket, query)
+            return
+        meta = store.objects.get((bucket, key))
+        if meta is None:
+            self._error(404, "NoSuchKey")
+            return
+        size, etag, content_type, mtime = meta
+        expected = self.headers.get("If-Match")
+        if expected and expected.strip('"') != etag:
+            self._error(412, "PreconditionFailed")
+            return
+        start, stop, status = 0, size, 200
+        match = re.match(r"bytes=(\d*)-(\d*)", self.headers.get("Range") or "")
+        if match:
+            first, last = match.groups()
+            if first:
+                start, stop = int(first), (int(last) + 1 if last else size)
+            else:
+                start, stop = max(size - int(last), 0), size
+            stop, status = min(stop, size), 206
+        self.send_response(status)
+        self.send_header("Content-Length", str(stop - start))
+        self.send_header("ETag", f'"{etag}"')
+        self.send_header("Content-Type", content_type)
+        self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{stop - 1}/{size}")
+        self.end_headers()
+        with open(store.path(bucket, key), "rb") as fp:
+            fp.seek(start)
+            remaining = stop - start
+            while remaining:
+                chunk = fp.read(min(remaining, CHUNK_SIZE))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def _list(self, bucket: str, query: Dict[str, list]) -> None:
+        prefix = query.get("prefix", [""])[0]
+        start_after = query.get("start-after", query.get("continuation-token", [""]))[0]
+        max_keys = int(query.get("max-keys", ["1000"])[0])
+        with self.server.store.lock:
+            keys = sorted(
+                (key, meta)
+                for (name, key), meta in self.server.store.objects.items()
+                if name == bucket and key.startswith(prefix) and key > start_after
+            )
+        delimiter = query.get("delimiter", [""])[0]
+        prefixes: list = []
+        if delimiter:
+            flat = []
+            for key, meta in keys:
+                head, sep, _ = key[len(prefix):].partition(delimiter)
+                if not sep:
+                    flat.append((key, meta))
+                elif prefix + head + sep not in prefixes:
+                    prefixes.append(prefix + head + sep)
+            keys = flat
+        page, truncated = keys[:max_keys], len(keys) > max_keys
+        contents = "".join(
+            f"<Contents><Key>{escape(key)}</Key><Size>{size}</Size><ETag>\"{etag}\"</ETag>"
+            f"<LastModified>{time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(mtime))}"
+            f"</LastModified><StorageClass>STANDARD</StorageClass></Contents>"
+            for key, (size, etag, _, mtime) in page
+        ) + "".join(
+            f"<CommonPrefixes><Prefix>{escape(name)}</Prefix></CommonPrefixes>"
+            for name in prefixes
+        )
+        token = (
+            f"<NextContinuationToken>{escape(page[-1][0])}</NextContinuationToken>"
+            if truncated
+            else ""
+        )
+        self._xml(
+            200,
+            f"<ListBucketResult><Name>{bucket}</Name><Prefix>{escape(prefix)}</Prefix>"
+            f"<KeyCount>{len(page)}</KeyCount><MaxKeys>{max_keys}</MaxKeys>"
+            f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>{token}"
+            f"{contents}</ListBucketResult>",
+        )
+
+    def do_PUT(self) -> None:
+        bucket, key, query = self._route()
+        store = self.server.store
+        if not key:
+            self._read_body()
+            with store.lock:
+                if bucket in store.buckets:
+                    self._error(409, "BucketAlreadyOwnedByYou")
+                    return
+                store.buckets.add(bucket)
+            (store.root / bucket).mkdir(parents=True, exist_ok=True)
+            self._send(200)
+            return
+        if bucket not in store.buckets:
+            self._read_body()
+            self._error(404, "NoSuchBucket")
+            return
+        if "uploadId" in query:
+            upload_dir = store.uploads / query["uploadId"][0]
+            number = int(query["partNumber"][0])
+            if "x-amz-copy-source" in self.headers:
+                copied = self._copy(upload_dir / f"{number:05d}")
+                if copied is None:
+                    return
+                etag = copied[1]
+                (upload_dir / f"{number:05d}.etag").write_text(etag)
+                self._xml(200, f"<CopyPartResult><ETag>\"{etag}\"</ETag></CopyPartResult>")
+                return
+            _, etag = self._receive(upload_dir / f"{number:05d}")
+            (upload_dir / f"{number:05d}.etag").write_text(etag)
+            self._send(200, headers={"ETag": f'"{etag}"'})
+            return
+        target = store.path(bucket, key)
+        partial = target.with_name(target.name + f".{uuid.uuid4().hex}.part")
+        content_type = self.headers.get("Content-Type") or "application/octet-stream"
+        if "x-amz-copy-source" in self.headers:
+            copied = self._copy(partial)
+            if copied is None:
+                partial.unlink(missing_ok=True)
+                return
+            size, etag = copied
+            partial.replace(target)
+            source = unquote(self.headers["x-amz-copy-source"].split("?", 1)[0]).lstrip("/")
+            content_type = store.objects[tuple(source.split("/", 1))][2]
+            with store.lock:
+                store.objects[(bucket, key)] = (size, etag, content_type, time.time())
+            self._xml(
+                200,
+                f"<CopyObjectResult><ETag>\"{etag}\"</ETag><LastModified>"
+                f"{time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())}</LastModified>"
+                f"</CopyObjectResult>",
+            )
+            return
+        size, etag = self._receive(partial)
+        partial.replace(target)
+        with store.lock:
+            store.objects[(bucket, key)] = (size, etag, content_type, time.time())
+        self._send(200, headers={"ETag": f'"{etag}"'})
+
+    def do_POST(self) -> None:
+        bucket, key, query = self._route()
+        store = self.server.store
+        body = self._read_body()
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            upload_dir = store.uploads / upload_id
+            upload_dir.mkdir(parents=True)
+            (upload_dir / "content-type").write_text(
+                self.headers.get("Content-Type") or "application/octet-stream"
+            )
+            self._xml(
+                200,
+                f"<InitiateMultipartUploadResult><Bucket>{bucket}</Bucket>"
+                f"<Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId>"
+                f"</InitiateMultipartUploadResult>",
+            )
+            return
+        if "uploadId" in query:
+            upload_dir = store.uploads / query["uploadId"][0]
+            if not upload_dir.exists():
+                self._error(404, "NoSuchUpload")
+                return
+            numbers = [int(n) for n in re.findall(rb"<PartNumber>(\d+)</PartNumber>", body)]
+            target = store.path(bucket, key)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            digests = b""
+            with open(target, "wb") as sink:
+                for number in numbers:
+                    part = upload_dir / f"{number:05d}"
+                    digests += bytes.fromhex((upload_dir / f"{number:05d}.etag").read_text())
+                    with open(part, "rb") as source:
+                        shutil.copyfileobj(source, sink, CHUNK_SIZE)
+            etag = f"{hashlib.md5(digests).hexdigest()}-{len(numbers)}"
+            content_type = (upload_dir / "content-type").read_text()
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            with store.lock:
+                store.objects[(bucket, key)] = (
+                    target.stat().st_size,
+                    etag,
+                    content_type,
+                    time.time(),
+                )
+            self._xml(
+                200,
+                f"<CompleteMultipartUploadResult><Location>/{bucket}/{escape(key)}</Location>"
+                f"<Bucket>{bucket}</Bucket><Key>{escape(key)}</Key><ETag>\"{etag}\"</ETag>"
+                f"</CompleteMultipartUploadResult>",
+            )
+            return
+        self._error(400, "InvalidRequest")
+
+    def do_DELETE(self) -> None:
+        bucket, key, query = self._route()
+        store = self.server.store
+        if "uploadId" in query:
+            shutil.rmtree(store.uploads / query["uploadId"][0], ignore_errors=True)
+            self._send(204)
+            return
+        with store.lock:
+            store.objects.pop((bucket, key), None)
+        store.path(bucket, key).unlink(missing_ok=True)
+        self._send(204)
+
+
+class FakeS3Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, root: Path, host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__((host, port), _Handler)
+        self.store = _Store(Path(root))
+        self._thread: threading.Thread | None = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> "FakeS3Server":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,157 @@
+"""Offline end-to-end throughput benchmarks for the ingestion pipelines.
+
+Each pipeline runs in its own interpreter against a local fake S3 store and, for arXiv, a
+local feed/PDF server, so results need no network and peak RSS is per pipeline::
+
+    python -m benchmarks.run --scenario mixed --save-baseline main
+    python -m benchmarks.run --scenario mixed --compare main
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.fake_arxiv import FakeArxivServer
+from benchmarks.fake_s3 import FakeS3Server
+from benchmarks.scenarios import KIB, SCENARIOS, Scenario
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+PIPELINES = ("kaggle-archive", "kaggle-files", "arxiv", "arxiv-stream")
+# Higher is better for throughput, lower is better for memory.
+COMPARED = {"objects_per_sec": 1, "mb_per_sec": 1, "peak_rss_mb": -1}
+
+
+def run_pipeline(pipeline: str, scenario: Scenario, pdf_workers: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="ingestion-bench-") as workdir:
+        s3 = FakeS3Server(Path(workdir) / "s3").start()
+        arxiv = None
+        if pipeline.startswith("arxiv"):
+            arxiv = FakeArxivServer(scenario.papers, scenario.pdf_size, scenario.pdf_pages).start()
+        try:
+            spec = {
+                "pipeline": pipeline,
+                "scenario": asdict(scenario),
+                "endpoint": s3.endpoint,
+                "arxiv_url": arxiv.query_url if arxiv else None,
+                "workdir": workdir,
+                "pdf_workers": pdf_workers,
+            }
+            env = dict(os.environ)
+            env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.worker", json.dumps(spec)],
+                cwd=workdir,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+        finally:
+            s3.stop()
+            if arxiv:
+                arxiv.stop()
+    if completed.returncode != 0:
+        raise RuntimeError(f"{pipeline} benchmark failed:\n{completed.stderr[-4000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _median(runs: List[dict]) -> dict:
+    result = {
+        key: statistics.median(run[key] for run in runs)
+        for key in runs[0]
+        if isinstance(runs[0][key], (int, float))
+    }
+    result["stages"] = {
+        stage: statistics.median(run["stages"].get(stage, 0.0) for run in runs)
+        for stage in runs[0]["stages"]
+    }
+    return result
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    regressions = []
+    for pipeline, metrics in results.items():
+        previous = baseline.get(pipeline)
+        if not previous:
+            continue
+        for key, direction in COMPARED.items():
+            if not previous.get(key):
+                continue
+            change = (metrics[key] - previous[key]) / previous[key]
+            print(f"  {pipeline:<15} {key:<16} {previous[key]:>10.2f} -> {metrics[key]:>10.2f} "
+                  f"({change:+.1%})")
+            if change * direction < -tolerance:
+                regressions.append(f"{pipeline} {key} {change:+.1%}")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline ingestion throughput benchmarks")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="smoke")
+    parser.add_argument("--pipelines", nargs="+", choices=PIPELINES, default=list(PIPELINES))
+    parser.add_argument("--files", type=int, help="Override the number of Kaggle files")
+    parser.add_argument("--file-size-kb", type=int, help="Override the Kaggle file size")
+    parser.add_argument("--papers", type=int, help="Override the number of arXiv papers")
+    parser.add_argument("--pdf-size-kb", type=int, help="Override the arXiv PDF size")
+    parser.add_argument("--pdf-workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per pipeline (median kept)")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Save results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against a saved baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="Relative regression allowed before --compare fails",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    scenario = SCENARIOS[args.scenario].with_overrides(
+        files=args.files,
+        file_size=args.file_size_kb and args.file_size_kb * KIB,
+        papers=args.papers,
+        pdf_size=args.pdf_size_kb and args.pdf_size_kb * KIB,
+    )
+    print(f"Scenario {scenario}")
+    results: Dict[str, dict] = {}
+    for pipeline in args.pipelines:
+        runs = [run_pipeline(pipeline, scenario, args.pdf_workers) for _ in range(args.repeat)]
+        metrics = results[pipeline] = _median(runs)
+        stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in metrics["stages"].items())
+        print(
+            f"{pipeline:<15} {metrics['objects']:>6.0f} objects  "
+            f"{metrics['objects_per_sec']:>9.1f} obj/s  {metrics['mb_per_sec']:>8.1f} MB/s  "
+            f"peak RSS {metrics['peak_rss_mb']:.0f} MiB  [{stages}]"
+        )
+
+    status = 0
+    if args.compare:
+        baseline = json.loads((BASELINE_DIR / f"{args.compare}.json").read_text())
+        if baseline.get("scenario") != asdict(scenario):
+            print("warning: baseline was recorded with a different scenario")
+        print(f"Against baseline '{args.compare}':")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        status = 1 if regressions else 0
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f"{args.save_baseline}.json"
+        path.write_text(json.dumps({"scenario": asdict(scenario), "results": results}, indent=2))
+        print(f"Saved baseline to {path}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
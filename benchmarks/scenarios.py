@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Dict
+
+KIB = 1024
+MIB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Synthetic dataset shape: Kaggle files and arXiv papers to push through the pipelines."""
+
+    name: str
+    files: int
+    file_size: int
+    papers: int
+    pdf_size: int
+    pdf_pages: int = 1
+
+    def with_overrides(self, **overrides) -> "Scenario":
+        return replace(self, **{key: value for key, value in overrides.items() if value})
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("smoke", files=20, file_size=64 * KIB, papers=20, pdf_size=64 * KIB),
+        Scenario("many-small", files=2000, file_size=4 * KIB, papers=300, pdf_size=16 * KIB),
+        Scenario("mixed", files=200, file_size=512 * KIB, papers=100, pdf_size=1 * MIB),
+        Scenario(
+            "few-large", files=4, file_size=256 * MIB, papers=8, pdf_size=32 * MIB, pdf_pages=64
+        ),
+    )
+}
@@ -0,0 +1,108 @@
+"""Runs one pipeline end to end in a fresh interpreter and prints its metrics as JSON.
+
+Started by ``benchmarks.run`` so that peak RSS covers exactly one pipeline run.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+
+
+def _configure_environment(spec: dict) -> None:
+    os.environ.update(
+        MINIO_ENDPOINT=spec["endpoint"],
+        MINIO_ROOT_USER="benchmark",
+        MINIO_ROOT_PASSWORD="benchmark",
+        MINIO_REGION="us-east-1",
+        MINIO_USE_SSL="false",
+        DATABASE_URL=f"sqlite:///{spec['workdir']}/metadata.db",
+    )
+
+
+def _build(spec: dict, store):
+    from core.models.datasource import ArxivDataSource, KaggleDataSource
+    from core.models.ingestion_job import Destination, IngestionJob
+
+    scenario = spec["scenario"]
+    workspace = Path(spec["workdir"]) / "workspace"
+    pipeline_name = spec["pipeline"]
+    if pipeline_name.startswith("kaggle"):
+        from benchmarks.fake_kaggle import FakeKaggleClient
+        from ingestion.kaggle.downloader import KaggleDatasetDownloader
+        from ingestion.pipelines.kaggle_pipeline import KagglePipeline
+
+        client = FakeKaggleClient(scenario["files"], scenario["file_size"])
+        source = KaggleDataSource(
+            name="kaggle::bench/synthetic",
+            owner_slug="bench",
+            dataset_slug="synthetic",
+            file_names=client.file_names() if pipeline_name == "kaggle-files" else None,
+        )
+        pipeline = KagglePipeline(KaggleDatasetDownloader(client=client, store=store))
+    else:
+        from ingestion.arxiv.downloader import ArxivDownloader
+        from ingestion.arxiv.settings import ArxivFetchSettings
+        from ingestion.pipelines.arxiv_pipeline import ArxivPipeline
+
+        settings = ArxivFetchSettings(
+            pdf_workers=spec["pdf_workers"],
+            page_interval=0.0,
+            max_results=scenario["papers"],
+            incremental=False,
+            stream_to_minio=pipeline_name == "arxiv-stream",
+        )
+        downloader = ArxivDownloader(
+            download_dir=str(workspace), batch_size=100, settings=settings, store=store
+        )
+        downloader.BASE_URL = spec["arxiv_url"]
+        source = ArxivDataSource(name="arxiv::bench", category="bench.SY", dataset_slug="bench")
+        pipeline = ArxivPipeline(downloader=downloader)
+    job = IngestionJob(
+        job_id=f"bench-{pipeline_name}",
+        source=source,
+        destination=Destination(bucket="benchmark", prefix=pipeline_name),
+        workspace=workspace,
+    )
+    return pipeline, job
+
+
+def main() -> None:
+    spec = json.loads(sys.argv[1])
+    _configure_environment(spec)
+    from infrastructure.db.metadata_store import MetadataStore
+
+    store = MetadataStore(os.environ["DATABASE_URL"])
+    pipeline, job = _build(spec, store)
+    started = time.perf_counter()
+    pipeline.run(job)
+    seconds = time.perf_counter() - started
+
+    run = store.list_runs(job_id=job.job_id, limit=1)[0]
+    stages = {timing.stage: timing.seconds for timing in store.stage_timings(run.id)}
+    # ru_maxrss is in KiB on Linux; RUSAGE_CHILDREN reports the largest reaped child.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    child_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(
+        json.dumps(
+            {
+                "seconds": seconds,
+                "objects": run.objects,
+                "bytes": run.bytes,
+                "failed": run.failed,
+                "objects_per_sec": run.objects / seconds,
+                "mb_per_sec": run.bytes / 1_048_576 / seconds,
+                "peak_rss_mb": peak,
+                "peak_child_rss_mb": child_peak,
+                "stages": stages,
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,7 @@ class IngestionError(Exception):
 
 class KaggleDownloadError(IngestionError):
     """Raised when the Kaggle API returns an error."""
+
+
+class ChecksumMismatchError(IngestionError):
+    """Raised when a downloaded file does not match its expected checksum."""
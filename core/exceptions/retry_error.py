@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+
+class RetryableError(Exception):
+    """Raised for a transient failure, such as an HTTP 429 or 503, that is worth retrying."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling out when an endpoint's circuit breaker is open."""
+
+    def __init__(self, name: str, retry_in: float) -> None:
+        super().__init__(f"Circuit for {name} is open; retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
@@ -1,3 +1,6 @@
+from __future__ import annotations
+
+
 class StorageError(Exception):
     """Base storage exception."""
 
@@ -8,3 +11,13 @@ class BucketCreationError(StorageError):
 
 class ObjectUploadError(StorageError):
     """Raised when an object upload fails."""
+
+
+class PartialUploadError(ObjectUploadError):
+    """Raised when some objects of a bulk upload fail while the rest succeed."""
+
+    def __init__(self, failed: list[str], total: int) -> None:
+        preview = ", ".join(failed[:5]) + (", ..." if len(failed) > 5 else "")
+        super().__init__(f"{len(failed)} of {total} objects failed to upload: {preview}")
+        self.failed = failed
+        self.total = total
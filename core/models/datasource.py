@@ -1,23 +1,46 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Iterable, List, Sequence
+from typing import Any, ClassVar, Iterable, List, Mapping, Sequence
+from urllib.parse import urlsplit
 
 
 @dataclass(frozen=True)
 class DataSource:
     """Base descriptor for any ingestion source."""
 
+    # Key the pipeline registry dispatches on; subclasses set their own.
+    source_type: ClassVar[str] = ""
+
     name: str
 
 
+@dataclass(frozen=True)
+class ParquetConversion:
+    """Tabular files to convert to Parquet before upload (needs the optional ``pyarrow``).
+
+    Files matching ``patterns`` are written as ``<name>.parquet``. With ``partition_by`` they
+    are written as ``<name>/<column>=<value>/part-0.parquet`` instead, for files that have
+    that column. ``keep_source`` uploads the original files as well.
+    """
+
+    patterns: Sequence[str] = ("*.csv", "*.tsv")
+    partition_by: str | None = None
+    keep_source: bool = False
+    compression: str = "zstd"
+    row_group_rows: int = 250_000
+
+
 @dataclass(frozen=True)
 class KaggleDataSource(DataSource):
     """Description of a Kaggle dataset to ingest."""
 
+    source_type: ClassVar[str] = "kaggle"
+
     owner_slug: str
     dataset_slug: str
     file_names: Sequence[str] | None = field(default=None)
+    parquet: ParquetConversion | None = field(default=None)
 
     def dataset_ref(self) -> str:
         return f"{self.owner_slug}/{self.dataset_slug}"
@@ -29,11 +52,14 @@ class KaggleDataSource(DataSource):
         if self.file_names is None:
             return None
         return [f.strip() for f in self.file_names if f.strip()]
-    
+
+
 @dataclass(frozen=True)
 class ArxivDataSource(DataSource):
     """Description of an Arxiv dataset to ingest."""
 
+    source_type: ClassVar[str] = "arxiv"
+
     category: str
     dataset_slug: str
     file_names: Sequence[str] | None = field(default=None)
@@ -48,3 +74,115 @@ class ArxivDataSource(DataSource):
         if self.file_names is None:
             return None
         return [f.strip() for f in self.file_names if f.strip()]
+
+
+@dataclass(frozen=True)
+class WebDataSource(DataSource):
+    """Seed URLs of a site crawl; links are followed within ``allowed_domains``."""
+
+    source_type: ClassVar[str] = "web"
+
+    seeds: Sequence[str]
+    allowed_domains: Sequence[str] | None = field(default=None)
+    max_pages: int = 1000
+    max_depth: int = 3
+
+    def domains(self) -> List[str]:
+        """The allowed domains, defaulting to the seeds' own hosts."""
+        if self.allowed_domains:
+            return [domain.lower() for domain in self.allowed_domains]
+        return sorted({urlsplit(seed).hostname or "" for seed in self.seeds} - {""})
+
+
+@dataclass(frozen=True)
+class Pagination:
+    """How an API splits its records over requests.
+
+    ``style`` is ``offset`` (``offset_param`` counts records), ``page`` (``page_param`` counts
+    pages from ``first_page``), ``cursor`` (the next request passes the value found at
+    ``cursor_path``) or ``none``. ``total_path`` names the total record count in the first
+    response, when the API reports one, so that offset and page requests can be sent in parallel
+    up to the end.
+    """
+
+    style: str = "none"
+    page_size: int = 100
+    size_param: str = "limit"
+    offset_param: str = "offset"
+    page_param: str = "page"
+    first_page: int = 1
+    cursor_param: str = "cursor"
+    cursor_path: str | None = None
+    total_path: str | None = None
+    max_pages: int | None = None
+
+
+@dataclass(frozen=True)
+class ApiAuth:
+    """Credentials are named by environment variable, so job configs never hold secrets.
+
+    ``kind`` is ``none``, ``bearer`` (token in ``token_env``), ``api_key`` (the value of
+    ``token_env`` is sent in ``header``) or ``oauth2`` (client credentials grant against
+    ``token_url``).
+    """
+
+    kind: str = "none"
+    token_env: str | None = None
+    header: str = "X-API-Key"
+    token_url: str | None = None
+    client_id_env: str | None = None
+    client_secret_env: str | None = None
+    scope: str | None = None
+
+
+@dataclass(frozen=True)
+class ApiDataSource(DataSource):
+    """A paginated JSON endpoint whose records are written out in batched objects."""
+
+    source_type: ClassVar[str] = "api"
+
+    url: str
+    records_path: str | None = None
+    params: Mapping[str, Any] | None = field(default=None)
+    headers: Mapping[str, str] | None = field(default=None)
+    pagination: Pagination = Pagination()
+    auth: ApiAuth = ApiAuth()
+    # ndjson or parquet; objects are cut at roughly target_object_mb of encoded records.
+    output_format: str = "ndjson"
+    target_object_mb: int = 64
+
+
+@dataclass(frozen=True)
+class S3DataSource(DataSource):
+    """A bucket (optionally under ``prefix``) on S3 or any S3-compatible store.
+
+    Credentials come from boto3's usual chain (environment, ``profile``, instance role).
+    When ``endpoint_url`` is the MinIO endpoint itself, objects are copied server-side.
+    """
+
+    source_type: ClassVar[str] = "s3"
+
+    bucket: str
+    prefix: str = ""
+    endpoint_url: str | None = None
+    region: str | None = None
+    profile: str | None = None
+
+
+@dataclass(frozen=True)
+class RemoteFile:
+    """One file to download. ``checksum`` is ``<algorithm>:<hex>``, e.g. ``sha256:9f86...``."""
+
+    url: str
+    # Object name relative to the destination prefix; defaults to the URL's file name.
+    name: str | None = None
+    checksum: str | None = None
+
+
+@dataclass(frozen=True)
+class DownloadDataSource(DataSource):
+    """Large files fetched over HTTP(S), each with several parallel ranged requests."""
+
+    source_type: ClassVar[str] = "python_download"
+
+    files: Sequence[RemoteFile]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator
+
+_current: contextvars.ContextVar["ProgressTracker | None"] = contextvars.ContextVar(
+    "ingestion_progress", default=None
+)
+
+
+@dataclass
+class ProgressTracker:
+    """Live counters of one job run that other threads can poll."""
+
+    stage: str | None = None
+    objects: int = 0
+    skipped: int = 0
+    failed: int = 0
+    bytes: int = 0
+    version: int = 0
+    updated_at: float = field(default_factory=time.time)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def _touch(self) -> None:
+        self.version += 1
+        self.updated_at = time.time()
+
+    def set_stage(self, stage: str) -> None:
+        with self._lock:
+            self.stage = stage
+            self._touch()
+
+    def record(self, size: int = 0, skipped: bool = False, failed: bool = False) -> None:
+        with self._lock:
+            if failed:
+                self.failed += 1
+            elif skipped:
+                self.skipped += 1
+            else:
+                self.objects += 1
+                self.bytes += size
+            self._touch()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "stage": self.stage,
+                "objects": self.objects,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "bytes": self.bytes,
+                "version": self.version,
+                "updated_at": self.updated_at,
+            }
+
+
+def current_progress() -> ProgressTracker | None:
+    return _current.get()
+
+
+@contextmanager
+def progress_scope(tracker: ProgressTracker) -> Iterator[ProgressTracker]:
+    """Make ``tracker`` the progress sink for ledgers opened in this context."""
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
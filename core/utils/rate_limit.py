@@ -0,0 +1,143 @@
+"""Token-bucket rate limiting per host, shared by every process on the machine.
+
+Each bucket's state is a small JSON file under ``RATE_LIMIT_DIR`` (default: a directory in
+the system temp dir). Every read-modify-write holds an exclusive ``flock`` on that file, so
+two jobs in different processes hitting the same host share one allowance instead of each
+using the full rate.
+
+Buckets adapt to the server: ``penalize`` (on a 429 or 503) halves the effective rate and
+honours ``Retry-After``. ``reward`` (on success) recovers it step by step up to the configured
+rate. The configured rate is never exceeded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: buckets are then shared per process only
+    fcntl = None  # type: ignore[assignment]
+
+MIN_FACTOR = 0.1
+RECOVERY_STEP = 0.1
+
+
+def default_state_dir() -> Path:
+    configured = os.getenv("RATE_LIMIT_DIR")
+    if configured:
+        return Path(configured)
+    return Path(tempfile.gettempdir()) / "ingestion-rate-limits"
+
+
+@dataclass
+class _BucketState:
+    tokens: float
+    updated: float
+    factor: float = 1.0
+    blocked_until: float = 0.0
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second on average, in bursts of up to ``burst``."""
+
+    def __init__(
+        self, key: str, rate: float, burst: float = 1.0, state_dir: Path | None = None
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.key = key
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        directory = Path(state_dir) if state_dir is not None else default_state_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', key)}.json"
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _state(self) -> Iterator[_BucketState]:
+        """Hold the bucket exclusively, refilled to now; changes are written back on exit."""
+        with self._lock, open(self.path, "a+", encoding="utf-8") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            handle.seek(0)
+            now = time.time()
+            try:
+                state = _BucketState(**json.loads(handle.read()))
+            except (ValueError, TypeError):
+                state = _BucketState(tokens=self.burst, updated=now)
+            elapsed = max(now - state.updated, 0.0)
+            state.tokens = min(self.burst, state.tokens + elapsed * self.rate * state.factor)
+            state.updated = now
+            yield state
+            handle.seek(0)
+            handle.truncate()
+            handle.write(json.dumps(asdict(state)))
+            handle.flush()
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return the seconds until one will be."""
+        with self._state() as state:
+            blocked = state.blocked_until - state.updated
+            if blocked > 0:
+                return blocked
+            if state.tokens >= 1.0:
+                state.tokens -= 1.0
+                return 0.0
+            return (1.0 - state.tokens) / (self.rate * state.factor)
+
+    def acquire(self) -> float:
+        """Block until a token is taken; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self) -> float:
+        """``acquire`` for coroutines; the locked file I/O runs off the event loop."""
+        waited = 0.0
+        while True:
+            delay = await asyncio.to_thread(self.try_acquire)
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def penalize(self, retry_after: float | None = None) -> None:
+        """The host pushed back: halve the rate and pause everyone for ``retry_after``."""
+        with self._state() as state:
+            state.factor = max(state.factor / 2, MIN_FACTOR)
+            state.tokens = min(state.tokens, 0.0)
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, state.updated + retry_after)
+
+    def reward(self) -> None:
+        with self._state() as state:
+            if state.factor < 1.0:
+                state.factor = min(state.factor + RECOVERY_STEP, 1.0)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def rate_limiter(key: str, rate: float, burst: float = 1.0) -> TokenBucket:
+    """The process's bucket for ``key`` (usually a host); the state itself is machine-wide."""
+    bucket = _buckets.get(key)
+    if bucket is None or bucket.rate != rate or bucket.burst != max(burst, 1.0):
+        with _buckets_lock:
+            bucket = _buckets[key] = TokenBucket(key, rate, burst)
+    return bucket
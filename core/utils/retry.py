@@ -1,29 +1,282 @@
+"""Retries with jittered exponential backoff, per-job retry budgets and per-host circuit breakers.
+
+``RetryPolicy.call`` / ``RetryPolicy.acall`` (or the ``retry`` decorator) retry a callable on
+the given exceptions. Each wait is drawn uniformly from ``[0, min(max_delay, base * 2**n)]``
+so workers that failed together do not retry together. A ``Retry-After`` carried by the
+error is honoured instead. Every wait is charged to the ``RetryBudget`` active in the
+current context. Once it runs out, errors are raised at once rather than leaving workers
+asleep. With a ``host``, the call also goes through that host's ``CircuitBreaker``.
+"""
+
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import functools
+import inspect
+import logging
+import os
+import random
+import threading
 import time
-from typing import Any, Callable, Type
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, Type, TypeVar
+
+from core.exceptions.retry_error import CircuitOpenError, RetryableError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_BUDGET_SECONDS = 120.0
+
+_budget: contextvars.ContextVar[Optional["RetryBudget"]] = contextvars.ContextVar(
+    "retry_budget", default=None
+)
+
+
+class RetryBudget:
+    """Total seconds that retries of one job may spend waiting, shared by all its workers."""
+
+    def __init__(self, seconds: float = DEFAULT_BUDGET_SECONDS) -> None:
+        self.seconds = seconds
+        self.spent = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RetryBudget":
+        return cls(float(os.getenv("RETRY_BUDGET_SECONDS", DEFAULT_BUDGET_SECONDS)))
+
+    @property
+    def remaining(self) -> float:
+        return max(self.seconds - self.spent, 0.0)
+
+    def take(self, delay: float) -> bool:
+        with self._lock:
+            if self.spent + delay > self.seconds:
+                return False
+            self.spent += delay
+            return True
+
+
+def current_retry_budget() -> Optional[RetryBudget]:
+    return _budget.get()
+
+
+@contextmanager
+def retry_budget(budget: RetryBudget) -> Iterator[RetryBudget]:
+    """Charge retries made in this context (and pools submitted via copy_context) to ``budget``."""
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+class CircuitBreaker:
+    """Fails calls fast after ``failure_threshold`` consecutive failures.
+
+    After ``reset_seconds`` one trial call is let through (half-open). If it succeeds the
+    circuit closes; if it fails the circuit opens again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited >= self.reset_seconds and not self._trial:
+                self._trial = True
+                return
+            raise CircuitOpenError(self.name, max(self.reset_seconds - waited, 0.0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(
+                        "Opening circuit for %s after %d failures", self.name, self.failures
+                    )
+                self.opened_at = time.monotonic()
+                self._trial = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(host: str) -> CircuitBreaker:
+    """The process-wide breaker for ``host``."""
+    breaker = _breakers.get(host)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(host, CircuitBreaker(host))
+    return breaker
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds the server asked us to wait, from the error or its response's ``Retry-After``."""
+    if isinstance(exc, RetryableError) and exc.retry_after is not None:
+        return exc.retry_after
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    return parse_retry_after(headers.get("Retry-After") if headers is not None else None)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    retry_on: Tuple[Type[BaseException], ...] = (RetryableError,)
+    attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    host: str | None = None
+    # Narrows ``retry_on`` further, e.g. to the S3 error codes that are transient.
+    when: Callable[[BaseException], bool] | None = None
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _breaker(self) -> CircuitBreaker | None:
+        return circuit_breaker(self.host) if self.host else None
+
+    def _next_delay(self, attempt: int, exc: BaseException, name: str) -> float | None:
+        """Seconds to wait before the next attempt, or None to give up and re-raise."""
+        if attempt >= self.attempts:
+            return None
+        requested = retry_after(exc)
+        delay = min(requested, self.max_delay) if requested is not None else self.backoff(attempt)
+        budget = current_retry_budget()
+        if budget is not None and not budget.take(delay):
+            logger.warning("Retry budget exhausted; not retrying %s: %s", name, exc)
+            return None
+        logger.warning(
+            "Retrying %s in %.2fs (attempt %d/%d): %s", name, delay, attempt, self.attempts, exc
+        )
+        return delay
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        breaker = self._breaker()
+        name = getattr(func, "__qualname__", repr(func))
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker:
+                breaker.before_call()
+            try:
+                result = func(*args, **kwargs)
+            except self.retry_on as exc:
+                if self.when is not None and not self.when(exc):
+                    if breaker:
+                        breaker.record_success()
+                    raise
+                if breaker:
+                    breaker.record_failure()
+                delay = self._next_delay(attempt, exc, name)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # The host answered; the failure is ours or permanent, not an outage.
+                if breaker:
+                    breaker.record_success()
+                raise
+            if breaker:
+                breaker.record_success()
+            return result
+
+    async def acall(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        breaker = self._breaker()
+        name = getattr(func, "__qualname__", repr(func))
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker:
+                breaker.before_call()
+            try:
+                result = await func(*args, **kwargs)
+            except self.retry_on as exc:
+                if self.when is not None and not self.when(exc):
+                    if breaker:
+                        breaker.record_success()
+                    raise
+                if breaker:
+                    breaker.record_failure()
+                delay = self._next_delay(attempt, exc, name)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                if breaker:
+                    breaker.record_success()
+                raise
+            if breaker:
+                breaker.record_success()
+            return result
 
 
 def retry(
     exceptions: tuple[Type[Exception], ...],
     attempts: int = 3,
     backoff_seconds: float = 1.0,
+    max_backoff_seconds: float = 30.0,
+    host: str | None = None,
 ) -> Callable:
+    """Decorate a function or coroutine function to retry on ``exceptions``."""
+    policy = RetryPolicy(exceptions, attempts, backoff_seconds, max_backoff_seconds, host)
+
     def decorator(func: Callable):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any):
+                return await policy.acall(func, *args, **kwargs)
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any):
-            last_error: Exception | None = None
-            for attempt in range(1, attempts + 1):
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as exc:
-                    last_error = exc
-                    if attempt == attempts:
-                        raise
-                    time.sleep(backoff_seconds * attempt)
-            if last_error:
-                raise last_error
+            return policy.call(func, *args, **kwargs)
 
         return wrapper
 
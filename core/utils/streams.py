@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any, BinaryIO
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class CountingReader:
+    """File-like wrapper that counts (and optionally hashes) the bytes read through it."""
+
+    def __init__(self, stream: BinaryIO, digest: Any | None = None) -> None:
+        self._stream = stream
+        self._digest = digest
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        self.bytes_read += len(chunk)
+        if self._digest is not None:
+            self._digest.update(chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        if self._digest is None:
+            raise ValueError("CountingReader was created without a digest")
+        return self._digest.hexdigest()
+
+
+def stream_sha256(stream: BinaryIO) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    with open(path, "rb") as fp:
+        return stream_sha256(fp)
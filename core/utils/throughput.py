@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ThroughputMeter:
+    """Thread-safe counter of transferred items and bytes over wall-clock time."""
+
+    unit: str = "items"
+    items: int = 0
+    bytes: int = 0
+    failures: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, size: int) -> None:
+        with self._lock:
+            self.items += 1
+            self.bytes += size
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started_at, 1e-9)
+
+    def items_per_sec(self) -> float:
+        return self.items / self.elapsed()
+
+    def bytes_per_sec(self) -> float:
+        return self.bytes / self.elapsed()
+
+    def summary(self) -> str:
+        return (
+            f"{self.items} {self.unit}, {self.bytes / 1_048_576:.1f} MiB "
+            f"in {self.elapsed():.1f}s ({self.items_per_sec():.2f} {self.unit}/s, "
+            f"{self.bytes_per_sec() / 1_048_576:.2f} MiB/s, {self.failures} failed)"
+        )
@@ -1 +1,416 @@
-# Save metadata, ingestion logs
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    create_engine,
+    event,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+from core.models.ingestion_job import IngestionJob
+from core.utils.progress import current_progress
+from core.utils.retry import RetryBudget, retry_budget
+from infrastructure.metrics import instruments
+
+DEFAULT_DATABASE_URL = "sqlite:///./data/metadata.db"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class JobRun(Base):
+    __tablename__ = "job_runs"
+    __table_args__ = (
+        Index("ix_job_runs_job_started", "job_id", "started_at"),
+        Index("ix_job_runs_source_started", "source", "started_at"),
+        Index("ix_job_runs_started", "started_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(String(255))
+    source: Mapped[str] = mapped_column(String(64))
+    bucket: Mapped[str] = mapped_column(String(255))
+    prefix: Mapped[str] = mapped_column(String(1024), default="")
+    status: Mapped[str] = mapped_column(String(32), default="running")
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    objects: Mapped[int] = mapped_column(Integer, default=0)
+    skipped: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+
+
+class ObjectRecord(Base):
+    __tablename__ = "object_records"
+    __table_args__ = (
+        Index("ix_object_records_bucket_object", "bucket", "object_name"),
+        Index("ix_object_records_recorded", "recorded_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_id: Mapped[int] = mapped_column(ForeignKey("job_runs.id"), index=True)
+    bucket: Mapped[str] = mapped_column(String(255))
+    object_name: Mapped[str] = mapped_column(String(1024))
+    size: Mapped[int] = mapped_column(BigInteger, default=0)
+    sha256: Mapped[Optional[str]] = mapped_column(String(64))
+    skipped: Mapped[bool] = mapped_column(Boolean, default=False)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+
+
+class StageTiming(Base):
+    __tablename__ = "stage_timings"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_id: Mapped[int] = mapped_column(ForeignKey("job_runs.id"), index=True)
+    stage: Mapped[str] = mapped_column(String(64))
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    seconds: Mapped[float] = mapped_column(Float)
+    items: Mapped[int] = mapped_column(Integer, default=0)
+    bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class HarvestCursor(Base):
+    """High-water mark and resume point of an incremental harvest, e.g. one arXiv category."""
+
+    __tablename__ = "harvest_cursors"
+
+    source: Mapped[str] = mapped_column(String(64), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    high_water: Mapped[Optional[str]] = mapped_column(String(64))
+    pending_high_water: Mapped[Optional[str]] = mapped_column(String(64))
+    offset: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=_utcnow, onupdate=_utcnow
+    )
+
+
+class HarvestRetry(Base):
+    """An item a harvest walked past without fetching it, to be retried on later runs."""
+
+    __tablename__ = "harvest_retries"
+
+    source: Mapped[str] = mapped_column(String(64), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    item_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    updated: Mapped[Optional[str]] = mapped_column(String(64))
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=_utcnow, onupdate=_utcnow
+    )
+
+
+@dataclass
+class StageTimer:
+    """Mutable counters a pipeline fills in while a stage runs."""
+
+    items: int = 0
+    bytes: int = 0
+
+
+class RunLedger:
+    """Buffers the records of one job run and writes them to the store in batches.
+
+    Records are appended in memory and flushed every ``batch_size`` rows and when the run
+    finishes, so the transfer loops never wait on the database.
+    """
+
+    def __init__(
+        self,
+        store: "MetadataStore",
+        run_id: int,
+        batch_size: int,
+        labels: Dict[str, str] | None = None,
+    ) -> None:
+        self.store = store
+        self.run_id = run_id
+        self.batch_size = batch_size
+        # job/source/bucket labels for the metrics this ledger records.
+        self.labels = labels or {}
+        self._objects: List[Dict[str, Any]] = []
+        self._stages: List[Dict[str, Any]] = []
+        self._totals = {"objects": 0, "skipped": 0, "failed": 0, "bytes": 0}
+        self._lock = threading.Lock()
+        # Captured here because transfer worker threads do not inherit the job's context.
+        self.progress = current_progress()
+
+    def record_object(
+        self,
+        bucket: str,
+        object_name: str,
+        size: int = 0,
+        sha256: str | None = None,
+        skipped: bool = False,
+        error: str | None = None,
+    ) -> None:
+        row = {
+            "run_id": self.run_id,
+            "bucket": bucket,
+            "object_name": object_name,
+            "size": size,
+            "sha256": sha256,
+            "skipped": skipped,
+            "error": error,
+            "recorded_at": _utcnow(),
+        }
+        with self._lock:
+            self._objects.append(row)
+            if error:
+                self._totals["failed"] += 1
+            elif skipped:
+                self._totals["skipped"] += 1
+            else:
+                self._totals["objects"] += 1
+                self._totals["bytes"] += size
+            should_flush = len(self._objects) >= self.batch_size
+        if self.progress is not None:
+            self.progress.record(size, skipped=skipped, failed=bool(error))
+        status = "failed" if error else "skipped" if skipped else "uploaded"
+        instruments.OBJECTS.labels(status=status, **self.labels).inc()
+        if status == "uploaded":
+            instruments.OBJECT_BYTES.labels(**self.labels).inc(size)
+        if should_flush:
+            self.flush()
+
+    def record_uploads(self, bucket: str, results: Iterable[Any]) -> None:
+        """Record ``UploadResult``-like objects from a bulk upload."""
+        for result in results:
+            self.record_object(
+                bucket,
+                result.object_name,
+                size=result.size,
+                sha256=getattr(result, "sha256", None),
+                skipped=getattr(result, "skipped", False),
+                error=result.error,
+            )
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageTimer]:
+        timer = StageTimer()
+        if self.progress is not None:
+            self.progress.set_stage(name)
+        labels = {**self.labels, "stage": name}
+        in_flight = instruments.STAGE_IN_FLIGHT.labels(**labels)
+        in_flight.inc()
+        started_at = _utcnow()
+        started = time.perf_counter()
+        try:
+            yield timer
+        except BaseException:
+            instruments.STAGE_ERRORS.labels(**labels).inc()
+            raise
+        finally:
+            in_flight.dec()
+            instruments.STAGE_SECONDS.labels(**labels).observe(time.perf_counter() - started)
+            instruments.STAGE_ITEMS.labels(**labels).inc(timer.items)
+            instruments.STAGE_BYTES.labels(**labels).inc(timer.bytes)
+            row = {
+                "run_id": self.run_id,
+                "stage": name,
+                "started_at": started_at,
+                "seconds": time.perf_counter() - started,
+                "items": timer.items,
+                "bytes": timer.bytes,
+            }
+            with self._lock:
+                self._stages.append(row)
+
+    def flush(self) -> None:
+        with self._lock:
+            objects, self._objects = self._objects, []
+            stages, self._stages = self._stages, []
+        self.store._insert_rows(objects, stages)
+
+    def finish(self, status: str, error: str | None = None) -> None:
+        self.flush()
+        self.store._finish_run(self.run_id, status, error=error, **self._totals)
+
+
+class MetadataStore:
+    """Durable ledger of job runs, uploaded objects and per-stage timings."""
+
+    def __init__(self, url: str = DEFAULT_DATABASE_URL, batch_size: int = 500) -> None:
+        self.url = url
+        self.batch_size = batch_size
+        self.engine = self._create_engine(url)
+        Base.metadata.create_all(self.engine)
+        self._sessions = sessionmaker(self.engine, expire_on_commit=False)
+
+    @staticmethod
+    def _create_engine(url: str) -> Engine:
+        if not url.startswith("sqlite"):
+            return create_engine(url, pool_pre_ping=True)
+        database = url.split("///", 1)[-1]
+        if database and database != ":memory:":
+            Path(database).expanduser().parent.mkdir(parents=True, exist_ok=True)
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, _record) -> None:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+        return engine
+
+    @contextmanager
+    def run(self, job: IngestionJob, source: str) -> Iterator[RunLedger]:
+        """Open a ledger for ``job``; the run is marked failed if the block raises."""
+        with self._sessions.begin() as session:
+            record = JobRun(
+                job_id=job.job_id,
+                source=source,
+                bucket=job.destination.bucket,
+                prefix=job.destination.prefix,
+            )
+            session.add(record)
+            session.flush()
+            run_id = record.id
+        labels = {"job": job.job_id, "source": source, "bucket": job.destination.bucket}
+        ledger = RunLedger(self, run_id, self.batch_size, labels=labels)
+        # Every retry made while the job runs draws on one budget, whichever worker makes it.
+        with instruments.metric_labels(job=job.job_id, source=source), retry_budget(
+            RetryBudget.from_env()
+        ):
+            try:
+                yield ledger
+            except BaseException as exc:
+                ledger.finish("failed", error=str(exc))
+                raise
+        ledger.finish("succeeded")
+
+    def _insert_rows(self, objects: List[Dict[str, Any]], stages: List[Dict[str, Any]]) -> None:
+        if not objects and not stages:
+            return
+        with self._sessions.begin() as session:
+            if objects:
+                session.execute(insert(ObjectRecord), objects)
+            if stages:
+                session.execute(insert(StageTiming), stages)
+
+    def _finish_run(
+        self, run_id: int, status: str, error: str | None = None, **totals: int
+    ) -> None:
+        with self._sessions.begin() as session:
+            session.execute(
+                update(JobRun)
+                .where(JobRun.id == run_id)
+                .values(status=status, finished_at=_utcnow(), error=error, **totals)
+            )
+
+    def get_cursor(self, source: str, key: str) -> HarvestCursor:
+        """Return the stored cursor for ``source``/``key``, or a fresh one if none exists."""
+        with self._sessions() as session:
+            cursor = session.get(HarvestCursor, (source, key))
+        return cursor or HarvestCursor(source=source, key=key, offset=0)
+
+    def save_cursor(self, cursor: HarvestCursor) -> None:
+        with self._sessions.begin() as session:
+            session.merge(cursor)
+
+    def get_retries(self, source: str, key: str) -> List[HarvestRetry]:
+        query = select(HarvestRetry).where(HarvestRetry.source == source, HarvestRetry.key == key)
+        with self._sessions() as session:
+            return list(session.scalars(query))
+
+    def record_retry(self, source: str, key: str, item_id: str, updated: str | None) -> int:
+        """Note a failed attempt at ``item_id``; returns how many attempts have failed."""
+        with self._sessions.begin() as session:
+            retry = session.get(HarvestRetry, (source, key, item_id))
+            if retry is None:
+                retry = HarvestRetry(source=source, key=key, item_id=item_id, attempts=0)
+                session.add(retry)
+            retry.updated = updated
+            retry.attempts += 1
+            return retry.attempts
+
+    def clear_retry(self, source: str, key: str, item_id: str) -> None:
+        with self._sessions.begin() as session:
+            retry = session.get(HarvestRetry, (source, key, item_id))
+            if retry is not None:
+                session.delete(retry)
+
+    def list_runs(
+        self,
+        job_id: str | None = None,
+        source: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int = 100,
+    ) -> List[JobRun]:
+        query = select(JobRun)
+        if job_id is not None:
+            query = query.where(JobRun.job_id == job_id)
+        if source is not None:
+            query = query.where(JobRun.source == source)
+        if since is not None:
+            query = query.where(JobRun.started_at >= since)
+        if until is not None:
+            query = query.where(JobRun.started_at < until)
+        query = query.order_by(JobRun.started_at.desc()).limit(limit)
+        with self._sessions() as session:
+            return list(session.scalars(query))
+
+    def list_objects(
+        self,
+        bucket: str,
+        prefix: str = "",
+        since: datetime | None = None,
+        until: datetime | None = None,
+        run_id: int | None = None,
+        limit: int = 1000,
+    ) -> List[ObjectRecord]:
+        query = select(ObjectRecord).where(ObjectRecord.bucket == bucket)
+        if prefix:
+            # A half-open range instead of LIKE so the (bucket, object_name) index is used.
+            query = query.where(
+                ObjectRecord.object_name >= prefix, ObjectRecord.object_name < prefix + "\uffff"
+            )
+        if since is not None:
+            query = query.where(ObjectRecord.recorded_at >= since)
+        if until is not None:
+            query = query.where(ObjectRecord.recorded_at < until)
+        if run_id is not None:
+            query = query.where(ObjectRecord.run_id == run_id)
+        query = query.order_by(ObjectRecord.object_name).limit(limit)
+        with self._sessions() as session:
+            return list(session.scalars(query))
+
+    def stage_timings(self, run_id: int) -> List[StageTiming]:
+        query = select(StageTiming).where(StageTiming.run_id == run_id).order_by(StageTiming.id)
+        with self._sessions() as session:
+            return list(session.scalars(query))
+
+
+@lru_cache()
+def get_metadata_store() -> MetadataStore:
+    return MetadataStore(os.getenv("DATABASE_URL") or DEFAULT_DATABASE_URL)
@@ -1,19 +1,119 @@
 from __future__ import annotations
 
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
-from typing import Optional
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
 
+# Pass as ``extra=PER_OBJECT`` on log lines emitted once per transferred object so they are
+# sampled instead of written every time.
+PER_OBJECT = {"per_object": True}
 
-def _configure_root_logger() -> None:
-    if logging.getLogger().handlers:
-        return
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
+# Libraries that log every request at INFO; they are held at WARNING like per-object lines.
+CHATTY_LOGGERS = ("httpx", "httpcore")
+
+_RESERVED = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "per_object"}
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra`` fields are included as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{line} (+{suppressed} similar suppressed)" if suppressed else line
+
+
+class PerObjectSampler(logging.Filter):
+    """Keeps one in ``every`` per-object records from each call site.
+
+    A kept record notes how many were dropped since the last one, so totals stay visible.
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, every: int) -> None:
+        super().__init__()
+        self.every = max(every, 1)
+        self._seen: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or not getattr(record, "per_object", False):
+            return True
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.lineno)
+        with self._lock:
+            count = self._seen.get(key, 0) + 1
+            self._seen[key] = count
+        if count % self.every != 1:
+            return False
+        if count > 1:
+            record.suppressed = self.every - 1
+        return True
+
+
+def _build_formatter() -> logging.Formatter:
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        return JsonFormatter()
+    return TextFormatter(
         "%(asctime)s | %(levelname)s | %(name)s | %(message)s", "%Y-%m-%d %H:%M:%S"
     )
-    handler.setFormatter(formatter)
-    logging.basicConfig(level=logging.INFO, handlers=[handler])
+
+
+def _configure_root_logger() -> None:
+    """Route all records through a queue so callers never block on stdout.
+
+    The queue is drained by a background listener thread that does the formatting and I/O.
+    ``LOG_LEVEL`` sets the level, ``LOG_FORMAT=json`` switches to JSON lines, and
+    ``LOG_SAMPLE_EVERY`` (default 100, 1 disables sampling) thins per-object records.
+    """
+    global _listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    with _configure_lock:
+        if root.handlers:
+            return
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(_build_formatter())
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(PerObjectSampler(int(os.getenv("LOG_SAMPLE_EVERY", "100"))))
+        root.addHandler(queue_handler)
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        for name in CHATTY_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
 
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
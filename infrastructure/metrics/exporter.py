@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from infrastructure.metrics.registry import REGISTRY
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def write_textfile(path: str | Path) -> Path:
+    """Dump the current metrics to ``path`` for CLI runs.
+
+    The file is replaced atomically, so it can be read by node_exporter's textfile collector
+    while a run is writing it.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.{os.getpid()}")
+    partial.write_text(render(), encoding="utf-8")
+    partial.replace(path)
+    return path
@@ -0,0 +1,110 @@
+"""The service's metrics, and helpers that time stages and remote operations.
+
+Job and source labels come from :func:`metric_labels`, which ``MetadataStore.run`` sets for
+the duration of a job. Thread pools that do per-object work submit through
+``contextvars.copy_context().run`` so their metrics keep those labels.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator
+
+from infrastructure.metrics.registry import REGISTRY
+
+_labels: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar(
+    "metric_labels", default={}
+)
+
+STAGE_LABELS = ("job", "source", "bucket", "stage")
+OPERATION_LABELS = ("job", "source", "operation", "target")
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "ingestion_stage_duration_seconds", "Wall time of pipeline stages.", STAGE_LABELS
+)
+STAGE_IN_FLIGHT = REGISTRY.gauge(
+    "ingestion_stage_in_flight", "Pipeline stages currently running.", STAGE_LABELS
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "ingestion_stage_errors_total", "Pipeline stages that raised.", STAGE_LABELS
+)
+STAGE_ITEMS = REGISTRY.counter(
+    "ingestion_stage_items_total", "Items processed by pipeline stages.", STAGE_LABELS
+)
+STAGE_BYTES = REGISTRY.counter(
+    "ingestion_stage_bytes_total", "Bytes processed by pipeline stages.", STAGE_LABELS
+)
+OBJECTS = REGISTRY.counter(
+    "ingestion_objects_total",
+    "Objects recorded in the run ledger, by outcome.",
+    ("job", "source", "bucket", "status"),
+)
+OBJECT_BYTES = REGISTRY.counter(
+    "ingestion_object_bytes_total",
+    "Bytes of objects written to storage.",
+    ("job", "source", "bucket"),
+)
+OPERATION_SECONDS = REGISTRY.histogram(
+    "ingestion_operation_duration_seconds",
+    "Latency of remote operations such as MinIO PUTs, arXiv API pages and PDF fetches.",
+    OPERATION_LABELS,
+)
+OPERATION_IN_FLIGHT = REGISTRY.gauge(
+    "ingestion_operation_in_flight", "Remote operations currently in progress.", OPERATION_LABELS
+)
+OPERATION_ERRORS = REGISTRY.counter(
+    "ingestion_operation_errors_total", "Remote operations that failed.", OPERATION_LABELS
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "ingestion_cache_lookups_total",
+    "Local download cache lookups, by result (hit or miss).",
+    ("bucket", "result"),
+)
+
+
+def current_labels() -> Dict[str, str]:
+    return _labels.get()
+
+
+@contextmanager
+def metric_labels(**labels: str) -> Iterator[None]:
+    """Add ``labels`` (e.g. ``job``, ``source``) to metrics recorded in this context."""
+    token = _labels.set({**_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+@dataclass
+class Operation:
+    failed: bool = False
+
+
+@contextmanager
+def track_operation(operation: str, target: str = "") -> Iterator[Operation]:
+    """Time one remote call; it counts as an error if it raises or sets ``failed``."""
+    context = current_labels()
+    labels = {
+        "job": context.get("job", ""),
+        "source": context.get("source", ""),
+        "operation": operation,
+        "target": target,
+    }
+    in_flight = OPERATION_IN_FLIGHT.labels(**labels)
+    handle = Operation()
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        yield handle
+    except BaseException:
+        handle.failed = True
+        raise
+    finally:
+        in_flight.dec()
+        OPERATION_SECONDS.labels(**labels).observe(time.perf_counter() - started)
+        if handle.failed:
+            OPERATION_ERRORS.labels(**labels).inc()
@@ -0,0 +1,271 @@
+"""A local disk cache for MinIO objects, keyed by bucket, object name and ETag.
+
+Entries are plain files named after a digest of ``bucket/object`` and the object's ETag, so
+a changed object is simply a different entry. A lookup revalidates through the session's
+``stat_object``, which is itself cached for ``MINIO_CACHE_TTL`` seconds, so repeat reads
+within that window make no request at all and later ones cost a single HEAD.
+
+The cache holds at most ``max_bytes``; least recently used entries are evicted first. Hits
+touch the file's mtime, so several processes sharing the directory agree on recency when
+they scan it at start-up. Each process tracks the size of what it has seen, so the budget
+is approximate when processes share a directory.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, List, Tuple
+
+from minio.error import S3Error
+
+from core.exceptions.storage_error import StorageError
+from infrastructure.logging.logger import PER_OBJECT, get_logger
+from infrastructure.metrics.instruments import CACHE_LOOKUPS, track_operation
+from infrastructure.minio.client import get_minio_settings, get_storage_session
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+LOCK_STRIPES = 64
+PARTIAL_SUFFIX = ".part"
+
+
+def _digest(bucket: str, object_name: str) -> str:
+    return hashlib.sha256(f"{bucket}/{object_name}".encode()).hexdigest()
+
+
+def _etag_slug(etag: str) -> str:
+    return re.sub(r"[^A-Za-z0-9-]", "", etag) or "none"
+
+
+class ObjectCache:
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[Path, int]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # Concurrent misses on one object wait for a single download.
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._scan()
+
+    def _scan(self) -> None:
+        entries: List[Tuple[float, Path, int]] = []
+        for path in self.root.glob("*/*"):
+            if path.name.endswith(PARTIAL_SUFFIX):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(entries):
+            self._entries[path] = size
+            self._size += size
+        self._evict()
+
+    def path_for(self, bucket: str, object_name: str, etag: str) -> Path:
+        digest = _digest(bucket, object_name)
+        return self.root / digest[:2] / f"{digest}.{_etag_slug(etag)}"
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    # -- bookkeeping -----------------------------------------------------------------------
+
+    def _touch(self, path: Path) -> bool:
+        """Mark ``path`` as just used; False when it is no longer on disk."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self._forget(path)
+            return False
+        with self._lock:
+            if path in self._entries:
+                self._entries.move_to_end(path)
+            else:
+                size = path.stat().st_size
+                self._entries[path] = size
+                self._size += size
+        return True
+
+    def _forget(self, path: Path) -> None:
+        with self._lock:
+            self._size -= self._entries.pop(path, 0)
+
+    def _add(self, path: Path, size: int) -> None:
+        with self._lock:
+            self._size += size - self._entries.pop(path, 0)
+            self._entries[path] = size
+        self._evict(keep=path)
+
+    def _evict(self, keep: Path | None = None) -> None:
+        victims: List[Path] = []
+        with self._lock:
+            for path in list(self._entries):
+                if self._size <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                self._size -= self._entries.pop(path)
+                victims.append(path)
+        for path in victims:
+            path.unlink(missing_ok=True)
+            logger.debug("Evicted %s from the download cache", path.name)
+
+    def _drop_other_versions(self, path: Path) -> None:
+        digest = path.name.split(".", 1)[0]
+        for stale in path.parent.glob(f"{digest}.*"):
+            if stale != path and not stale.name.endswith(PARTIAL_SUFFIX):
+                self._forget(stale)
+                stale.unlink(missing_ok=True)
+
+    # -- reads -----------------------------------------------------------------------------
+
+    def _download(self, bucket: str, object_name: str, etag: str, path: Path) -> int:
+        partial = path.with_name(
+            f"{path.name}.{os.getpid()}.{threading.get_ident()}{PARTIAL_SUFFIX}"
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        client = get_storage_session().client
+        size = 0
+        try:
+            with track_operation("minio_get", bucket):
+                # If-Match: never store bytes under an ETag they do not belong to.
+                response = client.get_object(
+                    bucket, object_name, request_headers={"If-Match": f'"{etag}"'}
+                )
+                try:
+                    with open(partial, "wb") as fp:
+                        for chunk in response.stream(CHUNK_SIZE):
+                            fp.write(chunk)
+                            size += len(chunk)
+                finally:
+                    response.close()
+                    response.release_conn()
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+        return size
+
+    def _fetch(self, bucket: str, object_name: str, etag: str) -> Path:
+        etag = etag.strip('"')
+        path = self.path_for(bucket, object_name, etag)
+        if self._touch(path):
+            CACHE_LOOKUPS.labels(bucket=bucket, result="hit").inc()
+            return path
+        with self._stripes[hash(path) % LOCK_STRIPES]:
+            # Another thread may have fetched it while this one waited.
+            if self._touch(path):
+                CACHE_LOOKUPS.labels(bucket=bucket, result="hit").inc()
+                return path
+            CACHE_LOOKUPS.labels(bucket=bucket, result="miss").inc()
+            size = self._download(bucket, object_name, etag, path)
+            self._drop_other_versions(path)
+            self._add(path, size)
+        logger.info("Cached %s/%s (%d bytes)", bucket, object_name, size, extra=PER_OBJECT)
+        return path
+
+    def _etag(self, bucket: str, object_name: str) -> str:
+        stat = get_storage_session().stat_object(bucket, object_name)
+        if stat is None:
+            raise StorageError(f"{bucket}/{object_name} does not exist")
+        return stat.etag
+
+    def fetch(self, bucket: str, object_name: str) -> Path:
+        """Return a local copy of the current version of the object; treat it as read-only.
+
+        The file can be evicted as soon as another fetch needs the room, so open it straight
+        away, or use ``open``, which returns a handle that stays readable after eviction.
+        """
+        try:
+            try:
+                return self._fetch(bucket, object_name, self._etag(bucket, object_name))
+            except S3Error as exc:
+                if exc.code != "PreconditionFailed":
+                    raise
+                # The object changed since its stat was cached.
+                get_storage_session().invalidate(bucket, object_name)
+                return self._fetch(bucket, object_name, self._etag(bucket, object_name))
+        except S3Error as exc:
+            logger.exception("Failed to download %s/%s: %s", bucket, object_name, exc)
+            raise StorageError(str(exc)) from exc
+
+    def open(self, bucket: str, object_name: str) -> BinaryIO:
+        """Open the cached copy of the object, fetching it again if it was evicted meanwhile."""
+        for _ in range(2):
+            path = self.fetch(bucket, object_name)
+            try:
+                return open(path, "rb")
+            except FileNotFoundError:
+                self._forget(path)
+        raise StorageError(f"{bucket}/{object_name} was evicted from the cache while opening it")
+
+    def copy_to(self, bucket: str, object_name: str, destination: Path) -> Path:
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with self.open(bucket, object_name) as source, open(destination, "wb") as target:
+            shutil.copyfileobj(source, target, CHUNK_SIZE)
+        return destination
+
+    def prefetch(self, bucket: str, prefix: str = "", workers: int = 8) -> List[Path]:
+        """Fetch every object under ``prefix`` in parallel, up to the cache's size budget.
+
+        Uses the ETags from the listing, so no object is stat'ed on its own.
+        """
+        client = get_storage_session().client
+        planned = 0
+        futures = []
+        with ThreadPoolExecutor(workers, thread_name_prefix="cache-prefetch") as pool:
+            try:
+                for item in client.list_objects(bucket, prefix=prefix, recursive=True):
+                    if item.is_dir:
+                        continue
+                    planned += item.size or 0
+                    if planned > self.max_bytes:
+                        logger.warning(
+                            "Stopped prefetching %s/%s at the cache budget of %d bytes",
+                            bucket,
+                            prefix,
+                            self.max_bytes,
+                        )
+                        break
+                    futures.append(
+                        pool.submit(
+                            contextvars.copy_context().run,
+                            self._fetch,
+                            bucket,
+                            item.object_name,
+                            item.etag,
+                        )
+                    )
+            except S3Error as exc:
+                raise StorageError(f"Could not list {bucket}/{prefix}: {exc}") from exc
+            paths: List[Path] = []
+            for future in futures:
+                try:
+                    paths.append(future.result())
+                except (S3Error, OSError) as exc:
+                    logger.warning("Could not prefetch an object from %s: %s", bucket, exc)
+        logger.info("Prefetched %d objects from %s/%s", len(paths), bucket, prefix)
+        return paths
+
+
+@lru_cache()
+def get_object_cache() -> ObjectCache | None:
+    """The process-wide cache from ``MINIO_DOWNLOAD_CACHE_DIR``, or None when it is unset."""
+    settings = get_minio_settings()
+    if not settings.download_cache_dir or settings.download_cache_size <= 0:
+        return None
+    return ObjectCache(Path(settings.download_cache_dir), settings.download_cache_size)
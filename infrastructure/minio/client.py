@@ -1,14 +1,25 @@
 from __future__ import annotations
 
 import os
+import socket
+import threading
+import time
 from dataclasses import dataclass
 from functools import lru_cache
+from typing import Any, Dict, Hashable, Tuple
 
+import certifi
+import urllib3
 from dotenv import load_dotenv
 from minio import Minio
+from minio.datatypes import Object
+from minio.error import S3Error
+from urllib3.connection import HTTPConnection
 
 load_dotenv("/home/rhadamanthys/Data-Handler/.env")
 
+_MISSING_OBJECT_CODES = {"NoSuchKey", "NoSuchObject", "NoSuchBucket", "ResourceNotFound"}
+
 
 @dataclass(frozen=True)
 class MinioSettings:
@@ -17,6 +28,17 @@ class MinioSettings:
     secret_key: str
     region: str | None = None
     secure: bool = False
+    upload_workers: int = 8
+    part_size: int = 16 * 1024 * 1024
+    pool_size: int = 32
+    connect_timeout: float = 10.0
+    read_timeout: float = 300.0
+    keepalive: bool = True
+    cache_ttl: float = 300.0
+    put_retries: int = 4
+    # Local disk cache for downloads; off unless a directory is set.
+    download_cache_dir: str | None = None
+    download_cache_size: int = 10 * 1024 * 1024 * 1024
 
 
 def _env_bool(value: str | None, default: bool = False) -> bool:
@@ -25,9 +47,20 @@ def _env_bool(value: str | None, default: bool = False) -> bool:
     return value.lower() in {"1", "true", "yes", "on"}
 
 
+def _env_int(value: str | None, default: int) -> int:
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
+def _env_float(value: str | None, default: float) -> float:
+    if value is None or not value.strip():
+        return default
+    return float(value)
+
+
 @lru_cache()
 def get_minio_settings() -> MinioSettings:
-    print(os.getenv("MINIO_ENDPOINT"))
     endpoint = os.getenv("MINIO_ENDPOINT")
     access_key = os.getenv("MINIO_ROOT_USER")
     secret_key = os.getenv("MINIO_ROOT_PASSWORD")
@@ -35,15 +68,141 @@ def get_minio_settings() -> MinioSettings:
     secure = _env_bool(os.getenv("MINIO_USE_SSL"), default=False)
     if not endpoint or not access_key or not secret_key:
         raise RuntimeError("MINIO_ENDPOINT, MINIO_ACCESS_KEY, and MINIO_SECRET_KEY must be set")
-    return MinioSettings(endpoint, access_key, secret_key,secure)
+    upload_workers = _env_int(os.getenv("MINIO_UPLOAD_WORKERS"), 8)
+    return MinioSettings(
+        endpoint,
+        access_key,
+        secret_key,
+        region=region,
+        secure=secure,
+        upload_workers=upload_workers,
+        part_size=_env_int(os.getenv("MINIO_PART_SIZE_MB"), 16) * 1024 * 1024,
+        # fput_object runs up to 3 part uploads per object, so size the pool for that.
+        pool_size=_env_int(os.getenv("MINIO_POOL_SIZE"), max(32, upload_workers * 4)),
+        connect_timeout=_env_float(os.getenv("MINIO_CONNECT_TIMEOUT"), 10.0),
+        read_timeout=_env_float(os.getenv("MINIO_READ_TIMEOUT"), 300.0),
+        keepalive=_env_bool(os.getenv("MINIO_KEEPALIVE"), default=True),
+        cache_ttl=_env_float(os.getenv("MINIO_CACHE_TTL"), 300.0),
+        put_retries=_env_int(os.getenv("MINIO_PUT_RETRIES"), 4),
+        download_cache_dir=os.getenv("MINIO_DOWNLOAD_CACHE_DIR") or None,
+        download_cache_size=_env_int(os.getenv("MINIO_DOWNLOAD_CACHE_MB"), 10240) * 1024 * 1024,
+    )
+
+
+def _build_http_client(settings: MinioSettings) -> urllib3.PoolManager:
+    socket_options = list(HTTPConnection.default_socket_options)
+    if settings.keepalive:
+        socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60))
+    return urllib3.PoolManager(
+        maxsize=settings.pool_size,
+        timeout=urllib3.util.Timeout(
+            connect=settings.connect_timeout, read=settings.read_timeout
+        ),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        # Connection errors only: 5xx responses surface as ServerError for put_policy and
+        # the endpoint's circuit breaker, instead of being retried unseen underneath them.
+        retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[]),
+        socket_options=socket_options,
+    )
+
+
+class _TTLCache:
+    """Small thread-safe map whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, None
+            return True, value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+
+class StorageSession:
+    """Process-wide MinIO client with a sized connection pool and a metadata cache.
+
+    Bucket existence and ``stat_object`` results are cached for ``settings.cache_ttl``
+    seconds. Writers call ``invalidate`` after changing an object so readers never see
+    stale stats from this process.
+    """
+
+    def __init__(self, settings: MinioSettings, client: Minio | None = None) -> None:
+        self.settings = settings
+        self.client = client or Minio(
+            settings.endpoint,
+            access_key=settings.access_key,
+            secret_key=settings.secret_key,
+            secure=settings.secure,
+            region=settings.region,
+            http_client=_build_http_client(settings),
+        )
+        self._buckets = _TTLCache(settings.cache_ttl)
+        self._stats = _TTLCache(settings.cache_ttl)
+
+    def bucket_exists(self, bucket: str) -> bool:
+        hit, exists = self._buckets.get(bucket)
+        if hit:
+            return exists
+        exists = self.client.bucket_exists(bucket)
+        self._buckets.set(bucket, exists)
+        return exists
+
+    def mark_bucket(self, bucket: str, exists: bool = True) -> None:
+        self._buckets.set(bucket, exists)
+
+    def stat_object(self, bucket: str, object_name: str) -> Object | None:
+        """Return the object's stat, or None when it does not exist."""
+        key = (bucket, object_name)
+        hit, stat = self._stats.get(key)
+        if hit:
+            return stat
+        try:
+            stat = self.client.stat_object(bucket, object_name)
+        except S3Error as exc:
+            if exc.code not in _MISSING_OBJECT_CODES:
+                raise
+            stat = None
+        self._stats.set(key, stat)
+        return stat
+
+    def invalidate(self, bucket: str, object_name: str | None = None) -> None:
+        if object_name is not None:
+            self._stats.invalidate((bucket, object_name))
+            return
+        self._buckets.invalidate(bucket)
+        self._stats.invalidate_where(lambda key: key[0] == bucket)
 
 
 @lru_cache()
+def get_storage_session() -> StorageSession:
+    return StorageSession(get_minio_settings())
+
+
 def get_minio_client() -> Minio:
-    settings = get_minio_settings()
-    return Minio(
-        settings.endpoint,
-        access_key=settings.access_key,
-        secret_key=settings.secret_key,
-        secure=settings.secure,
-    )
+    return get_storage_session().client
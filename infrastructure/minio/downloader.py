@@ -5,19 +5,28 @@ from pathlib import Path
 from minio.error import S3Error
 
 from core.exceptions.storage_error import StorageError
-from infrastructure.logging.logger import get_logger
-from infrastructure.minio.client import get_minio_client
+from infrastructure.logging.logger import PER_OBJECT, get_logger
+from infrastructure.metrics.instruments import track_operation
+from infrastructure.minio.cache import get_object_cache
+from infrastructure.minio.client import get_storage_session
 
 logger = get_logger(__name__)
 
 
 def download_file(bucket: str, object_name: str, destination: Path) -> Path:
-    client = get_minio_client()
+    """Download an object to ``destination``, through the local download cache when enabled."""
+    cache = get_object_cache()
+    if cache is not None:
+        return cache.copy_to(bucket, object_name, destination)
+    client = get_storage_session().client
     destination = Path(destination)
     destination.parent.mkdir(parents=True, exist_ok=True)
     try:
-        client.fget_object(bucket, object_name, str(destination))
-        logger.info("Downloaded %s/%s to %s", bucket, object_name, destination)
+        with track_operation("minio_get", bucket):
+            client.fget_object(bucket, object_name, str(destination))
+        logger.info(
+            "Downloaded %s/%s to %s", bucket, object_name, destination, extra=PER_OBJECT
+        )
     except S3Error as exc:
         logger.exception("Failed to download %s/%s: %s", bucket, object_name, exc)
         raise StorageError(str(exc)) from exc
@@ -0,0 +1,4 @@
+"""Multipart sizing shared by the uploaders and the CLI, importable without the MinIO SDK."""
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3 rejects smaller non-final parts.
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import threading
+from dataclasses import dataclass
+from typing import Dict
+
+from minio.error import S3Error
+
+from core.exceptions.storage_error import StorageError
+from infrastructure.logging.logger import get_logger
+from infrastructure.minio import buckets
+from infrastructure.minio.client import get_storage_session
+
+logger = get_logger(__name__)
+
+MANIFEST_PREFIX = "_manifests"
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    size: int
+    sha256: str
+
+
+class UploadManifest:
+    """Record of every object uploaded under one bucket/prefix, keyed by object name.
+
+    The manifest is a single gzipped JSON-lines object under ``_manifests/`` in the same
+    bucket, so loading it costs one GET no matter how many objects the prefix holds.
+    Concurrent writers to the same destination are last-save-wins; a lost entry only
+    means the object is uploaded again on the next run.
+    """
+
+    def __init__(
+        self, bucket: str, prefix: str = "", entries: Dict[str, ManifestEntry] | None = None
+    ) -> None:
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._entries: Dict[str, ManifestEntry] = entries or {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @property
+    def object_name(self) -> str:
+        return f"{MANIFEST_PREFIX}/{self.prefix or '_root'}.jsonl.gz"
+
+    @classmethod
+    def load(cls, bucket: str, prefix: str = "") -> "UploadManifest":
+        manifest = cls(bucket, prefix)
+        client = get_storage_session().client
+        try:
+            response = client.get_object(bucket, manifest.object_name)
+        except S3Error as exc:
+            if exc.code in {"NoSuchKey", "NoSuchBucket"}:
+                return manifest
+            raise StorageError(str(exc)) from exc
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(response.read())) as fp:
+                for line in fp:
+                    record = json.loads(line)
+                    manifest._entries[record["object"]] = ManifestEntry(
+                        record["size"], record["sha256"]
+                    )
+        finally:
+            response.close()
+            response.release_conn()
+        logger.info(
+            "Loaded manifest %s/%s (%d entries)", bucket, manifest.object_name, len(manifest)
+        )
+        return manifest
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, object_name: str) -> ManifestEntry | None:
+        return self._entries.get(object_name)
+
+    def record(self, object_name: str, size: int, sha256: str) -> None:
+        entry = ManifestEntry(size, sha256)
+        with self._lock:
+            if self._entries.get(object_name) != entry:
+                self._entries[object_name] = entry
+                self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            buffer = io.BytesIO()
+            with gzip.GzipFile(fileobj=buffer, mode="wb") as fp:
+                for name, entry in self._entries.items():
+                    line = {"object": name, "size": entry.size, "sha256": entry.sha256}
+                    fp.write(json.dumps(line, separators=(",", ":")).encode("utf-8") + b"\n")
+            payload = buffer.getvalue()
+            self._dirty = False
+        buckets.ensure_bucket(self.bucket)
+        session = get_storage_session()
+        try:
+            session.client.put_object(
+                self.bucket,
+                self.object_name,
+                io.BytesIO(payload),
+                len(payload),
+                content_type="application/gzip",
+            )
+        except S3Error as exc:
+            self._dirty = True
+            raise StorageError(str(exc)) from exc
+        session.invalidate(self.bucket, self.object_name)
+        logger.info("Saved manifest %s/%s (%d entries)", self.bucket, self.object_name, len(self))
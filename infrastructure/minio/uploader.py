@@ -1,40 +1,280 @@
 from __future__ import annotations
 
+import contextvars
+import functools
+import hashlib
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterable, List, Tuple, Union
 
-from minio.error import S3Error
+import urllib3
+from minio.error import S3Error, ServerError
 
-from core.exceptions.storage_error import ObjectUploadError
-from infrastructure.logging.logger import get_logger
+from core.exceptions.retry_error import CircuitOpenError
+from core.exceptions.storage_error import ObjectUploadError, PartialUploadError
+from core.utils.retry import RetryPolicy
+from core.utils.streams import CountingReader, stream_sha256
+from core.utils.throughput import ThroughputMeter
+from infrastructure.logging.logger import PER_OBJECT, get_logger
+from infrastructure.metrics.instruments import track_operation
 from infrastructure.minio import buckets
-from infrastructure.minio.client import get_minio_client
+from infrastructure.minio.client import get_minio_settings, get_storage_session
+from infrastructure.minio.limits import DEFAULT_PART_SIZE, MIN_PART_SIZE
+from infrastructure.minio.manifest import UploadManifest
 
 logger = get_logger(__name__)
 
+_TRANSIENT_S3_CODES = {"SlowDown", "InternalError", "ServiceUnavailable", "RequestTimeout"}
+_PUT_ERRORS = (S3Error, ServerError, urllib3.exceptions.HTTPError, CircuitOpenError)
+# Reading a source can fail on its own, e.g. a corrupt or truncated zip archive member.
+_SOURCE_ERRORS = (OSError, EOFError, zipfile.BadZipFile, zlib.error)
+
+
+@dataclass(frozen=True)
+class StreamSource:
+    """A re-openable byte source of known size, such as a member of a zip archive."""
+
+    open: Callable[[], BinaryIO]
+    size: int
+    name: str
+
+
+UploadSource = Union[Path, StreamSource]
+
+
+@dataclass(frozen=True)
+class UploadResult:
+    object_name: str
+    source_path: Path
+    size: int = 0
+    error: str | None = None
+    skipped: bool = False
+    sha256: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _transient(exc: BaseException) -> bool:
+    return not isinstance(exc, S3Error) or exc.code in _TRANSIENT_S3_CODES
+
+
+def put_policy() -> RetryPolicy:
+    """Retry transient S3 errors and dropped connections, behind the endpoint's breaker."""
+    settings = get_minio_settings()
+    return RetryPolicy(
+        retry_on=(S3Error, ServerError, urllib3.exceptions.HTTPError),
+        attempts=settings.put_retries,
+        host=settings.endpoint,
+        when=_transient,
+    )
+
+
+def _timed_put(bucket: str, put: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    with track_operation("minio_put", bucket):
+        return put(*args, **kwargs)
+
 
 def upload_file(bucket: str, source_path: Path, object_name: str, content_type: str | None = None) -> None:
-    client = get_minio_client()
+    session = get_storage_session()
     buckets.ensure_bucket(bucket)
     try:
-        client.fput_object(bucket, object_name, str(source_path), content_type=content_type)
-        logger.info("Uploaded %s to bucket=%s as %s", source_path, bucket, object_name)
-    except S3Error as exc:
+        put_policy().call(
+            _timed_put,
+            bucket,
+            session.client.fput_object,
+            bucket,
+            object_name,
+            str(source_path),
+            content_type=content_type,
+        )
+        session.invalidate(bucket, object_name)
+        logger.info(
+            "Uploaded %s to bucket=%s as %s", source_path, bucket, object_name, extra=PER_OBJECT
+        )
+    except _PUT_ERRORS as exc:
         logger.exception("Failed to upload %s to MinIO: %s", source_path, exc)
         raise ObjectUploadError(str(exc)) from exc
 
 
+def upload_many(
+    bucket: str,
+    items: Iterable[Tuple[UploadSource, str]],
+    max_workers: int | None = None,
+    part_size: int | None = None,
+    content_type: str | None = None,
+    manifest: UploadManifest | None = None,
+) -> List[UploadResult]:
+    """Upload ``(source, object_name)`` pairs concurrently.
+
+    A source is a local path or a ``StreamSource``. The bucket is checked once for the whole
+    batch. A failed object does not stop the others; inspect the returned results, or pass
+    them to ``raise_for_failures``.
+
+    With a ``manifest``, sources whose size and sha256 match the recorded entry are skipped.
+    New sources are hashed while they upload, so they are still read only once.
+    """
+    settings = get_minio_settings()
+    max_workers = max_workers or settings.upload_workers
+    part_size = max(part_size or settings.part_size, MIN_PART_SIZE)
+    content_type = content_type or "application/octet-stream"
+    session = get_storage_session()
+    buckets.ensure_bucket(bucket)
+    policy = put_policy()
+    meter = ThroughputMeter(unit="objects")
+    skipped = ThroughputMeter(unit="objects")
+
+    def _attempt(
+        opener: Callable[[], BinaryIO], object_name: str, size: int, hashed: bool
+    ) -> str | None:
+        with opener() as fp, track_operation("minio_put", bucket):
+            reader = CountingReader(fp, hashlib.sha256() if hashed else None)
+            session.client.put_object(
+                bucket, object_name, reader, size, content_type=content_type, part_size=part_size
+            )
+        return reader.hexdigest() if hashed else None
+
+    def _put(
+        opener: Callable[[], BinaryIO], object_name: str, size: int, hashed: bool
+    ) -> str | None:
+        # Each attempt reopens the source, so a retried upload is re-read (and re-hashed).
+        return policy.call(_attempt, opener, object_name, size, hashed)
+
+    def _upload(item: Tuple[UploadSource, str]) -> UploadResult:
+        source, object_name = item
+        if isinstance(source, StreamSource):
+            opener, label = source.open, Path(source.name)
+        else:
+            label = Path(source)
+            opener = functools.partial(open, label, "rb")
+        try:
+            size = source.size if isinstance(source, StreamSource) else label.stat().st_size
+            sha256 = None
+            if manifest is None:
+                _put(opener, object_name, size, hashed=False)
+            else:
+                entry = manifest.get(object_name)
+                if entry is not None and entry.size == size:
+                    with opener() as fp:
+                        sha256 = stream_sha256(fp)
+                    if sha256 == entry.sha256:
+                        skipped.record(size)
+                        return UploadResult(
+                            object_name, label, size=size, skipped=True, sha256=sha256
+                        )
+                    _put(opener, object_name, size, hashed=False)
+                else:
+                    sha256 = _put(opener, object_name, size, hashed=True)
+                manifest.record(object_name, size, sha256)
+            session.invalidate(bucket, object_name)
+        except _PUT_ERRORS + _SOURCE_ERRORS as exc:
+            logger.error("Failed to upload %s to bucket=%s: %s", label, bucket, exc)
+            meter.record_failure()
+            return UploadResult(object_name, label, error=str(exc))
+        meter.record(size)
+        return UploadResult(object_name, label, size=size, sha256=sha256)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="minio-upload") as pool:
+        futures = [pool.submit(contextvars.copy_context().run, _upload, item) for item in items]
+        results = [future.result() for future in futures]
+    logger.info(
+        "Uploaded batch to bucket=%s: %s; %d unchanged objects skipped",
+        bucket,
+        meter.summary(),
+        skipped.items,
+    )
+    return results
+
+
+def raise_for_failures(results: List[UploadResult]) -> None:
+    failed = [result.object_name for result in results if not result.ok]
+    if failed:
+        raise PartialUploadError(failed, total=len(results))
+
+
 def upload_from_memory(bucket: str, object_name, text_stream, text_bytes, content_type) -> None:
-    client = get_minio_client()
+    session = get_storage_session()
     buckets.ensure_bucket(bucket)
+    start = text_stream.tell()
+
+    def _attempt() -> None:
+        text_stream.seek(start)
+        with track_operation("minio_put", bucket):
+            session.client.put_object(
+                bucket_name=bucket,
+                object_name=object_name,
+                data=text_stream,
+                length=len(text_bytes),
+                content_type=content_type
+            )
+
     try:
-        client.put_object(
-            bucket_name=bucket,
-            object_name=object_name,
-            data=text_stream,
-            length=len(text_bytes),
-            content_type=content_type
-        )
-        logger.info("Uploaded to bucket=%s as %s", bucket, object_name)
-    except S3Error as exc:
+        put_policy().call(_attempt)
+        session.invalidate(bucket, object_name)
+        logger.info("Uploaded to bucket=%s as %s", bucket, object_name, extra=PER_OBJECT)
+    except _PUT_ERRORS as exc:
         logger.exception("Failed to upload to MinIO: %s", exc)
         raise ObjectUploadError(str(exc)) from exc
+
+
+def upload_stream(
+    bucket: str,
+    object_name: str,
+    stream: BinaryIO,
+    length: int = -1,
+    content_type: str | None = None,
+    part_size: int = DEFAULT_PART_SIZE,
+    parallel_parts: int = 1,
+) -> int:
+    """Upload a readable stream without staging it on disk.
+
+    When ``length`` is unknown (-1) the stream is sent as a multipart upload and at most
+    ``parallel_parts + 1`` parts of ``part_size`` bytes are held in memory at once.
+    Returns the number of bytes read from ``stream``.
+
+    Only seekable streams are retried; a one-shot stream such as an HTTP body is sent once,
+    and the caller retries from its source.
+    """
+    session = get_storage_session()
+    buckets.ensure_bucket(bucket)
+    policy = put_policy()
+    seekable = stream.seekable() if hasattr(stream, "seekable") else False
+    start = stream.tell() if seekable else 0
+    if not seekable:
+        policy = replace(policy, attempts=1)
+    reader = CountingReader(stream)
+
+    def _attempt() -> None:
+        nonlocal reader
+        if seekable:
+            stream.seek(start)
+            reader = CountingReader(stream)
+        with track_operation("minio_put", bucket):
+            session.client.put_object(
+                bucket,
+                object_name,
+                reader,
+                length,
+                content_type=content_type or "application/octet-stream",
+                part_size=max(part_size, MIN_PART_SIZE),
+                num_parallel_uploads=parallel_parts,
+            )
+
+    try:
+        policy.call(_attempt)
+        session.invalidate(bucket, object_name)
+        logger.info(
+            "Streamed %d bytes to bucket=%s as %s",
+            reader.bytes_read,
+            bucket,
+            object_name,
+            extra=PER_OBJECT,
+        )
+    except _PUT_ERRORS as exc:
+        logger.exception("Failed to stream %s to MinIO: %s", object_name, exc)
+        raise ObjectUploadError(str(exc)) from exc
+    return reader.bytes_read
@@ -1 +1,120 @@
-# Tokens, OAuth2 if needed
+"""httpx authentication for API sources, with OAuth2 tokens cached across requests and jobs."""
+
+from __future__ import annotations
+
+import base64
+import os
+import threading
+import time
+from typing import Dict, Generator, Hashable, Optional, Tuple
+
+import httpx
+
+from core.exceptions.ingestion_error import IngestionError
+from core.models.datasource import ApiAuth
+
+# Tokens are refreshed this many seconds before the server says they expire.
+EXPIRY_MARGIN = 60.0
+
+
+class TokenCache:
+    """Access tokens by (token URL, client, scope), kept until just before they expire."""
+
+    def __init__(self) -> None:
+        self._tokens: Dict[Hashable, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            entry = self._tokens.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def put(self, key: Hashable, token: str, expires_in: float) -> None:
+        with self._lock:
+            self._tokens[key] = (token, time.monotonic() + max(expires_in - EXPIRY_MARGIN, 0.0))
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._tokens.pop(key, None)
+
+
+TOKENS = TokenCache()
+
+
+def _secret(env_name: str | None, what: str) -> str:
+    value = os.getenv(env_name) if env_name else None
+    if not value:
+        raise IngestionError(f"API {what} must be set in the environment variable {env_name!r}")
+    return value
+
+
+class OAuth2ClientCredentials(httpx.Auth):
+    """Client credentials grant. A 401 drops the cached token and retries once with a new one."""
+
+    requires_response_body = True
+
+    def __init__(self, auth: ApiAuth, cache: TokenCache = TOKENS) -> None:
+        if not auth.token_url:
+            raise IngestionError("oauth2 API auth needs a token_url")
+        self.token_url = auth.token_url
+        self.client_id = _secret(auth.client_id_env, "client id")
+        self.client_secret = _secret(auth.client_secret_env, "client secret")
+        self.scope = auth.scope
+        self.cache = cache
+        self.key = (self.token_url, self.client_id, self.scope)
+
+    def _token_request(self) -> httpx.Request:
+        data = {"grant_type": "client_credentials"}
+        if self.scope:
+            data["scope"] = self.scope
+        credentials = f"{self.client_id}:{self.client_secret}".encode("utf-8")
+        basic = base64.b64encode(credentials).decode("ascii")
+        return httpx.Request(
+            "POST", self.token_url, data=data, headers={"Authorization": f"Basic {basic}"}
+        )
+
+    def _store(self, response: httpx.Response) -> str:
+        if response.status_code != 200:
+            raise IngestionError(
+                f"Token request to {self.token_url} failed: HTTP {response.status_code}"
+            )
+        payload = response.json()
+        token = payload["access_token"]
+        self.cache.put(self.key, token, float(payload.get("expires_in", 3600)))
+        return token
+
+    def auth_flow(self, request: httpx.Request) -> Generator[httpx.Request, httpx.Response, None]:
+        token = self.cache.get(self.key)
+        if token is None:
+            token = self._store((yield self._token_request()))
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+        if response.status_code == 401:
+            self.cache.invalidate(self.key)
+            token = self._store((yield self._token_request()))
+            request.headers["Authorization"] = f"Bearer {token}"
+            yield request
+
+
+class HeaderAuth(httpx.Auth):
+    def __init__(self, header: str, value: str) -> None:
+        self.header = header
+        self.value = value
+
+    def auth_flow(self, request: httpx.Request) -> Generator[httpx.Request, httpx.Response, None]:
+        request.headers[self.header] = self.value
+        yield request
+
+
+def build_auth(auth: ApiAuth) -> httpx.Auth | None:
+    if auth.kind == "none":
+        return None
+    if auth.kind == "bearer":
+        return HeaderAuth("Authorization", f"Bearer {_secret(auth.token_env, 'token')}")
+    if auth.kind == "api_key":
+        return HeaderAuth(auth.header, _secret(auth.token_env, "key"))
+    if auth.kind == "oauth2":
+        return OAuth2ClientCredentials(auth)
+    raise IngestionError(f"Unsupported API auth kind '{auth.kind}'")
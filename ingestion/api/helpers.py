@@ -1 +1,27 @@
-# API helpers
+from __future__ import annotations
+
+from typing import Any, List
+
+
+def dig(payload: Any, path: str | None) -> Any:
+    """Value at a dotted ``path`` such as ``data.items`` (list indexes allowed), or None."""
+    if not path:
+        return payload
+    for part in path.split("."):
+        if isinstance(payload, dict):
+            payload = payload.get(part)
+        elif isinstance(payload, list) and part.lstrip("-").isdigit():
+            index = int(part)
+            payload = payload[index] if -len(payload) <= index < len(payload) else None
+        else:
+            return None
+        if payload is None:
+            return None
+    return payload
+
+
+def records_in(payload: Any, path: str | None) -> List[Any]:
+    records = dig(payload, path)
+    if records is None:
+        return []
+    return records if isinstance(records, list) else [records]
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ApiFetchSettings:
+    """Client tuning for API sources; pagination and output format come from the source."""
+
+    # Pages requested ahead of the one being written, where the pagination style allows it.
+    prefetch: int = 4
+    max_connections: int = 16
+    timeout: float = 30.0
+    retries: int = 4
+    # Needs the ``h2`` package (``httpx[http2]``); without it requests fall back to HTTP/1.1.
+    http2: bool = True
+    requests_per_second: float | None = None
+    user_agent: str = "data-ingestion-api/1.0"
@@ -0,0 +1,201 @@
+"""Batch API records into NDJSON or Parquet objects of roughly a target size.
+
+Sizes are measured as encoded NDJSON bytes. A Parquet object therefore comes out smaller
+than the target, because it is columnar and compressed.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Iterable, List
+
+from core.exceptions.ingestion_error import IngestionError
+from infrastructure.db.metadata_store import RunLedger
+from infrastructure.minio.uploader import upload_stream
+
+# NDJSON batches spill from memory to a temporary file past this size.
+SPOOL_BYTES = 8 * 1024 * 1024
+
+
+def _encode(record: Any) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class BatchWriter(ABC):
+    extension = ""
+    content_type = "application/octet-stream"
+
+    def __init__(
+        self,
+        bucket: str,
+        key_prefix: str,
+        target_bytes: int,
+        ledger: RunLedger | None = None,
+    ) -> None:
+        self.bucket = bucket
+        self.key_prefix = key_prefix.rstrip("/")
+        self.target_bytes = max(target_bytes, 1)
+        self.ledger = ledger
+        self.records = 0
+        self.objects: List[str] = []
+        self._pending_records = 0
+        self._pending_bytes = 0
+
+    def _object_name(self) -> str:
+        name = f"part-{len(self.objects):05d}{self.extension}"
+        return f"{self.key_prefix}/{name}" if self.key_prefix else name
+
+    @abstractmethod
+    def _append(self, data: bytes, record: Any) -> None:
+        ...
+
+    @abstractmethod
+    def _payload(self) -> tuple[BinaryIO, int]:
+        """The pending batch as a readable stream positioned at 0, and its length."""
+
+    @abstractmethod
+    def _reset(self) -> None:
+        ...
+
+    def write(self, records: Iterable[Any]) -> None:
+        for record in records:
+            data = _encode(record)
+            self._append(data, record)
+            self._pending_records += 1
+            self._pending_bytes += len(data)
+            if self._pending_bytes >= self.target_bytes:
+                self.flush()
+
+    def flush(self) -> str | None:
+        if not self._pending_records:
+            return None
+        object_name = self._object_name()
+        stream, length = self._payload()
+        size = upload_stream(
+            self.bucket, object_name, stream, length=length, content_type=self.content_type
+        )
+        if self.ledger is not None:
+            self.ledger.record_object(self.bucket, object_name, size=size)
+        self.objects.append(object_name)
+        self.records += self._pending_records
+        self._pending_records = 0
+        self._pending_bytes = 0
+        self._reset()
+        return object_name
+
+    def close(self) -> List[str]:
+        self.flush()
+        return self.objects
+
+
+class NdjsonBatchWriter(BatchWriter):
+    extension = ".ndjson"
+    content_type = "application/x-ndjson"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+
+    def _append(self, data: bytes, record: Any) -> None:
+        self._buffer.write(data)
+
+    def _payload(self) -> tuple[BinaryIO, int]:
+        length = self._buffer.tell()
+        self._buffer.seek(0)
+        return self._buffer, length  # type: ignore[return-value]
+
+    def _reset(self) -> None:
+        self._buffer.close()
+        self._buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+
+    def close(self) -> List[str]:
+        objects = super().close()
+        self._buffer.close()
+        return objects
+
+
+class ParquetBatchWriter(BatchWriter):
+    """Needs the optional ``pyarrow`` package. The column types are inferred for each object.
+
+    Rows are converted to Arrow every ``ROW_GROUP_RECORDS`` records, so the pending batch is
+    held in columnar form instead of as Python objects. Chunks whose fields differ are unified,
+    and a missing field becomes null.
+    """
+
+    extension = ".parquet"
+    content_type = "application/vnd.apache.parquet"
+    ROW_GROUP_RECORDS = 10_000
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise IngestionError("Parquet output needs pyarrow: pip install pyarrow") from exc
+        super().__init__(*args, **kwargs)
+        self._rows: List[Any] = []
+        self._tables: List[Any] = []
+
+    def _convert_rows(self) -> None:
+        import pyarrow as pa
+
+        if not self._rows:
+            return
+        try:
+            self._tables.append(pa.Table.from_struct_array(pa.array(self._rows)))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError) as exc:
+            raise IngestionError(
+                f"Records for {self._object_name()} do not fit a Parquet schema ({exc}); "
+                "use ndjson output for this source"
+            ) from exc
+        self._rows = []
+
+    def _append(self, data: bytes, record: Any) -> None:
+        self._rows.append(record)
+        if len(self._rows) >= self.ROW_GROUP_RECORDS:
+            self._convert_rows()
+
+    def _payload(self) -> tuple[BinaryIO, int]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._convert_rows()
+        # pyarrow 14 replaced ``promote=True`` with ``promote_options``.
+        if int(pa.__version__.split(".")[0]) >= 14:
+            unify = {"promote_options": "default"}
+        else:
+            unify = {"promote": True}
+        try:
+            table = pa.concat_tables(self._tables, **unify)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as exc:
+            raise IngestionError(
+                f"Records for {self._object_name()} have conflicting field types ({exc}); "
+                "use ndjson output for this source"
+            ) from exc
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer, compression="zstd", row_group_size=self.ROW_GROUP_RECORDS)
+        length = buffer.tell()
+        buffer.seek(0)
+        return buffer, length
+
+    def _reset(self) -> None:
+        self._rows = []
+        self._tables = []
+
+
+WRITERS = {"ndjson": NdjsonBatchWriter, "parquet": ParquetBatchWriter}
+
+
+def open_writer(
+    output_format: str,
+    bucket: str,
+    key_prefix: str,
+    target_bytes: int,
+    ledger: RunLedger | None = None,
+) -> BatchWriter:
+    writer = WRITERS.get(output_format)
+    if writer is None:
+        raise IngestionError(f"Unsupported API output format '{output_format}'")
+    return writer(bucket, key_prefix, target_bytes, ledger=ledger)
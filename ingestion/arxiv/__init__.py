@@ -0,0 +1 @@
+# Arxiv ingestion module
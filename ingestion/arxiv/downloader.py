@@ -1,40 +1,93 @@
 from __future__ import annotations
 
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, List, Set, Tuple
 
 from core.exceptions.ingestion_error import IngestionError
+from core.exceptions.retry_error import CircuitOpenError, RetryableError
+from core.exceptions.storage_error import ObjectUploadError
 from core.models.datasource import ArxivDataSource
 from core.models.ingestion_job import IngestionJob
 from core.utils.file_utils import clean_dir, ensure_dir
-from infrastructure.logging.logger import get_logger
-from infrastructure.minio.uploader import upload_file
+from core.utils.rate_limit import TokenBucket, rate_limiter
+from core.utils.retry import RetryPolicy, parse_retry_after
+from core.utils.throughput import ThroughputMeter
+from infrastructure.db.metadata_store import (
+    HarvestCursor,
+    MetadataStore,
+    RunLedger,
+    get_metadata_store,
+)
+from infrastructure.logging.logger import PER_OBJECT, get_logger
+from infrastructure.metrics.instruments import track_operation
+from infrastructure.minio.downloader import download_file
+from infrastructure.minio.manifest import UploadManifest
+from infrastructure.minio.uploader import (
+    raise_for_failures,
+    upload_many,
+    upload_stream,
+)
+from ingestion.arxiv.extractor import TextExtractor, extract_pages
+from ingestion.arxiv.helpers import paper_id, pdf_url_for
+from ingestion.arxiv.settings import ArxivFetchSettings
+from ingestion.arxiv.shards import ShardWriter, shard_batch
 
 import feedparser
+from feedparser import FeedParserDict
 import requests
-import time
+from requests.adapters import HTTPAdapter
 import os
-import fitz # PyMuPDF
-import io
-from minio import Minio
-from minio.error import S3Error
-import PyPDF2
+import sys
+import tempfile
+from urllib.parse import urlparse
 
 logger = get_logger(__name__)
 
+CHUNK_SIZE = 256 * 1024
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = (RetryableError, requests.ConnectionError, requests.Timeout)
+# Errors after which a PDF is given up on; the paper is skipped rather than failing the job.
+PDF_ERRORS = (requests.RequestException, RetryableError, CircuitOpenError)
+# Runs that retry a skipped paper before an incremental harvest gives up on it.
+MAX_PAPER_ATTEMPTS = 5
+
+
+def build_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(pool_size, 1))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 class ArxivDownloader:
     CATEGORY = "cs.LG"
     MAX_RESULTS = 10          # arXiv allows up to 30k with multiple calls
     OUTPUT_DIR = "arxiv_papers"
-    BASE_URL = "http://export.arxiv.org/api/query?search_query=cat:{}&start={}&max_results={}"
+    BASE_URL = (
+        "http://export.arxiv.org/api/query?search_query=cat:{}&start={}&max_results={}"
+        "&sortBy=lastUpdatedDate&sortOrder=descending"
+    )
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    def __init__(self, arxiv_category, dataset_id, download_dir="data/tmp", batch_size=10):
+    def __init__(
+        self,
+        arxiv_category=None,
+        dataset_id=None,
+        download_dir="data/tmp",
+        batch_size=10,
+        settings: ArxivFetchSettings | None = None,
+        store: MetadataStore | None = None,
+    ):
         self.query = arxiv_category
         self.download_dir = download_dir
         self.batch_size = batch_size
         self.dataset_id = dataset_id
+        self.settings = settings or ArxivFetchSettings()
+        # One connection per PDF worker plus one for the metadata page fetches.
+        self.session = build_session(self.settings.pdf_workers + 1)
+        self.store = store or get_metadata_store()
         os.makedirs(download_dir, exist_ok=True)
 
     def _prepare_workspace(self, job: IngestionJob) -> Path:
@@ -48,87 +101,446 @@ class ArxivDownloader:
             raise IngestionError("ArxivDownloader requires a ArxivDataSource")
         return job.source
 
-    def fetch_papers(self, job: IngestionJob, total_results=10):
-        file_paths = []
+    def _category(self, job: IngestionJob) -> str:
+        """The job's own category wins, so one downloader can serve every arXiv job."""
+        if isinstance(job.source, ArxivDataSource) and job.source.category:
+            return job.source.category
+        return self.query or self.CATEGORY
+
+    def _page_limiter(self, url: str) -> TokenBucket | None:
+        """The API host's bucket, shared with every other arXiv job on this machine."""
+        if self.settings.page_interval <= 0:
+            return None
+        return rate_limiter(urlparse(url).netloc, rate=1.0 / self.settings.page_interval)
+
+    def _request_page(self, url: str, category: str) -> requests.Response:
+        limiter = self._page_limiter(url)
+        if limiter is not None:
+            # Time spent waiting for a token shows when the API pacing is the bottleneck.
+            with track_operation("arxiv_throttle", category):
+                limiter.acquire()
+        with track_operation("arxiv_api", category):
+            response = self.session.get(url, timeout=self.settings.timeout)
+            if response.status_code in RETRYABLE_STATUS:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if limiter is not None and response.status_code in (429, 503):
+                    limiter.penalize(retry_after)
+                raise RetryableError(f"HTTP {response.status_code} for {url}", retry_after)
+            response.raise_for_status()
+        if limiter is not None:
+            limiter.reward()
+        return response
+
+    def _fetch_page(self, category: str, start: int, size: int) -> List[Any]:
+        url = self.BASE_URL.format(category, start, size)
+        policy = RetryPolicy(
+            retry_on=TRANSIENT_ERRORS,
+            attempts=self.settings.retries,
+            host=urlparse(url).netloc,
+        )
+        response = policy.call(self._request_page, url, category)
+        return feedparser.parse(response.content).entries
+
+    def _harvest(
+        self,
+        job: IngestionJob,
+        handler,
+        total_results: int | None = None,
+        hold: bool = False,
+    ) -> Tuple[List[Any], Callable[[], None]]:
+        """Walk the metadata pages and hand each entry to ``handler`` on the PDF pool.
+
+        Pages come newest-first by ``updated``. In incremental mode the walk stops at the
+        category's stored high-water mark, and the cursor offset is checkpointed once every
+        entry of a page has been handled, so an interrupted harvest resumes where it stopped.
+        Papers whose PDF could not be fetched are stored and retried on later runs, up to
+        ``MAX_PAPER_ATTEMPTS`` times. The first harvest of a category fetches the newest
+        ``limit`` papers and sets the high-water mark; older papers are not backfilled.
+
+        Returns the handler results and a ``commit`` callable that saves the cursor and the
+        retry list. With ``hold``, nothing is saved until ``commit`` is called, for results
+        that are only safe once a later step (the upload) has succeeded.
+        """
+        limit = total_results if total_results is not None else self.settings.max_results
+        category = self._category(job)
+        cursor = self.store.get_cursor("arxiv", category) if self.settings.incremental else None
+        start = cursor.offset if cursor is not None else 0
+        newest = cursor.pending_high_water if cursor is not None else None
+        stop_at = cursor.high_water if cursor is not None else None
+        if start:
+            logger.info("Resuming arXiv harvest of %s at offset %d", category, start)
+        retries = self.store.get_retries("arxiv", category) if cursor is not None else []
+        if retries:
+            logger.info("Retrying %d skipped arXiv papers of %s", len(retries), category)
+        retry_ids = {retry.item_id for retry in retries}
+        meter = ThroughputMeter(unit="papers")
+        results: List[Any] = []
+        # (entry, handled) for every paper collected but not yet committed.
+        outcomes: List[Tuple[Any, bool]] = []
+        complete = False
+        submitted = 0
+        with ThreadPoolExecutor(
+            max_workers=self.settings.pdf_workers, thread_name_prefix="arxiv-pdf"
+        ) as pool:
+            in_flight = [
+                self._submit(
+                    pool, handler, FeedParserDict(id=retry.item_id, updated=retry.updated), meter
+                )
+                for retry in retries
+            ]
+            while not limit or submitted < limit:
+                size = min(self.batch_size, limit - submitted) if limit else self.batch_size
+                entries = self._fetch_page(category, start, size)
+                if not entries:
+                    complete = True
+                    break
+                newest = newest or entries[0].get("updated")
+                fresh = [
+                    entry for entry in entries if not stop_at or entry.get("updated", "") > stop_at
+                ]
+                # Collect the previous page while this one downloads, then checkpoint it.
+                results.extend(self._collect(in_flight, outcomes))
+                if cursor is not None and not hold:
+                    self._record(category, outcomes, retry_ids)
+                    self._checkpoint(cursor, start, newest)
+                in_flight = [
+                    self._submit(pool, handler, entry, meter)
+                    for entry in fresh
+                    if entry.id not in retry_ids
+                ]
+                submitted += len(fresh)
+                start += len(entries)
+                if len(fresh) < len(entries):
+                    complete = True
+                    break
+            results.extend(self._collect(in_flight, outcomes))
+
+        def commit() -> None:
+            if cursor is None:
+                return
+            self._record(category, outcomes, retry_ids)
+            # A first harvest that stops at its limit still sets the high-water mark, so
+            # incremental runs start from the newest papers instead of walking the history.
+            if complete or cursor.high_water is None:
+                cursor.high_water = max(filter(None, (cursor.high_water, newest)), default=None)
+                self._checkpoint(cursor, 0, None)
+            else:
+                self._checkpoint(cursor, start, newest)
+
+        if not hold:
+            commit()
+        logger.info("Fetched arXiv PDFs for job %s: %s", job.job_id, meter.summary())
+        return results, commit
+
+    @staticmethod
+    def _submit(
+        pool: ThreadPoolExecutor, handler, entry, meter: ThroughputMeter
+    ) -> Tuple[Any, Future]:
+        return entry, pool.submit(contextvars.copy_context().run, handler, entry, meter)
+
+    @staticmethod
+    def _collect(
+        in_flight: List[Tuple[Any, Future]], outcomes: List[Tuple[Any, bool]]
+    ) -> List[Any]:
+        """Wait for ``in_flight`` papers, noting in ``outcomes`` whether each was handled."""
+        results = []
+        for entry, future in in_flight:
+            result = future.result()
+            outcomes.append((entry, bool(result)))
+            if result:
+                results.append(result)
+        return results
+
+    def _record(
+        self, category: str, outcomes: List[Tuple[Any, bool]], retry_ids: Set[str]
+    ) -> None:
+        """Store the papers that failed for a later retry, and clear those that recovered."""
+        for entry, handled in outcomes:
+            if handled:
+                if entry.id in retry_ids:
+                    self.store.clear_retry("arxiv", category, entry.id)
+                continue
+            attempts = self.store.record_retry("arxiv", category, entry.id, entry.get("updated"))
+            if attempts >= MAX_PAPER_ATTEMPTS:
+                logger.warning("Giving up on %s after %d attempts", entry.id, attempts)
+                self.store.clear_retry("arxiv", category, entry.id)
+        outcomes.clear()
+
+    def _checkpoint(self, cursor: HarvestCursor, offset: int, pending: str | None) -> None:
+        cursor.offset = offset
+        cursor.pending_high_water = pending
+        self.store.save_cursor(cursor)
+
+    def fetch_papers(self, job: IngestionJob, total_results: int | None = None):
+        """Download PDFs into the workspace; returns them, the workspace and ``commit``.
+
+        The harvest cursor is not saved until ``commit`` is called, so callers call it once
+        the PDFs are safely uploaded; until then a failed run downloads them again.
+        """
         workspace = self._prepare_workspace(job)
-        for start in range(0, total_results, self.batch_size):
-            url = self.BASE_URL.format(self.query, start, self.batch_size)
-            response = requests.get(url)
-            feed = feedparser.parse(response.content)
-            for entry in feed.entries:
-                file_paths.append(self.download_pdf(entry))
-
-            time.sleep(3)  # To respect arXiv's rate limits
-        return file_paths, workspace
-
-    def download_pdf(self, entry):
-        pdf_url = entry.id.replace('abs', 'pdf') + ".pdf"
-        response = requests.get(pdf_url)
-        if response.status_code == 200:
-            file_path = os.path.join(self.download_dir, self.dataset_id, f"{entry.id.split('/')[-1]}.pdf")
-            with open(file_path, 'wb') as f:
-                f.write(response.content)
-            print(f"Downloaded: {file_path}")
-            return Path(file_path)
-        else:
-            print(f"Failed to download PDF for {entry.id}")
+        file_paths, commit = self._harvest(
+            job,
+            lambda entry, meter: self.download_pdf(entry, workspace, meter),
+            total_results,
+            hold=True,
+        )
+        return file_paths, workspace, commit
+
+    def stream_papers(
+        self,
+        job: IngestionJob,
+        total_results: int | None = None,
+        ledger: RunLedger | None = None,
+    ) -> List[str]:
+        """Harvest straight into MinIO, never staging PDFs on local disk."""
+        uploaded, _ = self._harvest(
+            job, lambda entry, meter: self.stream_pdf(entry, job, meter, ledger), total_results
+        )
+        return uploaded
+
+    def _pdf_policy(self, url: str, *retry_on: type) -> RetryPolicy:
+        return RetryPolicy(
+            retry_on=TRANSIENT_ERRORS + retry_on,
+            attempts=self.settings.retries,
+            host=urlparse(url).netloc,
+        )
+
+    @staticmethod
+    def _pdf_response_ok(entry, response: requests.Response) -> bool:
+        """Raise on statuses worth retrying; warn and return False on other failures."""
+        if response.status_code in RETRYABLE_STATUS:
+            raise RetryableError(
+                f"HTTP {response.status_code} for {response.url}",
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+        if response.status_code != 200:
+            logger.warning(
+                "Failed to download PDF for %s (HTTP %s)", entry.id, response.status_code
+            )
+            return False
+        return True
+
+    def download_pdf(self, entry, workspace: Path, meter: ThroughputMeter | None = None):
+        file_path = Path(workspace) / f"{paper_id(entry)}.pdf"
+        url = pdf_url_for(entry)
+
+        def _attempt() -> int | None:
+            with track_operation("arxiv_pdf", "download") as operation, self.session.get(
+                url, stream=True, timeout=self.settings.timeout
+            ) as response:
+                if not self._pdf_response_ok(entry, response):
+                    operation.failed = True
+                    return None
+                size = 0
+                with open(file_path, "wb") as fp:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        fp.write(chunk)
+                        size += len(chunk)
+                return size
+
+        try:
+            size = self._pdf_policy(url).call(_attempt)
+        except PDF_ERRORS as exc:
+            logger.warning("Failed to download PDF for %s: %s", entry.id, exc)
+            size = None
+        if size is None:
+            if meter:
+                meter.record_failure()
+            return None
+        if meter:
+            meter.record(size)
+        logger.info("Downloaded: %s", file_path, extra=PER_OBJECT)
+        return file_path
 
     def pdf_to_text(self, pdf_path):
         try:
-            text_content = []
-            
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                num_pages = len(pdf_reader.pages)
-                
-                for page_num in range(num_pages):
-                    page = pdf_reader.pages[page_num]
-                    text = page.extract_text()
-                    text_content.append(f"\n{'='*60}\nPage {page_num + 1}/{num_pages}\n{'='*60}\n")
-                    text_content.append(text)
-            
-            return ''.join(text_content)
-
-        except Exception as e:
-            print(f"  ✗ Conversion failed: {str(e)}")
-            self.stats['failed_conversions'] += 1
+            return extract_pages(str(pdf_path), 0, sys.maxsize)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Conversion of %s failed: %s", pdf_path, exc)
             return None
-        
-    def pdf_url_to_text(pdf_url: str) -> str:
+
+    def stream_pdf(
+        self,
+        entry,
+        job: IngestionJob,
+        meter: ThroughputMeter | None = None,
+        ledger: RunLedger | None = None,
+    ):
+        object_name = job.destination.object_name(Path(f"{paper_id(entry)}.pdf"))
+        url = pdf_url_for(entry)
+
+        def _attempt() -> int | None:
+            with track_operation("arxiv_pdf", "stream") as operation, self.session.get(
+                url, stream=True, timeout=self.settings.timeout
+            ) as response:
+                if not self._pdf_response_ok(entry, response):
+                    operation.failed = True
+                    return None
+                response.raw.decode_content = True
+                return upload_stream(
+                    job.destination.bucket,
+                    object_name,
+                    response.raw,
+                    content_type="application/pdf",
+                    part_size=self.settings.part_size,
+                )
+
+        # A one-shot body cannot be re-sent, so a failed PUT (which includes the body being cut
+        # off mid-read) is retried from the GET.
+        try:
+            size = self._pdf_policy(url, ObjectUploadError).call(_attempt)
+        except PDF_ERRORS + (ObjectUploadError,) as exc:
+            logger.warning("Failed to stream PDF for %s: %s", entry.id, exc)
+            size = None
+        if size is None:
+            if meter:
+                meter.record_failure()
+            return None
+        if meter:
+            meter.record(size)
+        if ledger is not None:
+            ledger.record_object(job.destination.bucket, object_name, size=size)
+        return object_name
+
+    def pdf_url_to_text(self, pdf_url: str) -> str:
         """
-        Download PDF from a URL directly into memory and extract its text.
+        Download a PDF from a URL in chunks and extract its text.
+
+        The body is spooled to a temporary file so memory stays flat regardless of PDF size.
         """
-        # 1) Download PDF into memory
-        response = requests.get(pdf_url)
-        response.raise_for_status()
-
-        pdf_bytes = io.BytesIO(response.content)
-
-        # 2) Extract text using PyMuPDF
-        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-            text = ""
-            for page in doc:
-                text += page.get_text()
-
-        return text
-            
-    def push_to_minio(self, job: IngestionJob, files: List[Path], workspace: Path) -> List[str]:
-        uploaded_objects: List[str] = []
-        for file_path in files:
-            file_path = Path(file_path).resolve()
-            workspace = Path(workspace).resolve()
-            relative = file_path.relative_to(workspace)
-            object_name = job.destination.object_name(relative)
-            upload_file(job.destination.bucket, file_path, object_name)
-            uploaded_objects.append(object_name)
-        return uploaded_objects
+        import fitz  # PyMuPDF
+
+        with self.session.get(pdf_url, stream=True, timeout=self.settings.timeout) as response:
+            response.raise_for_status()
+            with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    tmp.write(chunk)
+                tmp.flush()
+                with fitz.open(tmp.name) as doc:
+                    return "".join(page.get_text() for page in doc)
+
+    def push_to_minio(
+        self,
+        job: IngestionJob,
+        files: List[Path],
+        workspace: Path,
+        ledger: RunLedger | None = None,
+        batch: str | None = None,
+    ) -> List[str]:
+        if self.settings.shard_output:
+            return self.push_shards(job, files, workspace, ledger, batch)
+        workspace = Path(workspace).resolve()
+        items = [
+            (file_path, job.destination.object_name(file_path.relative_to(workspace)))
+            for file_path in (Path(path).resolve() for path in files)
+        ]
+        manifest = UploadManifest.load(job.destination.bucket, job.destination.prefix)
+        results = upload_many(
+            job.destination.bucket,
+            items,
+            max_workers=self.settings.upload_workers,
+            part_size=self.settings.part_size,
+            content_type="application/pdf",
+            manifest=manifest,
+        )
+        manifest.save()
+        if ledger is not None:
+            ledger.record_uploads(job.destination.bucket, results)
+        raise_for_failures(results)
+        return [result.object_name for result in results]
+
+    def push_shards(
+        self,
+        job: IngestionJob,
+        files: List[Path],
+        workspace: Path,
+        ledger: RunLedger | None = None,
+        batch: str | None = None,
+    ) -> List[str]:
+        """Pack the PDFs into tar shards under ``<prefix>/shards/<batch>/`` with an index."""
+        writer = ShardWriter(Path(workspace) / "shards", "pdf", self.settings.shard_size)
+        for path in sorted(Path(file) for file in files):
+            writer.add_file(path.stem, path)
+        return writer.upload(job, batch or shard_batch(), self.settings.upload_workers, ledger)
+
+    def _local_copies(self, job: IngestionJob, object_names: List[str]) -> tuple[List[Path], Path]:
+        """Pull streamed PDFs back into the workspace for stages that need local files."""
+        workspace = self._prepare_workspace(job)
+        with ThreadPoolExecutor(max_workers=self.settings.pdf_workers) as pool:
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run,
+                    download_file,
+                    job.destination.bucket,
+                    name,
+                    workspace / Path(name).name,
+                )
+                for name in object_names
+            ]
+            files = [future.result() for future in futures]
+        return files, workspace
+
+    def _extract(
+        self,
+        job: IngestionJob,
+        files: List[Path],
+        workspace: Path,
+        ledger: RunLedger | None,
+        batch: str | None,
+    ) -> List[str]:
+        extractor = TextExtractor(self.settings.extraction)
+        if not self.settings.shard_output:
+            return extractor.extract_to_minio(job, files, workspace, ledger=ledger)
+        writer = ShardWriter(Path(workspace) / "shards", "text", self.settings.shard_size)
+        for pdf, text in extractor.extract(files):
+            if text is not None:
+                writer.add_bytes(Path(pdf).stem, ".txt", text.encode("utf-8"))
+        return writer.upload(job, batch or shard_batch(), self.settings.upload_workers, ledger)
+
+    def extract_text(
+        self,
+        job: IngestionJob,
+        files: List[Path],
+        workspace: Path,
+        ledger: RunLedger | None = None,
+        batch: str | None = None,
+    ) -> List[str]:
+        if ledger is None:
+            return self._extract(job, files, workspace, None, batch)
+        with ledger.stage("extract") as stage:
+            texts = self._extract(job, files, workspace, ledger, batch)
+            stage.items = len(texts)
+        return texts
 
     def run(self, job: IngestionJob) -> List[str]:
         logger.info("Executing Arxiv ingestion job %s", job.job_id)
-        files, workspace = self.fetch_papers(job)
-        if not files:
-            logger.warning("No files downloaded for job %s", job.job_id)
-            return []
-        uploaded = self.push_to_minio(job, files, workspace)
+        with self.store.run(job, source="arxiv") as ledger:
+            if self.settings.stream_to_minio and self.settings.shard_output:
+                logger.warning("Shard output needs staged PDFs; streaming them one object each")
+            if self.settings.stream_to_minio:
+                with ledger.stage("stream") as stage:
+                    uploaded = self.stream_papers(job, ledger=ledger)
+                    stage.items = len(uploaded)
+                if self.settings.extract_text and uploaded:
+                    files, workspace = self._local_copies(job, uploaded)
+                    uploaded += self.extract_text(job, files, workspace, ledger)
+                logger.info("Completed job %s (%d objects uploaded)", job.job_id, len(uploaded))
+                return uploaded
+            with ledger.stage("download") as stage:
+                files, workspace, commit = self.fetch_papers(job)
+                stage.items = len(files)
+                stage.bytes = sum(Path(path).stat().st_size for path in files)
+            if not files:
+                commit()
+                logger.warning("No files downloaded for job %s", job.job_id)
+                return []
+            batch = shard_batch()
+            with ledger.stage("upload") as stage:
+                uploaded = self.push_to_minio(job, files, workspace, ledger=ledger, batch=batch)
+                stage.items = len(uploaded)
+            # Only now are the harvested papers safe to walk past.
+            commit()
+            if self.settings.extract_text:
+                uploaded += self.extract_text(job, files, workspace, ledger, batch=batch)
         logger.info("Completed job %s (%d objects uploaded)", job.job_id, len(uploaded))
-        return uploaded
\ No newline at end of file
+        return uploaded
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import io
+import multiprocessing
+import queue
+import time
+from collections import deque
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from core.models.ingestion_job import IngestionJob
+from core.utils.throughput import ThroughputMeter
+from infrastructure.db.metadata_store import RunLedger
+from infrastructure.logging.logger import get_logger
+from infrastructure.minio.uploader import upload_from_memory
+from ingestion.arxiv.settings import ExtractionSettings
+
+logger = get_logger(__name__)
+
+
+def _report(
+    results: queue.Queue,
+    generation: int,
+    task: Tuple[Path, int, int],
+    text: str | None,
+    error: BaseException | None,
+) -> None:
+    results.put((generation, task, text, error))
+
+
+def extract_pages(path: str, start: int, stop: int) -> str:
+    """Extract the text of pages ``[start, stop)``; runs inside a pool worker."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        stop = min(stop, doc.page_count)
+        return "".join(doc[number].get_text() for number in range(start, stop))
+
+
+def page_count(path: Path) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+Task = Tuple[Path, int, int]
+
+
+class TextExtractor:
+    """Extracts text from many PDFs on a process pool, splitting large PDFs by page range.
+
+    Each document must finish within ``settings.timeout`` seconds of its first page range
+    being dispatched. The deadline is enforced from the parent: a worker stuck inside
+    PyMuPDF cannot be interrupted, so when a document runs over, the pool is terminated and
+    replaced, and the other documents' page ranges that were running are dispatched again.
+    """
+
+    def __init__(self, settings: ExtractionSettings | None = None) -> None:
+        self.settings = settings or ExtractionSettings()
+
+    def _tasks(self, pdfs: Iterable[Path]) -> Iterator[Task]:
+        step = max(self.settings.pages_per_task, 1)
+        for pdf in pdfs:
+            try:
+                pages = page_count(pdf)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("Cannot open %s for extraction: %s", pdf, exc)
+                yield pdf, 0, 0
+                continue
+            for start in range(0, max(pages, 1), step):
+                yield pdf, start, start + step
+
+    def _pool(self) -> Any:
+        return multiprocessing.get_context("spawn").Pool(self.settings.workers)
+
+    def extract(self, pdfs: Iterable[Path]) -> Iterator[Tuple[Path, str | None]]:
+        """Yield ``(pdf, text)`` as each document finishes; ``text`` is None on failure."""
+        tasks = list(self._tasks(pdfs))
+        expected: Dict[Path, int] = {}
+        for pdf, _, stop in tasks:
+            expected[pdf] = expected.get(pdf, 0) + (1 if stop else 0)
+        parts: Dict[Path, Dict[int, str]] = {pdf: {} for pdf in expected}
+        failed = {pdf for pdf, count in expected.items() if count == 0}
+        for pdf in failed:
+            yield pdf, None
+
+        queued = deque(task for task in tasks if task[2])
+        # Only as many tasks as there are workers are dispatched at once, so a dispatched
+        # task is a running task and its document's deadline measures extraction time.
+        running: Dict[Tuple[Path, int], Task] = {}
+        deadlines: Dict[Path, float] = {}
+        results: "queue.Queue[Tuple[int, Task, str | None, BaseException | None]]"
+        results = queue.Queue()
+        generation = 0
+        pool = self._pool()
+        try:
+            while queued or running:
+                while queued and len(running) < self.settings.workers:
+                    task = queued.popleft()
+                    pdf, start, stop = task
+                    if pdf in failed:
+                        continue  # A failed document's remaining page ranges are dropped.
+                    if self.settings.timeout > 0:
+                        deadlines.setdefault(pdf, time.monotonic() + self.settings.timeout)
+                    running[(pdf, start)] = task
+                    pool.apply_async(
+                        extract_pages,
+                        (str(pdf), start, stop),
+                        callback=partial(_report, results, generation, task, error=None),
+                        error_callback=partial(_report, results, generation, task, None),
+                    )
+                wait = None
+                if deadlines and running:
+                    nearest = min(deadlines[pdf] for pdf, _ in running)
+                    wait = max(nearest - time.monotonic(), 0)
+                try:
+                    origin, task, text, error = results.get(timeout=wait)
+                except queue.Empty:
+                    now = time.monotonic()
+                    expired = {pdf for pdf, _ in running if deadlines[pdf] <= now}
+                    if not expired:
+                        continue
+                    for pdf in expired:
+                        logger.warning(
+                            "Timed out extracting %s after %.0fs", pdf, self.settings.timeout
+                        )
+                        failed.add(pdf)
+                        parts.pop(pdf, None)
+                        yield pdf, None
+                    # Stuck workers cannot be interrupted, only killed with their pool.
+                    pool.terminate()
+                    pool = self._pool()
+                    generation += 1
+                    for task in running.values():
+                        if task[0] not in failed:
+                            deadlines.pop(task[0], None)
+                            queued.appendleft(task)
+                    running.clear()
+                    continue
+                pdf, start, _ = task
+                if origin != generation or running.pop((pdf, start), None) is None:
+                    continue
+                if pdf in failed:
+                    continue
+                if error is not None:
+                    logger.warning("Failed to extract %s: %s", pdf, error)
+                    failed.add(pdf)
+                    parts.pop(pdf, None)
+                    yield pdf, None
+                    continue
+                parts[pdf][start] = text or ""
+                if len(parts[pdf]) == expected[pdf]:
+                    pieces = parts.pop(pdf)
+                    yield pdf, "".join(pieces[key] for key in sorted(pieces))
+        finally:
+            pool.terminate()
+
+    def extract_to_minio(
+        self,
+        job: IngestionJob,
+        pdfs: List[Path],
+        workspace: Path,
+        ledger: RunLedger | None = None,
+    ) -> List[str]:
+        """Extract ``pdfs`` and upload each text as soon as it is ready.
+
+        Texts land under ``<prefix>/<text_prefix>/`` mirroring the PDFs' workspace layout.
+        """
+        workspace = Path(workspace).resolve()
+        bucket = job.destination.bucket
+        meter = ThroughputMeter(unit="documents")
+        uploaded: List[str] = []
+        for pdf, text in self.extract(pdfs):
+            if text is None:
+                meter.record_failure()
+                continue
+            relative = Path(pdf).resolve().relative_to(workspace).with_suffix(".txt")
+            object_name = job.destination.object_name(Path(self.settings.text_prefix) / relative)
+            data = text.encode("utf-8")
+            upload_from_memory(
+                bucket, object_name, io.BytesIO(data), data, "text/plain; charset=utf-8"
+            )
+            meter.record(len(data))
+            if ledger is not None:
+                ledger.record_object(bucket, object_name, size=len(data))
+            uploaded.append(object_name)
+        logger.info("Extracted text for job %s: %s", job.job_id, meter.summary())
+        return uploaded
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+def paper_id(entry: Any) -> str:
+    return entry.id.rstrip("/").split("/")[-1]
+
+
+def pdf_url_for(entry: Any) -> str:
+    return entry.id.replace("abs", "pdf") + ".pdf"
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+from infrastructure.minio.limits import DEFAULT_PART_SIZE
+
+
+@dataclass(frozen=True)
+class ExtractionSettings:
+    workers: int = os.cpu_count() or 1
+    pages_per_task: int = 32
+    timeout: float = 120.0
+    text_prefix: str = "text"
+
+
+@dataclass(frozen=True)
+class ArxivFetchSettings:
+    """Tuning knobs for harvesting: metadata pacing is independent of PDF concurrency."""
+
+    pdf_workers: int = 4
+    page_interval: float = 3.0
+    max_results: int = 10
+    timeout: float = 60.0
+    retries: int = 4
+    incremental: bool = True
+    stream_to_minio: bool = False
+    part_size: int = DEFAULT_PART_SIZE
+    upload_workers: int | None = None
+    extract_text: bool = False
+    extraction: ExtractionSettings = ExtractionSettings()
+    # Pack PDFs (and extracted texts) into indexed tar shards instead of one object each.
+    shard_output: bool = False
+    shard_size: int = 256 * 1024 * 1024
@@ -0,0 +1,188 @@
+"""Pack many small documents into tar shards with a byte-range index.
+
+Shards are plain (uncompressed) tar files in the WebDataset layout: each document is a
+member named ``<key>.<ext>``, where the key has no dots, so WebDataset and ``tar`` read the
+shards as they are. Next to the shards, an index object in JSON lines records, for every
+document, its shard and the byte range of its data. One document is then a single range
+GET, and a whole shard can still be streamed front to back.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+from core.models.ingestion_job import IngestionJob
+from infrastructure.db.metadata_store import RunLedger
+from infrastructure.logging.logger import get_logger
+from infrastructure.minio.client import get_storage_session
+from infrastructure.minio.uploader import raise_for_failures, upload_from_memory, upload_many
+
+logger = get_logger(__name__)
+
+SHARD_PREFIX = "shards"
+INDEX_SUFFIX = ".index.jsonl"
+
+
+def shard_batch() -> str:
+    """A name for one run's shards, so later runs never overwrite earlier ones."""
+    return time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+
+
+def member_key(document_id: str) -> str:
+    # WebDataset splits a member name at its first dot, and arXiv ids contain one.
+    return document_id.replace(".", "_").replace("/", "_")
+
+
+@dataclass(frozen=True)
+class ShardEntry:
+    key: str
+    name: str
+    shard: str
+    offset: int
+    size: int
+
+
+class ShardWriter:
+    """Writes ``<kind>-NNNNNN.tar`` files of about ``target_size`` bytes under ``directory``."""
+
+    def __init__(self, directory: Path, kind: str, target_size: int) -> None:
+        self.directory = Path(directory)
+        self.kind = kind
+        self.target_size = target_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.shards: List[Path] = []
+        # (shard number, key, member name, data offset, size)
+        self.members: List[Tuple[int, str, str, int, int]] = []
+        self._tar: tarfile.TarFile | None = None
+        self._end = 0
+
+    def _open(self) -> tarfile.TarFile:
+        if self._tar is not None and self._end >= self.target_size:
+            self._tar.close()
+            self._tar = None
+        if self._tar is None:
+            path = self.directory / f"{self.kind}-{len(self.shards):06d}.tar"
+            self.shards.append(path)
+            self._tar = tarfile.open(path, "w", format=tarfile.PAX_FORMAT)
+            self._end = 0
+        return self._tar
+
+    def _add(self, key: str, name: str, info: tarfile.TarInfo, fp: BinaryIO) -> None:
+        tar = self._open()
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        # addfile writes a copy of ``info``, so the data offset is worked out from the header.
+        offset = tar.offset + len(info.tobuf(tar.format, tar.encoding, tar.errors))
+        tar.addfile(info, fp)
+        self._end = tar.offset
+        self.members.append((len(self.shards) - 1, key, name, offset, info.size))
+
+    def add_file(self, key: str, path: Path) -> None:
+        name = member_key(key) + Path(path).suffix
+        info = tarfile.TarInfo(name)
+        info.size = Path(path).stat().st_size
+        info.mtime = int(Path(path).stat().st_mtime)
+        with open(path, "rb") as fp:
+            self._add(key, name, info, fp)
+
+    def add_bytes(self, key: str, suffix: str, data: bytes) -> None:
+        name = member_key(key) + suffix
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._add(key, name, info, io.BytesIO(data))
+
+    def close(self) -> None:
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+
+    def upload(
+        self,
+        job: IngestionJob,
+        batch: str,
+        upload_workers: int | None = None,
+        ledger: RunLedger | None = None,
+    ) -> List[str]:
+        """Upload the shards, then their index; returns the object names written."""
+        self.close()
+        if not self.members:
+            return []
+        bucket = job.destination.bucket
+        folder = Path(SHARD_PREFIX) / batch
+        shard_objects = [job.destination.object_name(folder / path.name) for path in self.shards]
+        results = upload_many(
+            bucket,
+            list(zip(self.shards, shard_objects)),
+            max_workers=upload_workers,
+            content_type="application/x-tar",
+        )
+        if ledger is not None:
+            ledger.record_uploads(bucket, results)
+        raise_for_failures(results)
+        for path in self.shards:
+            path.unlink(missing_ok=True)
+        index = "".join(
+            json.dumps(asdict(ShardEntry(key, name, shard_objects[shard], offset, size))) + "\n"
+            for shard, key, name, offset, size in self.members
+        ).encode("utf-8")
+        index_object = job.destination.object_name(folder / f"{self.kind}{INDEX_SUFFIX}")
+        upload_from_memory(
+            bucket, index_object, io.BytesIO(index), index, "application/x-ndjson"
+        )
+        if ledger is not None:
+            ledger.record_object(bucket, index_object, size=len(index))
+        logger.info(
+            "Packed %d documents into %d %s shards under %s",
+            len(self.members),
+            len(self.shards),
+            self.kind,
+            job.destination.object_name(folder),
+        )
+        return shard_objects + [index_object]
+
+
+def load_index(bucket: str, index_object: str) -> Dict[str, ShardEntry]:
+    """Read a shard index into a map from document key to its entry."""
+    response = get_storage_session().client.get_object(bucket, index_object)
+    try:
+        lines = response.read().decode("utf-8").splitlines()
+    finally:
+        response.close()
+        response.release_conn()
+    entries = (ShardEntry(**json.loads(line)) for line in lines if line)
+    return {entry.key: entry for entry in entries}
+
+
+def read_document(bucket: str, entry: ShardEntry) -> bytes:
+    """Fetch one document from its shard with a single range GET."""
+    if entry.size == 0:
+        return b""  # A length of 0 would make minio read to the end of the shard.
+    response = get_storage_session().client.get_object(
+        bucket, entry.shard, offset=entry.offset, length=entry.size
+    )
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def iter_shard(bucket: str, shard_object: str) -> Iterator[Tuple[str, bytes]]:
+    """Stream a whole shard, yielding ``(member name, data)`` in order."""
+    response = get_storage_session().client.get_object(bucket, shard_object)
+    try:
+        with tarfile.open(fileobj=response, mode="r|") as tar:
+            for info in tar:
+                member = tar.extractfile(info) if info.isfile() else None
+                if member is not None:
+                    yield info.name, member.read()
+    finally:
+        response.close()
+        response.release_conn()
@@ -3,11 +3,14 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Iterable, List, Sequence
 
-from kaggle import KaggleApi
-
 from core.exceptions.ingestion_error import KaggleDownloadError
-from ingestion.kaggle.helpers import filter_downloaded_files, sanitize_dataset_name
-from infrastructure.logging.logger import get_logger
+from ingestion.kaggle.helpers import (
+    filter_downloaded_files,
+    sanitize_dataset_name,
+    unpack_single_file,
+)
+from infrastructure.logging.logger import PER_OBJECT, get_logger
+from infrastructure.metrics.instruments import track_operation
 
 logger = get_logger(__name__)
 
@@ -16,6 +19,10 @@ class KaggleClient:
     """Thin wrapper around the official Kaggle SDK."""
 
     def __init__(self) -> None:
+        # Importing ``kaggle`` authenticates as a side effect, so only do it once a client is
+        # actually needed.
+        from kaggle import KaggleApi
+
         self.api = KaggleApi()
         self.api.authenticate()
 
@@ -27,20 +34,86 @@ class KaggleClient:
         file_names: Sequence[str] | None = None,
         force: bool = False,
     ) -> List[Path]:
+        if file_names:
+            return self.download_files(owner_slug, dataset_slug, destination, file_names, force)
         dataset_ref = sanitize_dataset_name(owner_slug, dataset_slug)
         destination = Path(destination)
         destination.mkdir(parents=True, exist_ok=True)
         try:
             logger.info("Downloading Kaggle dataset %s into %s", dataset_ref, destination)
-            self.api.dataset_download_files(
-                dataset_ref,
-                path=str(destination),
-                unzip=True,
-                quiet=False,
-                force=force,
-            )
+            with track_operation("kaggle_download", dataset_ref):
+                self.api.dataset_download_files(
+                    dataset_ref,
+                    path=str(destination),
+                    unzip=True,
+                    quiet=False,
+                    force=force,
+                )
         except Exception as exc:  # pylint: disable=broad-except
             logger.exception("Failed to download Kaggle dataset %s: %s", dataset_ref, exc)
             raise KaggleDownloadError(str(exc)) from exc
 
         return filter_downloaded_files(destination, file_names)
+
+    def download_files(
+        self,
+        owner_slug: str,
+        dataset_slug: str,
+        destination: Path,
+        file_names: Sequence[str],
+        force: bool = False,
+    ) -> List[Path]:
+        """Download only ``file_names``; files Kaggle serves zipped are unpacked in place."""
+        dataset_ref = sanitize_dataset_name(owner_slug, dataset_slug)
+        destination = Path(destination)
+        destination.mkdir(parents=True, exist_ok=True)
+        files: List[Path] = []
+        for file_name in file_names:
+            target = destination / Path(file_name).name
+            try:
+                logger.info(
+                    "Downloading %s from Kaggle dataset %s",
+                    file_name,
+                    dataset_ref,
+                    extra=PER_OBJECT,
+                )
+                with track_operation("kaggle_download", dataset_ref):
+                    self.api.dataset_download_file(
+                        dataset_ref, file_name, path=str(destination), force=force, quiet=True
+                    )
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.exception("Failed to download %s from %s: %s", file_name, dataset_ref, exc)
+                raise KaggleDownloadError(str(exc)) from exc
+            zipped = target.with_name(target.name + ".zip")
+            if not target.exists() and zipped.exists():
+                target = unpack_single_file(zipped, file_name)
+            if not target.exists():
+                raise KaggleDownloadError(f"{file_name} not found in dataset {dataset_ref}")
+            files.append(target)
+        return files
+
+    def download_archive(
+        self,
+        owner_slug: str,
+        dataset_slug: str,
+        destination: Path,
+        force: bool = False,
+    ) -> Path:
+        """Download the dataset as its zip archive without extracting it."""
+        dataset_ref = sanitize_dataset_name(owner_slug, dataset_slug)
+        destination = Path(destination)
+        destination.mkdir(parents=True, exist_ok=True)
+        try:
+            logger.info("Downloading Kaggle archive %s into %s", dataset_ref, destination)
+            with track_operation("kaggle_download", dataset_ref):
+                self.api.dataset_download_files(
+                    dataset_ref,
+                    path=str(destination),
+                    unzip=False,
+                    quiet=False,
+                    force=force,
+                )
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Failed to download Kaggle dataset %s: %s", dataset_ref, exc)
+            raise KaggleDownloadError(str(exc)) from exc
+        return destination / f"{dataset_slug.strip()}.zip"
@@ -0,0 +1,207 @@
+"""Stream CSV/TSV files into compressed Parquet in bounded memory.
+
+Files are read in blocks by pyarrow's streaming CSV reader. Rows are held only until a row
+group is full, so memory stays flat however large the file. Column types are inferred from
+the first block. If a later block does not fit them (a numeric column that turns to text
+further down, say), the file is converted again with every column as text.
+
+Needs the optional ``pyarrow`` package.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Callable, Dict, List
+from urllib.parse import quote
+
+from core.exceptions.ingestion_error import IngestionError
+from core.models.datasource import ParquetConversion
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes of CSV parsed per block; each block becomes one record batch.
+BLOCK_SIZE = 16 * 1024 * 1024
+# Partitioned output keeps one open writer per value, so high-cardinality columns are refused.
+MAX_PARTITIONS = 1024
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.csv  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise IngestionError("Parquet conversion needs pyarrow: pip install pyarrow") from exc
+    return pyarrow
+
+
+class _RowGroupWriter:
+    """One Parquet file, written a full row group at a time."""
+
+    def __init__(self, path: Path, schema: Any, conversion: ParquetConversion) -> None:
+        pa = _pyarrow()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.row_group_rows = conversion.row_group_rows
+        self._writer = pa.parquet.ParquetWriter(
+            str(path), schema, compression=conversion.compression
+        )
+        self._batches: List[Any] = []
+        self.buffered = 0
+
+    def write(self, batch: Any) -> None:
+        self._batches.append(batch)
+        self.buffered += batch.num_rows
+        if self.buffered < self.row_group_rows:
+            return
+        # Write only whole row groups; the remainder starts the next one.
+        table = _pyarrow().Table.from_batches(self._batches)
+        full = table.num_rows - table.num_rows % self.row_group_rows
+        self._writer.write_table(table.slice(0, full), row_group_size=self.row_group_rows)
+        self._batches = table.slice(full).to_batches()
+        self.buffered = table.num_rows - full
+
+    def flush(self) -> None:
+        if not self._batches:
+            return
+        table = _pyarrow().Table.from_batches(self._batches)
+        self._writer.write_table(table, row_group_size=self.row_group_rows)
+        self._batches = []
+        self.buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+    @property
+    def paths(self) -> List[Path]:
+        return [self.path]
+
+
+class _PartitionedWriter:
+    """``<column>=<value>/part-0.parquet`` files under ``directory``, one per value."""
+
+    def __init__(
+        self, directory: Path, schema: Any, column: str, conversion: ParquetConversion
+    ) -> None:
+        self.directory = directory
+        self.column = column
+        self.conversion = conversion
+        # Values live in the directory names, as Hive-style readers expect.
+        self.schema = schema.remove(schema.get_field_index(column))
+        self.writers: Dict[str, _RowGroupWriter] = {}
+
+    def _writer(self, value: Any) -> _RowGroupWriter:
+        key = NULL_PARTITION if value in (None, "") else quote(str(value), safe="")
+        writer = self.writers.get(key)
+        if writer is None:
+            if len(self.writers) >= MAX_PARTITIONS:
+                raise IngestionError(
+                    f"'{self.column}' has more than {MAX_PARTITIONS} values; "
+                    "partition by a coarser column"
+                )
+            path = self.directory / f"{self.column}={key}" / "part-0.parquet"
+            writer = self.writers[key] = _RowGroupWriter(path, self.schema, self.conversion)
+        return writer
+
+    def write(self, batch: Any) -> None:
+        pa = _pyarrow()
+        import pyarrow.compute as pc
+
+        index = batch.schema.get_field_index(self.column)
+        values = batch.column(index)
+        rest = pa.RecordBatch.from_arrays(
+            [batch.column(i) for i in range(batch.num_columns) if i != index], schema=self.schema
+        )
+        for value in pc.unique(values).to_pylist():
+            mask = pc.is_null(values) if value is None else pc.equal(values, value)
+            self._writer(value).write(rest.filter(mask))
+        # Bound memory across partitions: past one row group in total, flush the largest.
+        while sum(w.buffered for w in self.writers.values()) > self.conversion.row_group_rows:
+            max(self.writers.values(), key=lambda w: w.buffered).flush()
+
+    def close(self) -> None:
+        for writer in self.writers.values():
+            writer.close()
+
+    @property
+    def paths(self) -> List[Path]:
+        return [writer.path for writer in self.writers.values()]
+
+
+class ParquetConverter:
+    def __init__(self, conversion: ParquetConversion, block_size: int = BLOCK_SIZE) -> None:
+        _pyarrow()
+        self.conversion = conversion
+        self.block_size = block_size
+
+    def accepts(self, name: str) -> bool:
+        base = PurePosixPath(name).name.lower()
+        return any(fnmatch.fnmatch(base, pattern.lower()) for pattern in self.conversion.patterns)
+
+    def _reader(self, stream: BinaryIO, name: str, column_types: Dict[str, Any] | None) -> Any:
+        pa = _pyarrow()
+        delimiter = "\t" if name.lower().endswith((".tsv", ".tab")) else ","
+        return pa.csv.open_csv(
+            stream,
+            read_options=pa.csv.ReadOptions(block_size=self.block_size),
+            parse_options=pa.csv.ParseOptions(delimiter=delimiter),
+            convert_options=pa.csv.ConvertOptions(column_types=column_types or {}),
+        )
+
+    def _convert(
+        self,
+        open_source: Callable[[], BinaryIO],
+        name: str,
+        output_dir: Path,
+        as_text: bool,
+    ) -> List[Path]:
+        pa = _pyarrow()
+        stem = output_dir / PurePosixPath(name).with_suffix("")
+        with open_source() as stream:
+            reader = self._reader(stream, name, None)
+            if as_text:
+                names = reader.schema.names
+                with open_source() as restarted:
+                    reader = self._reader(restarted, name, {n: pa.string() for n in names})
+                    return self._write(reader, stem)
+            return self._write(reader, stem)
+
+    def _write(self, reader: Any, stem: Path) -> List[Path]:
+        column = self.conversion.partition_by
+        if column and column in reader.schema.names:
+            writer: _RowGroupWriter | _PartitionedWriter = _PartitionedWriter(
+                stem, reader.schema, column, self.conversion
+            )
+        else:
+            writer = _RowGroupWriter(stem.with_suffix(".parquet"), reader.schema, self.conversion)
+        try:
+            for batch in reader:
+                writer.write(batch)
+        finally:
+            writer.close()
+        return writer.paths
+
+    def convert(
+        self, open_source: Callable[[], BinaryIO], name: str, output_dir: Path
+    ) -> List[Path]:
+        """Convert the file ``name`` (relative, '/'-separated) into Parquet under ``output_dir``.
+
+        Returns the Parquet files written, which mirror ``name`` under ``output_dir``.
+        """
+        pa = _pyarrow()
+        try:
+            return self._convert(open_source, name, output_dir, as_text=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as exc:
+            logger.warning(
+                "Column types of %s changed partway through (%s); converting it as text",
+                name,
+                str(exc).splitlines()[0],
+            )
+        stem = output_dir / PurePosixPath(name).with_suffix("")
+        for stale in [stem.with_suffix(".parquet"), *stem.glob("*=*/part-0.parquet")]:
+            stale.unlink(missing_ok=True)
+        return self._convert(open_source, name, output_dir, as_text=True)
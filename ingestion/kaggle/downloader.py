@@ -1,22 +1,39 @@
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
 
 from core.exceptions.ingestion_error import IngestionError
-from core.models.datasource import KaggleDataSource
+from core.models.datasource import KaggleDataSource, ParquetConversion
 from core.models.ingestion_job import IngestionJob
 from core.utils.file_utils import clean_dir, ensure_dir
+from infrastructure.db.metadata_store import MetadataStore, RunLedger, get_metadata_store
 from infrastructure.logging.logger import get_logger
-from infrastructure.minio.uploader import upload_file
+from infrastructure.minio.manifest import UploadManifest
+from infrastructure.minio.uploader import (
+    StreamSource,
+    UploadSource,
+    raise_for_failures,
+    upload_many,
+)
 from ingestion.kaggle.client import KaggleClient
+from ingestion.kaggle.converter import ParquetConverter
+from ingestion.kaggle.helpers import ZipMembers
 
 logger = get_logger(__name__)
 
 
+def _total_size(converted: Dict[str, List[Path]]) -> int:
+    return sum(path.stat().st_size for outputs in converted.values() for path in outputs)
+
+
 class KaggleDatasetDownloader:
-    def __init__(self, client: KaggleClient | None = None) -> None:
+    def __init__(
+        self, client: KaggleClient | None = None, store: MetadataStore | None = None
+    ) -> None:
         self.client = client or KaggleClient()
+        self.store = store or get_metadata_store()
 
     def _prepare_workspace(self, job: IngestionJob) -> Path:
         workspace = job.workspace_path() / job.job_id
@@ -40,21 +57,157 @@ class KaggleDatasetDownloader:
         )
         return files, workspace
 
-    def push_to_minio(self, job: IngestionJob, files: List[Path], workspace: Path) -> List[str]:
-        uploaded_objects: List[str] = []
-        for file_path in files:
-            relative = file_path.relative_to(workspace)
-            object_name = job.destination.object_name(relative)
-            upload_file(job.destination.bucket, file_path, object_name)
-            uploaded_objects.append(object_name)
-        return uploaded_objects
+    def download_archive(self, job: IngestionJob) -> Path:
+        source = self._assert_kaggle_source(job)
+        workspace = self._prepare_workspace(job)
+        return self.client.download_archive(
+            owner_slug=source.owner_slug,
+            dataset_slug=source.dataset_slug,
+            destination=workspace,
+        )
+
+    def _upload(
+        self, job: IngestionJob, items: List[Tuple[UploadSource, str]], ledger: RunLedger | None
+    ) -> List[str]:
+        manifest = UploadManifest.load(job.destination.bucket, job.destination.prefix)
+        results = upload_many(job.destination.bucket, items, manifest=manifest)
+        manifest.save()
+        if ledger is not None:
+            ledger.record_uploads(job.destination.bucket, results)
+        raise_for_failures(results)
+        return [result.object_name for result in results]
+
+    def push_to_minio(
+        self,
+        job: IngestionJob,
+        files: List[Path],
+        workspace: Path,
+        ledger: RunLedger | None = None,
+    ) -> List[str]:
+        items: List[Tuple[UploadSource, str]] = [
+            (file_path, job.destination.object_name(file_path.relative_to(workspace)))
+            for file_path in files
+        ]
+        return self._upload(job, items, ledger)
+
+    def push_archive_to_minio(
+        self,
+        job: IngestionJob,
+        archive: Path,
+        ledger: RunLedger | None = None,
+        converted: Dict[str, List[Path]] | None = None,
+    ) -> List[str]:
+        """Stream every member of ``archive`` into MinIO without extracting it to disk.
+
+        Members in ``converted`` are replaced by their Parquet files, unless the job keeps
+        its source files too.
+        """
+        converted = converted or {}
+        conversion = self._assert_kaggle_source(job).parquet
+        keep_source = conversion is not None and conversion.keep_source
+        workspace = archive.parent
+        with ZipMembers(archive) as members:
+            items: List[Tuple[UploadSource, str]] = [
+                (
+                    StreamSource(members.opener(info.filename), info.file_size, info.filename),
+                    job.destination.object_name(Path(info.filename)),
+                )
+                for info in members.members()
+                if keep_source or info.filename not in converted
+            ]
+            items.extend(
+                (path, job.destination.object_name(path.relative_to(workspace)))
+                for outputs in converted.values()
+                for path in outputs
+            )
+            return self._upload(job, items, ledger)
+
+    def convert_files(
+        self, conversion: ParquetConversion, files: List[Path], workspace: Path
+    ) -> Tuple[List[Path], Dict[str, List[Path]]]:
+        """Convert the tabular ``files`` to Parquet next to them.
+
+        Returns the files to upload, and the Parquet files written for each source file.
+        """
+        converter = ParquetConverter(conversion)
+        upload: List[Path] = []
+        converted: Dict[str, List[Path]] = {}
+        for path in files:
+            name = path.relative_to(workspace).as_posix()
+            if not converter.accepts(name):
+                upload.append(path)
+                continue
+            outputs = converted[name] = converter.convert(partial(path.open, "rb"), name, workspace)
+            self._log_conversion(name, path.stat().st_size, outputs)
+            upload.extend(outputs)
+            if conversion.keep_source:
+                upload.append(path)
+            else:
+                path.unlink()
+        return upload, converted
+
+    def convert_archive(
+        self, conversion: ParquetConversion, archive: Path
+    ) -> Dict[str, List[Path]]:
+        """Convert the tabular members of ``archive`` to Parquet, streaming them from the zip."""
+        converter = ParquetConverter(conversion)
+        converted: Dict[str, List[Path]] = {}
+        with ZipMembers(archive) as members:
+            for info in members.members():
+                if converter.accepts(info.filename):
+                    outputs = converter.convert(
+                        members.opener(info.filename), info.filename, archive.parent
+                    )
+                    converted[info.filename] = outputs
+                    self._log_conversion(info.filename, info.file_size, outputs)
+        return converted
+
+    def _log_conversion(self, name: str, size: int, outputs: List[Path]) -> None:
+        written = sum(path.stat().st_size for path in outputs)
+        logger.info(
+            "Converted %s to %d Parquet file(s): %.1f MiB -> %.1f MiB",
+            name,
+            len(outputs),
+            size / 1_048_576,
+            written / 1_048_576,
+        )
 
     def run(self, job: IngestionJob) -> List[str]:
         logger.info("Executing Kaggle ingestion job %s", job.job_id)
-        files, workspace = self.download(job)
-        if not files:
-            logger.warning("No files downloaded for job %s", job.job_id)
-            return []
-        uploaded = self.push_to_minio(job, files, workspace)
+        source = self._assert_kaggle_source(job)
+        with self.store.run(job, source="kaggle") as ledger:
+            if not source.requires_filtering():
+                with ledger.stage("download") as stage:
+                    archive = self.download_archive(job)
+                    stage.items = 1
+                    stage.bytes = archive.stat().st_size
+                converted: Dict[str, List[Path]] = {}
+                if source.parquet is not None:
+                    with ledger.stage("convert") as stage:
+                        converted = self.convert_archive(source.parquet, archive)
+                        stage.items = len(converted)
+                        stage.bytes = _total_size(converted)
+                with ledger.stage("upload") as stage:
+                    uploaded = self.push_archive_to_minio(
+                        job, archive, ledger=ledger, converted=converted
+                    )
+                    stage.items = len(uploaded)
+                logger.info("Completed job %s (%d objects uploaded)", job.job_id, len(uploaded))
+                return uploaded
+            with ledger.stage("download") as stage:
+                files, workspace = self.download(job)
+                stage.items = len(files)
+                stage.bytes = sum(path.stat().st_size for path in files)
+            if not files:
+                logger.warning("No files downloaded for job %s", job.job_id)
+                return []
+            if source.parquet is not None:
+                with ledger.stage("convert") as stage:
+                    files, converted = self.convert_files(source.parquet, files, workspace)
+                    stage.items = len(converted)
+                    stage.bytes = _total_size(converted)
+            with ledger.stage("upload") as stage:
+                uploaded = self.push_to_minio(job, files, workspace, ledger=ledger)
+                stage.items = len(uploaded)
         logger.info("Completed job %s (%d objects uploaded)", job.job_id, len(uploaded))
         return uploaded
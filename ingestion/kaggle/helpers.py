@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import threading
+import zipfile
 from pathlib import Path
-from typing import List, Sequence
+from typing import BinaryIO, Callable, List, Sequence
 
 from core.utils.file_utils import list_files
 
@@ -16,3 +18,56 @@ def filter_downloaded_files(directory: Path, file_names: Sequence[str] | None) -
         return files
     desired = {name.strip() for name in file_names if name.strip()}
     return [path for path in files if path.name in desired]
+
+
+def unpack_single_file(archive: Path, file_name: str) -> Path:
+    """Replace a zipped single-file download with the file it contains."""
+    target = archive.with_name(Path(file_name).name)
+    with zipfile.ZipFile(archive) as zf:
+        member = next(info for info in zf.infolist() if not info.is_dir())
+        with zf.open(member) as source, open(target, "wb") as sink:
+            while chunk := source.read(1024 * 1024):
+                sink.write(chunk)
+    archive.unlink()
+    return target
+
+
+class ZipMembers:
+    """Concurrent read access to the members of one zip archive.
+
+    Each thread gets its own ``ZipFile`` handle, so members decompress in parallel and the
+    central directory is parsed once per thread rather than once per member.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._local = threading.local()
+        self._handles: List[zipfile.ZipFile] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ZipMembers":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _handle(self) -> zipfile.ZipFile:
+        handle = getattr(self._local, "handle", None)
+        if handle is None:
+            handle = zipfile.ZipFile(self.path)
+            self._local.handle = handle
+            with self._lock:
+                self._handles.append(handle)
+        return handle
+
+    def members(self) -> List[zipfile.ZipInfo]:
+        return [info for info in self._handle().infolist() if not info.is_dir()]
+
+    def opener(self, name: str) -> Callable[[], BinaryIO]:
+        return lambda: self._handle().open(name)
+
+    def close(self) -> None:
+        with self._lock:
+            for handle in self._handles:
+                handle.close()
+            self._handles.clear()
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import List
+
+from core.models.datasource import ApiDataSource
+from core.models.ingestion_job import IngestionJob
+from ingestion.api.rest_downloader import RestApiDownloader
+from ingestion.api.settings import ApiFetchSettings
+from ingestion.pipelines.base_pipeline import BasePipeline
+
+
+class ApiPipeline(BasePipeline):
+    def __init__(
+        self,
+        downloader: RestApiDownloader | None = None,
+        settings: ApiFetchSettings | None = None,
+    ) -> None:
+        self.downloader = downloader or RestApiDownloader(settings=settings)
+
+    def can_handle(self, job: IngestionJob) -> bool:
+        return isinstance(job.source, ApiDataSource)
+
+    def run(self, job: IngestionJob) -> List[str]:
+        return self.downloader.run(job)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import List
+
+from core.models.datasource import DownloadDataSource
+from core.models.ingestion_job import IngestionJob
+from ingestion.pipelines.base_pipeline import BasePipeline
+from ingestion.python_download.downloader import SegmentedDownloader
+from ingestion.python_download.settings import DownloadSettings
+
+
+class PythonDownloaderPipeline(BasePipeline):
+    def __init__(
+        self,
+        downloader: SegmentedDownloader | None = None,
+        settings: DownloadSettings | None = None,
+    ) -> None:
+        self.downloader = downloader or SegmentedDownloader(settings=settings)
+
+    def can_handle(self, job: IngestionJob) -> bool:
+        return isinstance(job.source, DownloadDataSource)
+
+    def run(self, job: IngestionJob) -> List[str]:
+        return self.downloader.run(job)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import List
+
+from core.models.datasource import S3DataSource
+from core.models.ingestion_job import IngestionJob
+from ingestion.pipelines.base_pipeline import BasePipeline
+from ingestion.s3.settings import S3SyncSettings
+from ingestion.s3.syncer import S3Syncer
+
+
+class S3Pipeline(BasePipeline):
+    def __init__(
+        self, syncer: S3Syncer | None = None, settings: S3SyncSettings | None = None
+    ) -> None:
+        self.syncer = syncer or S3Syncer(settings=settings)
+
+    def can_handle(self, job: IngestionJob) -> bool:
+        return isinstance(job.source, S3DataSource)
+
+    def run(self, job: IngestionJob) -> List[str]:
+        return self.syncer.run(job)
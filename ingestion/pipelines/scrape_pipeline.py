@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import List
+
+from core.models.datasource import WebDataSource
+from core.models.ingestion_job import IngestionJob
+from ingestion.pipelines.base_pipeline import BasePipeline
+from ingestion.web.scraper import WebScraper
+from ingestion.web.settings import CrawlSettings
+
+
+class ScrapePipeline(BasePipeline):
+    def __init__(
+        self, scraper: WebScraper | None = None, settings: CrawlSettings | None = None
+    ) -> None:
+        self.scraper = scraper or WebScraper(settings=settings)
+
+    def can_handle(self, job: IngestionJob) -> bool:
+        return isinstance(job.source, WebDataSource)
+
+    def run(self, job: IngestionJob) -> List[str]:
+        return self.scraper.run(job)
@@ -1 +1,531 @@
-# Generic Python downloads (requests, wget, etc.)
+"""Download large files over several parallel HTTP Range requests, resumably.
+
+A file is split into segments that connections pull concurrently. A connection that runs out
+of work takes half of the largest segment still in flight, so every connection stays busy
+until the end. Progress is made durable every ``checkpoint_bytes``: the data is fsynced and
+a ``.download.json`` sidecar records how far each segment got. An interrupted download
+therefore resumes from there, as long as the server still reports the same ETag (or
+Last-Modified) and size.
+
+The checksum follows the contiguous prefix of the file as it fills in. Bytes written at the
+front of the file are hashed from memory; anything behind it is re-read from the page cache.
+Verifying at the end therefore only costs the tail.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.exceptions.ingestion_error import ChecksumMismatchError, IngestionError
+from core.exceptions.retry_error import CircuitOpenError, RetryableError
+from core.exceptions.storage_error import ObjectUploadError
+from core.models.datasource import DownloadDataSource, RemoteFile
+from core.models.ingestion_job import IngestionJob
+from core.utils.file_utils import ensure_dir
+from core.utils.rate_limit import TokenBucket, rate_limiter
+from core.utils.retry import RetryPolicy, parse_retry_after
+from infrastructure.db.metadata_store import MetadataStore, RunLedger, get_metadata_store
+from infrastructure.logging.logger import get_logger
+from infrastructure.metrics.instruments import track_operation
+from infrastructure.minio.client import get_storage_session
+from infrastructure.minio.uploader import upload_file
+from ingestion.python_download.helpers import (
+    DownloadState,
+    Segment,
+    file_name,
+    parse_checksum,
+    plan_segments,
+)
+from ingestion.python_download.settings import DownloadSettings
+
+logger = get_logger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = (
+    RetryableError,
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+# Errors after which a file is given up on; the other files of the job still run.
+FILE_ERRORS = (requests.RequestException, RetryableError, CircuitOpenError, IngestionError, OSError)
+# Hashing the file's prefix from disk is done in blocks of this size.
+HASH_BLOCK = 4 * 1024 * 1024
+
+_slots: Dict[int, threading.BoundedSemaphore] = {}
+_slots_lock = threading.Lock()
+
+
+def connection_slots(limit: int) -> threading.BoundedSemaphore:
+    """The process-wide semaphore capping open ranged requests at ``limit``."""
+    with _slots_lock:
+        slots = _slots.get(limit)
+        if slots is None:
+            slots = _slots[limit] = threading.BoundedSemaphore(max(limit, 1))
+        return slots
+
+
+@dataclass(frozen=True)
+class RemoteInfo:
+    size: int | None
+    ranges: bool
+    # Strong ETag, or else Last-Modified; sent as If-Range so a changed file is noticed.
+    validator: str | None
+    content_type: str | None
+
+
+@dataclass(frozen=True)
+class DownloadResult:
+    path: Path
+    size: int
+    sha256: str
+    content_type: str | None
+
+
+class _PrefixHasher:
+    """Hashes a file front to back while its segments are still being written."""
+
+    def __init__(self, fd: int, algorithms: List[str]) -> None:
+        self.fd = fd
+        self.hashes = {name: hashlib.new(name) for name in algorithms}
+        self.offset = 0
+        self._lock = threading.Lock()
+
+    def _update(self, data: bytes | memoryview) -> None:
+        for digest in self.hashes.values():
+            digest.update(data)
+        self.offset += len(data)
+
+    def feed(self, start: int, data: bytes, frontier: int, wait: bool = False) -> None:
+        """Take ``data`` (written at ``start``) if it is next, then read up to ``frontier``.
+
+        Without ``wait``, a thread that finds another one hashing moves on; whichever
+        thread hashes next picks up the bytes from disk.
+        """
+        if not self._lock.acquire(blocking=wait):
+            return
+        try:
+            if start == self.offset and data:
+                self._update(data)
+            while self.offset < frontier:
+                block = os.pread(self.fd, min(HASH_BLOCK, frontier - self.offset), self.offset)
+                if not block:
+                    raise IngestionError("File ended before its expected size")
+                self._update(block)
+        finally:
+            self._lock.release()
+
+    def hexdigest(self, algorithm: str) -> str:
+        return self.hashes[algorithm].hexdigest()
+
+
+class _Transfer:
+    """Shared state of one file's segments, its hasher and its checkpoints."""
+
+    def __init__(
+        self,
+        url: str,
+        fd: int,
+        info: RemoteInfo,
+        segments: List[Segment],
+        state_path: Path,
+        hasher: _PrefixHasher,
+        settings: DownloadSettings,
+    ) -> None:
+        self.url = url
+        self.fd = fd
+        self.info = info
+        self.segments = sorted(segments, key=lambda segment: segment.start)
+        self.state_path = state_path
+        self.hasher = hasher
+        self.settings = settings
+        self.error: BaseException | None = None
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._unsaved = 0
+
+    def _frontier(self) -> int:
+        """End of the contiguous prefix already on disk. Call with the lock held."""
+        for segment in self.segments:
+            if segment.remaining:
+                return segment.position
+        return self.info.size or 0
+
+    def frontier(self) -> int:
+        with self._lock:
+            return self._frontier()
+
+    def claim(self) -> Optional[Segment]:
+        with self._lock:
+            if self.error is not None:
+                return None
+            for segment in self.segments:
+                if not segment.active and segment.remaining:
+                    segment.active = True
+                    return segment
+            busiest = max(
+                (segment for segment in self.segments if segment.active),
+                key=lambda segment: segment.remaining,
+                default=None,
+            )
+            if busiest is None or busiest.remaining < 2 * self.settings.min_segment_size:
+                return None
+            middle = busiest.position + busiest.remaining // 2
+            stolen = Segment(middle, busiest.end, middle, active=True)
+            busiest.end = middle
+            self.segments.insert(self.segments.index(busiest) + 1, stolen)
+            return stolen
+
+    def release(self, segment: Segment) -> None:
+        with self._lock:
+            segment.active = False
+
+    def limit(self, segment: Segment) -> int:
+        with self._lock:
+            return segment.end
+
+    def advance(self, segment: Segment, start: int, data: bytes) -> None:
+        with self._lock:
+            segment.position = start + len(data)
+            frontier = self._frontier()
+            self._unsaved += len(data)
+            due = self._unsaved >= self.settings.checkpoint_bytes
+        self.hasher.feed(start, data, frontier)
+        if due:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Make everything written so far durable, then record it in the sidecar."""
+        if not self._checkpoint_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                snapshot = [[s.start, s.end, s.position] for s in self.segments]
+                self._unsaved = 0
+            os.fsync(self.fd)
+            DownloadState(self.url, self.info.size or 0, self.info.validator, snapshot).save(
+                self.state_path
+            )
+        finally:
+            self._checkpoint_lock.release()
+
+    def fail(self, exc: BaseException) -> None:
+        with self._lock:
+            if self.error is None:
+                self.error = exc
+
+    def complete(self) -> bool:
+        with self._lock:
+            return all(not segment.remaining for segment in self.segments)
+
+
+class SegmentedDownloader:
+    def __init__(
+        self,
+        settings: DownloadSettings | None = None,
+        store: MetadataStore | None = None,
+    ) -> None:
+        self.settings = settings or DownloadSettings()
+        self.store = store or get_metadata_store()
+        self.session = requests.Session()
+        pool = max(self.settings.max_connections, self.settings.connections_per_file) + 2
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = self.settings.user_agent
+        self._slots = connection_slots(self.settings.max_connections)
+
+    def _assert_download_source(self, job: IngestionJob) -> DownloadDataSource:
+        if not isinstance(job.source, DownloadDataSource):
+            raise IngestionError("SegmentedDownloader requires a DownloadDataSource")
+        return job.source
+
+    def _bandwidth(self) -> TokenBucket | None:
+        if not self.settings.bandwidth:
+            return None
+        # One token per chunk; the burst lets every connection start without waiting.
+        return rate_limiter(
+            "download-bandwidth",
+            rate=self.settings.bandwidth / self.settings.chunk_size,
+            burst=self.settings.max_connections,
+        )
+
+    def _policy(self, url: str) -> RetryPolicy:
+        return RetryPolicy(
+            retry_on=TRANSIENT_ERRORS,
+            attempts=self.settings.retries,
+            host=urlsplit(url).netloc,
+        )
+
+    def _raise_for_status(self, response: requests.Response, url: str) -> None:
+        if response.status_code in RETRYABLE_STATUS:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            raise RetryableError(f"HTTP {response.status_code} for {url}", retry_after)
+        if response.status_code >= 400:
+            raise IngestionError(f"HTTP {response.status_code} for {url}")
+
+    def probe(self, url: str) -> RemoteInfo:
+        """Size, range support and validator, from a one-byte ranged GET.
+
+        A ranged GET rather than HEAD, because some servers and CDNs answer HEAD differently.
+        """
+
+        def _attempt() -> RemoteInfo:
+            with track_operation("http_probe", urlsplit(url).netloc):
+                response = self.session.get(
+                    url, headers={"Range": "bytes=0-0"}, stream=True, timeout=self.settings.timeout
+                )
+                with response:
+                    headers = response.headers
+                    total = headers.get("Content-Range", "").rpartition("/")[2]
+                    if response.status_code == 416 and total == "0":
+                        # An empty file has no byte 0 to return; it is fetched without ranges.
+                        return RemoteInfo(0, False, None, headers.get("Content-Type"))
+                    self._raise_for_status(response, url)
+                    etag = headers.get("ETag")
+                    validator = etag if etag and not etag.startswith("W/") else None
+                    validator = validator or headers.get("Last-Modified")
+                    content_type = headers.get("Content-Type")
+                    if response.status_code == 206:
+                        size = int(total) if total.isdigit() else None
+                        return RemoteInfo(size, size is not None, validator, content_type)
+                    length = headers.get("Content-Length")
+                    size = int(length) if length and length.isdigit() else None
+                    return RemoteInfo(size, False, validator, content_type)
+
+        return self._policy(url).call(_attempt)
+
+    def _read_range(
+        self, transfer: _Transfer, segment: Segment, throttle: TokenBucket | None
+    ) -> None:
+        url = transfer.url
+
+        def _attempt() -> None:
+            with self._slots:
+                start = segment.position
+                end = transfer.limit(segment)
+                if start >= end or transfer.error is not None:
+                    return
+                headers = {"Range": f"bytes={start}-{end - 1}"}
+                if transfer.info.validator:
+                    headers["If-Range"] = transfer.info.validator
+                with track_operation("http_range", urlsplit(url).netloc):
+                    response = self.session.get(
+                        url, headers=headers, stream=True, timeout=self.settings.timeout
+                    )
+                    with response:
+                        self._raise_for_status(response, url)
+                        if response.status_code != 206:
+                            # If-Range failed: the file changed since the download started.
+                            raise IngestionError(
+                                f"{url} changed on the server during the download; "
+                                "rerun to start it over"
+                            )
+                        for chunk in response.iter_content(self.settings.chunk_size):
+                            if throttle is not None:
+                                throttle.acquire()
+                            position = segment.position
+                            end = transfer.limit(segment)  # Shrinks when the tail is taken.
+                            data = chunk[: max(end - position, 0)]
+                            if data:
+                                os.pwrite(transfer.fd, data, position)
+                                transfer.advance(segment, position, data)
+                            if len(data) < len(chunk) or transfer.error is not None:
+                                break
+            if segment.position < transfer.limit(segment) and transfer.error is None:
+                raise RetryableError(f"Range of {url} ended early at byte {segment.position}")
+
+        self._policy(url).call(_attempt)
+
+    def _work(self, transfer: _Transfer, throttle: TokenBucket | None) -> None:
+        while True:
+            segment = transfer.claim()
+            if segment is None:
+                return
+            try:
+                self._read_range(transfer, segment, throttle)
+            except BaseException as exc:
+                transfer.fail(exc)
+                raise
+            finally:
+                transfer.release(segment)
+
+    def _segments(
+        self, url: str, info: RemoteInfo, partial: Path, state_path: Path
+    ) -> List[Segment]:
+        """Segments to fetch, resumed from the sidecar when it still matches the server."""
+        size = info.size or 0
+        state = DownloadState.load(state_path)
+        if (
+            state is not None
+            and partial.exists()
+            and state.url == url
+            and state.size == size
+            and state.validator == info.validator
+            and info.validator is not None
+            and partial.stat().st_size == size
+        ):
+            segments = state.restore()
+            done = sum(segment.position - segment.start for segment in segments)
+            logger.info(
+                "Resuming %s at %.1f%% (%d bytes on disk)", url, 100 * done / max(size, 1), done
+            )
+            return segments
+        with open(partial, "wb") as handle:
+            handle.truncate(size)
+        return plan_segments(
+            size, self.settings.connections_per_file, self.settings.min_segment_size
+        )
+
+    def _stream(
+        self, url: str, fd: int, hasher: _PrefixHasher, throttle: TokenBucket | None
+    ) -> int:
+        """Single-connection fallback for servers without range support."""
+
+        def _attempt() -> int:
+            os.ftruncate(fd, 0)
+            hasher.offset = 0
+            hasher.hashes = {name: hashlib.new(name) for name in hasher.hashes}
+            written = 0
+            with self._slots, track_operation("http_range", urlsplit(url).netloc):
+                response = self.session.get(url, stream=True, timeout=self.settings.timeout)
+                with response:
+                    self._raise_for_status(response, url)
+                    for chunk in response.iter_content(self.settings.chunk_size):
+                        if throttle is not None:
+                            throttle.acquire()
+                        os.pwrite(fd, chunk, written)
+                        hasher.feed(written, chunk, written + len(chunk), wait=True)
+                        written += len(chunk)
+            return written
+
+        return self._policy(url).call(_attempt)
+
+    def download(self, remote: RemoteFile, directory: Path) -> DownloadResult:
+        url = remote.url
+        expected = parse_checksum(remote.checksum) if remote.checksum else None
+        algorithms = sorted({"sha256", expected[0]} if expected else {"sha256"})
+        path = ensure_dir(directory) / file_name(url, remote.name)
+        ensure_dir(path.parent)
+        partial = path.with_name(path.name + ".part")
+        state_path = path.with_name(path.name + ".download.json")
+        info = self.probe(url)
+        throttle = self._bandwidth()
+        started = time.perf_counter()
+        ranged = info.ranges and info.size is not None
+        if not ranged:
+            state_path.unlink(missing_ok=True)
+            partial.touch()
+        segments = self._segments(url, info, partial, state_path) if ranged else []
+        fd = os.open(partial, os.O_RDWR)
+        try:
+            hasher = _PrefixHasher(fd, algorithms)
+            if ranged:
+                transfer = _Transfer(url, fd, info, segments, state_path, hasher, self.settings)
+                connections = min(self.settings.connections_per_file, self.settings.max_connections)
+                try:
+                    with ThreadPoolExecutor(connections, thread_name_prefix="range") as pool:
+                        futures = [
+                            pool.submit(
+                                contextvars.copy_context().run, self._work, transfer, throttle
+                            )
+                            for _ in range(connections)
+                        ]
+                        for future in futures:
+                            future.result()
+                finally:
+                    if not transfer.complete():
+                        transfer.checkpoint()
+                size = info.size or 0
+                hasher.feed(hasher.offset, b"", transfer.frontier(), wait=True)
+            else:
+                size = self._stream(url, fd, hasher, throttle)
+        finally:
+            os.close(fd)
+        if expected and hasher.hexdigest(expected[0]) != expected[1]:
+            partial.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            raise ChecksumMismatchError(
+                f"{url}: {expected[0]} is {hasher.hexdigest(expected[0])}, expected {expected[1]}"
+            )
+        os.replace(partial, path)
+        state_path.unlink(missing_ok=True)
+        seconds = max(time.perf_counter() - started, 1e-9)
+        logger.info(
+            "Downloaded %s (%.1f MiB in %.1fs, %.1f MiB/s%s)",
+            url,
+            size / 1_048_576,
+            seconds,
+            size / 1_048_576 / seconds,
+            ", checksum verified" if expected else "",
+        )
+        return DownloadResult(path, size, hasher.hexdigest("sha256"), info.content_type)
+
+    def _already_stored(self, bucket: str, object_name: str, remote: RemoteFile) -> bool:
+        stat = get_storage_session().stat_object(bucket, object_name)
+        if stat is None:
+            return False
+        info = self.probe(remote.url)
+        return info.size is not None and stat.size == info.size
+
+    def _transfer(
+        self, job: IngestionJob, remote: RemoteFile, ledger: RunLedger | None
+    ) -> str | None:
+        bucket = job.destination.bucket
+        name = file_name(remote.url, remote.name)
+        object_name = job.destination.object_name(Path(name))
+        try:
+            if self._already_stored(bucket, object_name, remote):
+                logger.info("Skipping %s: %s/%s is already stored", remote.url, bucket, object_name)
+                if ledger is not None:
+                    ledger.record_object(bucket, object_name, skipped=True)
+                return None
+            result = self.download(remote, job.workspace_path() / "downloads")
+            upload_file(bucket, result.path, object_name, content_type=result.content_type)
+        except FILE_ERRORS + (ObjectUploadError,) as exc:
+            logger.error("Could not transfer %s: %s", remote.url, exc)
+            if ledger is not None:
+                ledger.record_object(bucket, object_name, error=str(exc))
+            return None
+        if ledger is not None:
+            ledger.record_object(bucket, object_name, size=result.size, sha256=result.sha256)
+        if not self.settings.keep_files:
+            result.path.unlink(missing_ok=True)
+        return object_name
+
+    def fetch(self, job: IngestionJob, ledger: RunLedger | None = None) -> List[str]:
+        source = self._assert_download_source(job)
+        with ThreadPoolExecutor(self.settings.parallel_files, thread_name_prefix="file") as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._transfer, job, remote, ledger)
+                for remote in source.files
+            ]
+            uploaded = [future.result() for future in futures]
+        return [object_name for object_name in uploaded if object_name]
+
+    def run(self, job: IngestionJob) -> List[str]:
+        logger.info("Executing download job %s", job.job_id)
+        source = self._assert_download_source(job)
+        with self.store.run(job, source="python_download") as ledger:
+            with ledger.stage("transfer") as stage:
+                uploaded = self.fetch(job, ledger)
+                stage.items = len(uploaded)
+        logger.info(
+            "Completed job %s (%d of %d files uploaded)",
+            job.job_id,
+            len(uploaded),
+            len(source.files),
+        )
+        return uploaded
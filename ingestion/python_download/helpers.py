@@ -1 +1,75 @@
-# Python download helpers
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import posixpath
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Tuple
+from urllib.parse import unquote, urlsplit
+
+from core.exceptions.ingestion_error import IngestionError
+
+
+def parse_checksum(spec: str) -> Tuple[str, str]:
+    """Split ``sha256:<hex>`` into a hashlib algorithm name and a lower-case digest."""
+    algorithm, sep, digest = spec.partition(":")
+    algorithm = algorithm.strip().lower().replace("-", "")
+    if not sep or not digest.strip() or algorithm not in hashlib.algorithms_available:
+        raise IngestionError(f"Checksum '{spec}' must look like sha256:<hex digest>")
+    return algorithm, digest.strip().lower()
+
+
+def file_name(url: str, name: str | None = None) -> str:
+    if name:
+        return name.strip("/")
+    return posixpath.basename(unquote(urlsplit(url).path)) or "download"
+
+
+@dataclass
+class Segment:
+    """Bytes ``[start, end)`` of a file; everything before ``position`` is on disk."""
+
+    start: int
+    end: int
+    position: int
+    active: bool = False
+
+    @property
+    def remaining(self) -> int:
+        return max(self.end - self.position, 0)
+
+
+def plan_segments(size: int, parts: int, min_size: int) -> List[Segment]:
+    parts = max(1, min(parts, size // max(min_size, 1)))
+    step = -(-size // parts) if size else 0
+    return [
+        Segment(start, min(start + step, size), start) for start in range(0, size, step or 1)
+    ] or [Segment(0, 0, 0)]
+
+
+@dataclass
+class DownloadState:
+    """Sidecar of a partial download, enough to resume it in a later run."""
+
+    url: str
+    size: int
+    validator: str | None
+    # [start, end, position] for each segment.
+    segments: List[List[int]]
+
+    @classmethod
+    def load(cls, path: Path) -> "DownloadState | None":
+        try:
+            return cls(**json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, path: Path) -> None:
+        temporary = path.with_name(path.name + ".tmp")
+        temporary.write_text(json.dumps(asdict(self)), encoding="utf-8")
+        os.replace(temporary, path)
+
+    def restore(self) -> List[Segment]:
+        return [Segment(start, end, position) for start, end, position in self.segments]
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class DownloadSettings:
+    """Transfer tuning. The connection and bandwidth caps hold across all files of a job."""
+
+    connections_per_file: int = 8
+    # Ranged requests open at once in this process, across every file and job.
+    max_connections: int = 16
+    parallel_files: int = 2
+    # Ranges are never split below this, so small files use fewer connections.
+    min_segment_size: int = 8 * 1024 * 1024
+    chunk_size: int = 1024 * 1024
+    # Bytes per second, shared by every process on the machine; None is unlimited.
+    bandwidth: float | None = None
+    timeout: float = 60.0
+    retries: int = 5
+    # Progress is made durable (fsync + state file) after this many bytes of a file.
+    checkpoint_bytes: int = 64 * 1024 * 1024
+    keep_files: bool = False
+    user_agent: str = "data-ingestion-downloader/1.0"
@@ -1,18 +1,111 @@
 from __future__ import annotations
 
-from typing import List
+import importlib
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple, Union
 
 from core.models.ingestion_job import IngestionJob
+from infrastructure.logging.logger import get_logger
 from ingestion.pipelines.base_pipeline import BasePipeline
-from ingestion.pipelines.kaggle_pipeline import KagglePipeline
-from ingestion.pipelines.arxiv_pipeline import ArxivPipeline
 
+logger = get_logger(__name__)
 
+ENTRY_POINT_GROUP = "data_ingestion.pipelines"
 
+PipelineFactory = Callable[..., BasePipeline]
 
-def get_pipeline_for(job: IngestionJob, arxiv_category = None, dataset_id = None) -> BasePipeline:
-    _PIPELINES: List[BasePipeline] = [KagglePipeline(), ArxivPipeline(query=arxiv_category, dataset_id=dataset_id)]
-    for pipeline in _PIPELINES:
-        if pipeline.can_handle(job):
-            return pipeline
-    raise ValueError(f"No pipeline registered for job {job.job_id}")
+# Built-in pipelines by DataSource.source_type, as "module:attribute" so nothing heavy is
+# imported until a job of that type actually runs.
+_FACTORIES: Dict[str, Union[str, PipelineFactory]] = {
+    "kaggle": "ingestion.pipelines.kaggle_pipeline:KagglePipeline",
+    "arxiv": "ingestion.pipelines.arxiv_pipeline:ArxivPipeline",
+    "web": "ingestion.pipelines.scrape_pipeline:ScrapePipeline",
+    "api": "ingestion.pipelines.api_pipeline:ApiPipeline",
+    "s3": "ingestion.pipelines.s3_pipeline:S3Pipeline",
+    "python_download": "ingestion.pipelines.python_downloader_pipeline:PythonDownloaderPipeline",
+}
+_factories_lock = threading.Lock()
+_entry_points_loaded = False
+_generation = 0
+_local = threading.local()
+
+
+def register_pipeline(source_type: str, factory: Union[str, PipelineFactory]) -> None:
+    """Register ``factory`` (a callable or ``"module:attribute"``) for ``source_type``.
+
+    Pipelines already cached by any thread are rebuilt on their next lookup.
+    """
+    global _generation
+    with _factories_lock:
+        _FACTORIES[source_type] = factory
+        _generation += 1
+
+
+def _load_entry_points() -> None:
+    """Pick up third-party pipelines declared under the ``data_ingestion.pipelines`` group.
+
+    The entry point name is the source type and its value the pipeline factory; built-in
+    registrations take precedence.
+    """
+    from importlib import metadata
+
+    global _entry_points_loaded
+    with _factories_lock:
+        if _entry_points_loaded:
+            return
+        _entry_points_loaded = True
+        discovered = metadata.entry_points()
+        if hasattr(discovered, "select"):
+            group = discovered.select(group=ENTRY_POINT_GROUP)
+        else:  # Python 3.9 returns a dict keyed by group.
+            group = discovered.get(ENTRY_POINT_GROUP, [])
+        for entry_point in group:
+            _FACTORIES.setdefault(entry_point.name, entry_point.value)
+
+
+def _resolve(source_type: str) -> PipelineFactory:
+    factory = _FACTORIES.get(source_type)
+    if factory is None:
+        _load_entry_points()
+        factory = _FACTORIES.get(source_type)
+    if factory is None:
+        raise ValueError(f"No pipeline registered for source type '{source_type}'")
+    if isinstance(factory, str):
+        module_name, _, attributes = factory.partition(":")
+        factory = importlib.import_module(module_name)
+        for attribute in attributes.split("."):
+            factory = getattr(factory, attribute)
+        with _factories_lock:
+            _FACTORIES[source_type] = factory
+    return factory
+
+
+def _pipelines() -> Dict[Tuple[str, Hashable], BasePipeline]:
+    if getattr(_local, "generation", None) != _generation:
+        _local.pipelines = {}
+        _local.generation = _generation
+    return _local.pipelines
+
+
+def get_pipeline_for(job: IngestionJob, **options: Any) -> BasePipeline:
+    """Return this thread's pipeline for ``job``'s source type, building it on first use.
+
+    Pipelines are cached per thread and per set of ``options`` (passed to the factory, so
+    they must be hashable), which lets clients and HTTP sessions be reused across jobs
+    without being shared between concurrently running workers.
+    """
+    source_type = type(job.source).source_type
+    if not source_type:
+        raise ValueError(f"No pipeline registered for job {job.job_id}")
+    key = (source_type, tuple(sorted(options.items())))
+    cache = _pipelines()
+    pipeline = cache.get(key)
+    if pipeline is None:
+        logger.debug("Building %s pipeline for thread %s", source_type, threading.get_ident())
+        pipeline = cache[key] = _resolve(source_type)(**options)
+    return pipeline
+
+
+def clear_pipeline_cache() -> None:
+    """Drop the calling thread's cached pipelines."""
+    _pipelines().clear()
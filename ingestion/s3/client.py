@@ -1 +1,52 @@
-# boto3 client wrapper
+from __future__ import annotations
+
+from urllib.parse import urlsplit
+
+import boto3
+from botocore.config import Config
+
+from core.models.datasource import S3DataSource
+from infrastructure.minio.client import MinioSettings, get_minio_settings
+
+
+def _config(max_pool: int, max_attempts: int, path_style: bool) -> Config:
+    return Config(
+        max_pool_connections=max_pool,
+        retries={"mode": "adaptive", "max_attempts": max_attempts},
+        s3={"addressing_style": "path"} if path_style else {},
+    )
+
+
+def source_client(source: S3DataSource, max_pool: int = 32, max_attempts: int = 8):
+    """boto3 S3 client for the source, using boto3's credential chain."""
+    session = boto3.session.Session(profile_name=source.profile, region_name=source.region)
+    return session.client(
+        "s3",
+        endpoint_url=source.endpoint_url,
+        config=_config(max_pool, max_attempts, path_style=source.endpoint_url is not None),
+    )
+
+
+def minio_endpoint_url(settings: MinioSettings) -> str:
+    return f"{'https' if settings.secure else 'http'}://{settings.endpoint}"
+
+
+def minio_client(max_pool: int = 32, max_attempts: int = 8):
+    """boto3 S3 client for MinIO, for the multipart and copy calls the MinIO SDK keeps private."""
+    settings = get_minio_settings()
+    return boto3.session.Session().client(
+        "s3",
+        endpoint_url=minio_endpoint_url(settings),
+        aws_access_key_id=settings.access_key,
+        aws_secret_access_key=settings.secret_key,
+        region_name=settings.region or "us-east-1",
+        config=_config(max_pool, max_attempts, path_style=True),
+    )
+
+
+def is_minio_endpoint(endpoint_url: str | None) -> bool:
+    """Whether ``endpoint_url`` points at the configured MinIO cluster."""
+    if not endpoint_url:
+        return False
+    netloc = urlsplit(endpoint_url if "//" in endpoint_url else f"//{endpoint_url}").netloc
+    return netloc.lower() == get_minio_settings().endpoint.lower()
@@ -1 +1,152 @@
-# S3 helpers
+from __future__ import annotations
+
+import contextvars
+import math
+import queue
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+# S3 allows at most this many parts in one multipart upload.
+MAX_PARTS = 10_000
+
+
+@dataclass(frozen=True)
+class ObjectEntry:
+    key: str
+    size: int
+    etag: str
+    last_modified: datetime
+
+    @property
+    def multipart(self) -> bool:
+        return "-" in self.etag
+
+
+def folder_prefix(prefix: str) -> str:
+    """``prefix`` as a folder: empty, or ending in a single ``/``."""
+    prefix = prefix.strip("/")
+    return f"{prefix}/" if prefix else ""
+
+
+def list_objects(
+    client: Any, bucket: str, prefix: str = "", delimiter: str | None = None
+) -> Iterator[ObjectEntry]:
+    """Objects under ``prefix`` in key order; with a ``delimiter``, only the direct children."""
+    kwargs = {"Bucket": bucket, "Prefix": prefix}
+    if delimiter:
+        kwargs["Delimiter"] = delimiter
+    for page in client.get_paginator("list_objects_v2").paginate(**kwargs):
+        for item in page.get("Contents", ()):
+            yield ObjectEntry(
+                key=item["Key"],
+                size=int(item["Size"]),
+                etag=item.get("ETag", "").strip('"'),
+                last_modified=item["LastModified"],
+            )
+
+
+def list_shards(client: Any, bucket: str, prefix: str) -> List[Tuple[str, str | None]]:
+    """Split a listing into (prefix, delimiter) pieces that can be listed independently.
+
+    The first piece holds the objects directly under ``prefix``; each top-level folder below
+    it is a piece of its own.
+    """
+    shards: List[Tuple[str, str | None]] = [(prefix, "/")]
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+        shards.extend((item["Prefix"], None) for item in page.get("CommonPrefixes", ()))
+    return shards
+
+
+def needs_copy(source: ObjectEntry, destination: ObjectEntry | None) -> bool:
+    """Whether the destination copy is missing or differs from the source.
+
+    Multipart ETags depend on the part size used by whoever wrote the object, so when either
+    side has one and they differ, a destination written after the source counts as current.
+    """
+    if destination is None or destination.size != source.size:
+        return True
+    if destination.etag == source.etag:
+        return False
+    if not source.multipart and not destination.multipart:
+        return True
+    return destination.last_modified < source.last_modified
+
+
+def align(
+    source: Iterable[ObjectEntry],
+    destination: Iterable[ObjectEntry],
+    source_prefix: str,
+    destination_prefix: str,
+) -> Iterator[Tuple[ObjectEntry, Optional[ObjectEntry]]]:
+    """Merge-join two key-ordered listings, pairing each source object with its copy."""
+    targets = iter(destination)
+    target = next(targets, None)
+    for entry in source:
+        relative = entry.key[len(source_prefix):]
+        while target is not None and target.key[len(destination_prefix):] < relative:
+            target = next(targets, None)
+        if target is not None and target.key[len(destination_prefix):] == relative:
+            yield entry, target
+        else:
+            yield entry, None
+
+
+def part_ranges(size: int, part_size: int) -> List[Tuple[int, int]]:
+    """Inclusive byte ranges for a multipart copy, grown if needed to fit ``MAX_PARTS``."""
+    part_size = max(part_size, math.ceil(size / MAX_PARTS))
+    return [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+
+
+class BackgroundIterator:
+    """Runs an iterator on its own thread, ``depth`` items ahead of the consumer.
+
+    Used to list the destination while the source is being listed.
+    """
+
+    _END = object()
+
+    def __init__(self, iterable: Iterable[Any], depth: int = 2000) -> None:
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=depth)
+        self._closed = threading.Event()
+        context = contextvars.copy_context()
+        self._thread = threading.Thread(
+            target=context.run, args=(self._fill, iterable), daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item: Any) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill(self, iterable: Iterable[Any]) -> None:
+        try:
+            for item in iterable:
+                if not self._put(item):
+                    return
+        except BaseException as exc:  # re-raised on the consumer's thread
+            self._put(exc)
+            return
+        self._put(self._END)
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._closed.set()
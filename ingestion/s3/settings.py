@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class S3SyncSettings:
+    """Sync tuning. Part sizes must stay within S3's 5 MiB - 5 GiB multipart limits."""
+
+    # Objects copied at once, and the parts of one large object copied at once.
+    workers: int = 32
+    part_workers: int = 8
+    # Top-level prefixes whose listings are diffed in parallel.
+    list_workers: int = 8
+    multipart_threshold: int = 64 * 1024 * 1024
+    part_size: int = 64 * 1024 * 1024
+    # Streamed (non server-side) copies: chunk held per object, and the bytes of ranged
+    # parts held in memory across all part workers.
+    stream_chunk_size: int = 8 * 1024 * 1024
+    max_buffered_bytes: int = 512 * 1024 * 1024
+    # botocore's adaptive retry mode also slows down when the store throttles.
+    max_attempts: int = 8
+    dry_run: bool = False
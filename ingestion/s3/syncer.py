@@ -1 +1,321 @@
-# Sync from S3 → MinIO
+"""Mirror an S3 bucket (or a prefix of one) into MinIO, copying only what changed.
+
+Each top-level folder of the source is diffed on its own listing thread. The destination is
+listed on another thread at the same time, and the two key-ordered listings are merge-joined,
+so neither is held in memory. Changed objects are copied by a pool of workers. Objects larger
+than ``multipart_threshold`` are copied as parallel ranged parts. When the source is the MinIO
+cluster itself, every copy is server-side (``CopyObject`` / ``UploadPartCopy``), so no object
+data passes through this process.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+from urllib.parse import urlsplit
+
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
+
+from core.exceptions.ingestion_error import IngestionError
+from core.models.datasource import S3DataSource
+from core.models.ingestion_job import IngestionJob
+from infrastructure.db.metadata_store import MetadataStore, RunLedger, get_metadata_store
+from infrastructure.logging.logger import PER_OBJECT, get_logger
+from infrastructure.metrics.instruments import track_operation
+from infrastructure.minio.buckets import ensure_bucket
+from infrastructure.minio.client import get_minio_settings, get_storage_session
+from ingestion.s3.client import is_minio_endpoint, minio_client, source_client
+from ingestion.s3.helpers import (
+    BackgroundIterator,
+    ObjectEntry,
+    align,
+    folder_prefix,
+    list_objects,
+    list_shards,
+    needs_copy,
+    part_ranges,
+)
+from ingestion.s3.settings import S3SyncSettings
+
+logger = get_logger(__name__)
+
+COPY_ERRORS = (ClientError, BotoCoreError, OSError)
+
+
+@dataclass
+class SyncStats:
+    listed: int = 0
+    unchanged: int = 0
+    copied: int = 0
+    failed: int = 0
+    bytes: int = 0
+    # Destination keys written (or, in a dry run, that would be).
+    objects: List[str] = field(default_factory=list)
+
+
+class _SyncRun:
+    """State of one sync: clients, pools and counters shared by the listing threads."""
+
+    def __init__(
+        self,
+        settings: S3SyncSettings,
+        source: S3DataSource,
+        job: IngestionJob,
+        ledger: RunLedger | None,
+    ) -> None:
+        self.settings = settings
+        self.source = source
+        self.bucket = job.destination.bucket
+        self.source_prefix = folder_prefix(source.prefix)
+        self.destination_prefix = folder_prefix(job.destination.prefix)
+        self.ledger = ledger
+        self.server_side = is_minio_endpoint(source.endpoint_url)
+        pool = settings.workers + settings.part_workers + 2 * settings.list_workers
+        self.destination = minio_client(pool, settings.max_attempts)
+        self.client = (
+            self.destination
+            if self.server_side
+            else source_client(source, pool, settings.max_attempts)
+        )
+        self.target = urlsplit(source.endpoint_url or "").netloc or "s3"
+        self.stats = SyncStats()
+        self._lock = threading.Lock()
+        # Bounds the copies queued ahead of the workers, so a huge diff is not all in memory.
+        self._slots = threading.BoundedSemaphore(settings.workers * 4)
+        self._copies = ThreadPoolExecutor(settings.workers, thread_name_prefix="s3-copy")
+        self._parts = ThreadPoolExecutor(settings.part_workers, thread_name_prefix="s3-part")
+        # Streamed copies hold at most one chunk per object; ranged parts are held whole, so
+        # their total is capped.
+        self._stream = TransferConfig(
+            multipart_threshold=settings.stream_chunk_size,
+            multipart_chunksize=settings.stream_chunk_size,
+            max_concurrency=1,
+            use_threads=False,
+        )
+        self._part_buffers = threading.BoundedSemaphore(
+            max(1, settings.max_buffered_bytes // settings.part_size)
+        )
+
+    def destination_key(self, entry: ObjectEntry) -> str:
+        return self.destination_prefix + entry.key[len(self.source_prefix):]
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    # -- listing ---------------------------------------------------------------------------
+
+    def diff(self, prefix: str, delimiter: str | None) -> None:
+        source = list_objects(self.client, self.source.bucket, prefix, delimiter)
+        destination_prefix = self.destination_prefix + prefix[len(self.source_prefix):]
+        existing = BackgroundIterator(
+            list_objects(self.destination, self.bucket, destination_prefix, delimiter)
+        )
+        for entry, current in align(
+            source, existing, self.source_prefix, self.destination_prefix
+        ):
+            self._count(listed=1)
+            if not needs_copy(entry, current):
+                self._count(unchanged=1)
+                continue
+            if self.settings.dry_run:
+                logger.info("Would copy %s", entry.key, extra=PER_OBJECT)
+                with self._lock:
+                    self.stats.objects.append(self.destination_key(entry))
+                continue
+            self._slots.acquire()
+            context = contextvars.copy_context()
+            future = self._copies.submit(context.run, self.copy, entry)
+            future.add_done_callback(self._release)
+
+    def _release(self, future: Future) -> None:
+        self._slots.release()
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Copy worker failed: %s", future.exception())
+
+    # -- copying ---------------------------------------------------------------------------
+
+    def copy(self, entry: ObjectEntry) -> None:
+        key = self.destination_key(entry)
+        try:
+            with track_operation("s3_copy", self.target):
+                if entry.size > self.settings.multipart_threshold:
+                    self._copy_multipart(entry, key)
+                else:
+                    self._copy_object(entry, key)
+        except COPY_ERRORS as exc:
+            logger.warning("Could not copy %s to %s: %s", entry.key, key, exc)
+            self._count(failed=1)
+            if self.ledger is not None:
+                self.ledger.record_object(self.bucket, key, error=str(exc))
+            return
+        get_storage_session().invalidate(self.bucket, key)
+        logger.info("Copied %s (%d bytes)", entry.key, entry.size, extra=PER_OBJECT)
+        self._count(copied=1, bytes=entry.size)
+        with self._lock:
+            self.stats.objects.append(key)
+        if self.ledger is not None:
+            self.ledger.record_object(self.bucket, key, size=entry.size)
+
+    def _copy_source(self, entry: ObjectEntry) -> Dict[str, str]:
+        return {"Bucket": self.source.bucket, "Key": entry.key}
+
+    def _copy_object(self, entry: ObjectEntry, key: str) -> None:
+        if self.server_side:
+            self.destination.copy_object(
+                Bucket=self.bucket,
+                Key=key,
+                CopySource=self._copy_source(entry),
+                CopySourceIfMatch=entry.etag,
+            )
+            return
+        response = self.client.get_object(
+            Bucket=self.source.bucket, Key=entry.key, IfMatch=entry.etag
+        )
+        extra = {
+            "ContentType": response.get("ContentType") or "application/octet-stream",
+            "Metadata": response.get("Metadata") or {},
+        }
+        with response["Body"] as body:
+            if entry.size <= self.settings.stream_chunk_size:
+                self.destination.put_object(Bucket=self.bucket, Key=key, Body=body.read(), **extra)
+            else:
+                self.destination.upload_fileobj(
+                    body, self.bucket, key, ExtraArgs=extra, Config=self._stream
+                )
+
+    def _copy_part(
+        self, entry: ObjectEntry, key: str, upload_id: str, number: int, first: int, last: int
+    ) -> Dict[str, Any]:
+        byte_range = f"bytes={first}-{last}"
+        if self.server_side:
+            response = self.destination.upload_part_copy(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=number,
+                CopySource=self._copy_source(entry),
+                CopySourceRange=byte_range,
+                CopySourceIfMatch=entry.etag,
+            )
+            etag = response["CopyPartResult"]["ETag"]
+        else:
+            with self._part_buffers:
+                body = self.client.get_object(
+                    Bucket=self.source.bucket, Key=entry.key, Range=byte_range, IfMatch=entry.etag
+                )["Body"].read()
+                etag = self.destination.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body
+                )["ETag"]
+        return {"ETag": etag, "PartNumber": number}
+
+    def _copy_multipart(self, entry: ObjectEntry, key: str) -> None:
+        head = self.client.head_object(Bucket=self.source.bucket, Key=entry.key)
+        upload_id = self.destination.create_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            ContentType=head.get("ContentType") or "application/octet-stream",
+            Metadata=head.get("Metadata") or {},
+        )["UploadId"]
+        futures: List[Future] = []
+        try:
+            for number, (first, last) in enumerate(
+                part_ranges(entry.size, self.settings.part_size), start=1
+            ):
+                context = contextvars.copy_context()
+                futures.append(
+                    self._parts.submit(
+                        context.run, self._copy_part, entry, key, upload_id, number, first, last
+                    )
+                )
+            parts = [future.result() for future in futures]
+            self.destination.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            try:
+                self.destination.abort_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id
+                )
+            except COPY_ERRORS as exc:
+                logger.warning("Could not abort the upload of %s: %s", key, exc)
+            raise
+
+    def shutdown(self) -> None:
+        self._copies.shutdown(wait=True)
+        self._parts.shutdown(wait=True)
+
+
+class S3Syncer:
+    def __init__(
+        self,
+        settings: S3SyncSettings | None = None,
+        store: MetadataStore | None = None,
+    ) -> None:
+        self.settings = settings or S3SyncSettings()
+        self.store = store or get_metadata_store()
+
+    def _assert_s3_source(self, job: IngestionJob) -> S3DataSource:
+        if not isinstance(job.source, S3DataSource):
+            raise IngestionError("S3Syncer requires an S3DataSource")
+        return job.source
+
+    def sync(self, job: IngestionJob, ledger: RunLedger | None = None) -> SyncStats:
+        source = self._assert_s3_source(job)
+        get_minio_settings()  # Fail on missing MinIO settings before listing anything.
+        ensure_bucket(job.destination.bucket)
+        run = _SyncRun(self.settings, source, job, ledger)
+        logger.info(
+            "Syncing s3://%s/%s to %s/%s (%s copies)",
+            source.bucket,
+            run.source_prefix,
+            run.bucket,
+            run.destination_prefix,
+            "server-side" if run.server_side else "streamed",
+        )
+        try:
+            shards = list_shards(run.client, source.bucket, run.source_prefix)
+            with ThreadPoolExecutor(
+                self.settings.list_workers, thread_name_prefix="s3-list"
+            ) as listers:
+                futures = [
+                    listers.submit(contextvars.copy_context().run, run.diff, prefix, delimiter)
+                    for prefix, delimiter in shards
+                ]
+                for future in futures:
+                    future.result()
+        except COPY_ERRORS as exc:
+            raise IngestionError(f"Could not list s3://{source.bucket}: {exc}") from exc
+        finally:
+            run.shutdown()
+        stats = run.stats
+        logger.info(
+            "Listed %d objects: %d unchanged, %d copied (%d bytes), %d failed",
+            stats.listed,
+            stats.unchanged,
+            stats.copied,
+            stats.bytes,
+            stats.failed,
+        )
+        return stats
+
+    def run(self, job: IngestionJob) -> List[str]:
+        logger.info("Executing S3 sync job %s", job.job_id)
+        self._assert_s3_source(job)
+        with self.store.run(job, source="s3") as ledger:
+            with ledger.stage("sync") as stage:
+                stats = self.sync(job, ledger)
+                stage.items = stats.copied
+                stage.bytes = stats.bytes
+        logger.info("Completed job %s (%d objects copied)", job.job_id, stats.copied)
+        return stats.objects
@@ -1 +1,358 @@
-# Recursive crawling
+"""Asynchronous crawler: a per-host frontier drained by a fixed set of fetch tasks.
+
+URLs are deduplicated by a Bloom filter and queued per host in priority order (depth by
+default, so the crawl is breadth-first). A host is only handed out while it is below its
+concurrency limit and its shared token bucket (``core.utils.rate_limit``) has a token, so one
+slow or strict host never holds up the others. Pages are parsed in a process pool and passed
+to ``on_page``, and their links in the allowed domains are fed back into the frontier.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from core.exceptions.retry_error import RetryableError
+from core.utils.bloom import BloomFilter
+from core.utils.rate_limit import TokenBucket, rate_limiter
+from core.utils.retry import parse_retry_after
+from core.utils.throughput import ThroughputMeter
+from infrastructure.logging.logger import PER_OBJECT, get_logger
+from infrastructure.metrics.instruments import track_operation
+from ingestion.web.helpers import EXTENSIONS, host_of, in_domains, media_type, normalize_url
+from ingestion.web.parser import ParsedPage, parse_page
+from ingestion.web.settings import CrawlSettings
+
+logger = get_logger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class FetchedPage:
+    url: str
+    final_url: str
+    depth: int
+    status: int
+    content_type: str | None
+    body: bytes
+
+
+PageHandler = Callable[[FetchedPage, ParsedPage], Awaitable[None]]
+
+
+class Frontier:
+    """URLs waiting to be fetched, grouped by host and ordered by priority within a host."""
+
+    def __init__(
+        self,
+        seen: BloomFilter,
+        per_host_concurrency: int,
+        limiter_for: Callable[[str], Optional[TokenBucket]],
+        limit: int | None = None,
+    ) -> None:
+        self.seen = seen
+        self.per_host_concurrency = max(per_host_concurrency, 1)
+        self.limit = limit
+        self.dispatched = 0
+        self._limiter_for = limiter_for
+        self._queues: Dict[str, List[Tuple[float, int, str, int]]] = {}
+        self._active: Dict[str, int] = {}
+        self._not_before: Dict[str, float] = {}
+        self._order = itertools.count()
+        self._pending = 0
+        self._in_flight = 0
+        self._closed = False
+        self._changed = asyncio.Event()
+        # get() awaits the host's bucket, so callers take turns choosing a host.
+        self._choosing = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def add(self, url: str, depth: int, priority: float | None = None, retry: bool = False) -> bool:
+        """Queue ``url`` unless it was seen before; ``retry`` re-queues a URL already seen."""
+        if not retry and not self.seen.add(url):
+            return False
+        entry = (depth if priority is None else priority, next(self._order), url, depth)
+        heapq.heappush(self._queues.setdefault(host_of(url), []), entry)
+        self._pending += 1
+        self._changed.set()
+        return True
+
+    def close(self) -> None:
+        self._closed = True
+        self._changed.set()
+
+    async def get(self) -> Tuple[str, int] | None:
+        """The next URL to fetch, waiting for a host to become ready; None once exhausted."""
+        async with self._choosing:
+            return await self._next()
+
+    async def _next(self) -> Tuple[str, int] | None:
+        while True:
+            if self._closed or (self.limit is not None and self.dispatched >= self.limit):
+                return None
+            now = time.monotonic()
+            best: str | None = None
+            wake: float | None = None
+            for host, queue in self._queues.items():
+                if self._active.get(host, 0) >= self.per_host_concurrency:
+                    continue
+                not_before = self._not_before.get(host, 0.0)
+                if not_before > now:
+                    wake = not_before if wake is None else min(wake, not_before)
+                    continue
+                if best is None or queue[0] < self._queues[best][0]:
+                    best = host
+            if best is not None:
+                limiter = self._limiter_for(best)
+                delay = await asyncio.to_thread(limiter.try_acquire) if limiter is not None else 0.0
+                if delay:
+                    self._not_before[best] = time.monotonic() + delay
+                    continue
+                self._not_before.pop(best, None)
+                queue = self._queues[best]
+                _, _, url, depth = heapq.heappop(queue)
+                if not queue:
+                    del self._queues[best]
+                self._active[best] = self._active.get(best, 0) + 1
+                self._pending -= 1
+                self._in_flight += 1
+                self.dispatched += 1
+                return url, depth
+            if not self._pending and not self._in_flight:
+                return None
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait(), None if wake is None else max(wake - now, 0.0)
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def done(self, url: str, requeued: bool = False) -> None:
+        host = host_of(url)
+        active = self._active.get(host, 1) - 1
+        if active:
+            self._active[host] = active
+        else:
+            self._active.pop(host, None)
+        self._in_flight -= 1
+        if requeued:
+            self.dispatched -= 1
+        self._changed.set()
+
+
+class RobotsCache:
+    """One parsed robots.txt per host; hosts whose robots.txt cannot be read are allowed."""
+
+    def __init__(self, user_agent: str) -> None:
+        self.user_agent = user_agent
+        self._parsers: Dict[str, "asyncio.Future[RobotFileParser | None]"] = {}
+
+    async def allowed(self, client: httpx.AsyncClient, url: str) -> bool:
+        host = host_of(url)
+        future = self._parsers.get(host)
+        if future is None:
+            future = self._parsers[host] = asyncio.ensure_future(self._load(client, url))
+        parser = await future
+        return parser is None or parser.can_fetch(self.user_agent, url)
+
+    async def _load(self, client: httpx.AsyncClient, url: str) -> RobotFileParser | None:
+        robots_url = normalize_url("/robots.txt", url)
+        try:
+            response = await client.get(robots_url)
+        except httpx.HTTPError as exc:
+            logger.warning("Could not fetch %s: %s", robots_url, exc)
+            return None
+        if response.status_code != 200:
+            return None
+        parser = RobotFileParser(robots_url)
+        parser.parse(response.text.splitlines())
+        return parser
+
+
+class WebCrawler:
+    def __init__(
+        self,
+        settings: CrawlSettings,
+        on_page: PageHandler,
+        parse_executor: Executor | None = None,
+    ) -> None:
+        self.settings = settings
+        self.on_page = on_page
+        self.parse_executor = parse_executor
+        self.meter = ThroughputMeter(unit="pages")
+        self.skipped = 0
+        self._robots = RobotsCache(settings.user_agent) if settings.respect_robots else None
+        self._attempts: Dict[str, int] = {}
+
+    def _limiter(self, host: str) -> TokenBucket | None:
+        if self.settings.host_interval <= 0:
+            return None
+        return rate_limiter(host, rate=1.0 / self.settings.host_interval)
+
+    async def crawl(
+        self,
+        seeds: Iterable[str],
+        domains: Sequence[str],
+        max_pages: int | None = None,
+        max_depth: int = 3,
+    ) -> ThroughputMeter:
+        seen = BloomFilter(self.settings.expected_urls, self.settings.seen_error_rate)
+        frontier = Frontier(seen, self.settings.per_host_concurrency, self._limiter, max_pages)
+        limits = httpx.Limits(
+            max_connections=self.settings.concurrency,
+            max_keepalive_connections=self.settings.concurrency,
+        )
+        async with httpx.AsyncClient(
+            timeout=self.settings.timeout,
+            limits=limits,
+            follow_redirects=True,
+            headers={"User-Agent": self.settings.user_agent},
+        ) as client:
+            for seed in seeds:
+                url = normalize_url(seed)
+                if url:
+                    await self._enqueue(client, frontier, url, 0)
+            workers = [
+                asyncio.ensure_future(self._worker(client, frontier, domains, max_depth))
+                for _ in range(self.settings.concurrency)
+            ]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                frontier.close()
+                for worker in workers:
+                    worker.cancel()
+        logger.info(
+            "Crawled %s; %d skipped, %d URLs seen", self.meter.summary(), self.skipped, len(seen)
+        )
+        return self.meter
+
+    async def _worker(
+        self,
+        client: httpx.AsyncClient,
+        frontier: Frontier,
+        domains: Sequence[str],
+        max_depth: int,
+    ) -> None:
+        while True:
+            item = await frontier.get()
+            if item is None:
+                return
+            url, depth = item
+            requeued = False
+            try:
+                requeued = await self._visit(client, frontier, url, depth, domains, max_depth)
+            finally:
+                frontier.done(url, requeued=requeued)
+
+    async def _enqueue(
+        self, client: httpx.AsyncClient, frontier: Frontier, url: str, depth: int
+    ) -> None:
+        """Queue ``url`` if robots.txt allows it, so disallowed URLs never take a host's token."""
+        if url in frontier.seen:
+            return
+        if self._robots is not None and not await self._robots.allowed(client, url):
+            frontier.seen.add(url)
+            self.skipped += 1
+            return
+        frontier.add(url, depth)
+
+    def _retry_later(self, frontier: Frontier, url: str, depth: int, exc: Exception) -> bool:
+        attempt = self._attempts.get(url, 0) + 1
+        if attempt >= self.settings.retries:
+            self._attempts.pop(url, None)
+            logger.warning("Giving up on %s after %d attempts: %s", url, attempt, exc)
+            self.meter.record_failure()
+            return False
+        self._attempts[url] = attempt
+        # Re-queued behind the host's current work; the host's bucket paces the retry.
+        frontier.add(url, depth, priority=depth + attempt, retry=True)
+        return True
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str, depth: int) -> FetchedPage | None:
+        host = host_of(url)
+        with track_operation("web_fetch", host) as operation:
+            async with client.stream("GET", url) as response:
+                if response.status_code in RETRYABLE_STATUS:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    limiter = self._limiter(host)
+                    if limiter is not None and response.status_code in (429, 503):
+                        await asyncio.to_thread(limiter.penalize, retry_after)
+                    raise RetryableError(f"HTTP {response.status_code} for {url}", retry_after)
+                content_type = response.headers.get("Content-Type")
+                if response.status_code != 200 or media_type(content_type) not in EXTENSIONS:
+                    operation.failed = response.status_code != 200
+                    logger.info(
+                        "Skipping %s (HTTP %s, %s)",
+                        url,
+                        response.status_code,
+                        content_type,
+                        extra=PER_OBJECT,
+                    )
+                    return None
+                chunks: List[bytes] = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > self.settings.max_page_bytes:
+                        logger.warning(
+                            "Skipping %s: larger than %d bytes", url, self.settings.max_page_bytes
+                        )
+                        return None
+                    chunks.append(chunk)
+                return FetchedPage(
+                    url=url,
+                    final_url=str(response.url),
+                    depth=depth,
+                    status=response.status_code,
+                    content_type=content_type,
+                    body=b"".join(chunks),
+                )
+
+    async def _visit(
+        self,
+        client: httpx.AsyncClient,
+        frontier: Frontier,
+        url: str,
+        depth: int,
+        domains: Sequence[str],
+        max_depth: int,
+    ) -> bool:
+        """Fetch, parse, hand over and expand one URL; returns True if it was re-queued."""
+        try:
+            page = await self._fetch(client, url, depth)
+        except (RetryableError, httpx.TransportError) as exc:
+            return self._retry_later(frontier, url, depth, exc)
+        except httpx.HTTPError as exc:
+            logger.warning("Failed to fetch %s: %s", url, exc)
+            self.meter.record_failure()
+            return False
+        self._attempts.pop(url, None)
+        if page is None:
+            self.skipped += 1
+            return False
+        if page.final_url != url:
+            frontier.seen.add(page.final_url)
+        loop = asyncio.get_running_loop()
+        parsed = await loop.run_in_executor(
+            self.parse_executor, parse_page, page.final_url, page.body, page.content_type
+        )
+        await self.on_page(page, parsed)
+        self.meter.record(len(page.body))
+        if depth < max_depth:
+            for link in parsed.links:
+                if in_domains(link, domains):
+                    await self._enqueue(client, frontier, link, depth + 1)
+        return False
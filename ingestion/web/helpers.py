@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+EXTENSIONS = {
+    "text/html": ".html",
+    "application/xhtml+xml": ".html",
+    "application/json": ".json",
+    "text/plain": ".txt",
+    "application/xml": ".xml",
+    "text/xml": ".xml",
+}
+
+
+def normalize_url(url: str, base: str | None = None) -> str | None:
+    """Absolute http(s) URL without fragment or default port, or None if not crawlable."""
+    try:
+        parts = urlsplit(urljoin(base, url) if base else url)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    if port and port != _DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def in_domains(url: str, domains: Iterable[str]) -> bool:
+    hostname = urlsplit(url).hostname or ""
+    return any(hostname == domain or hostname.endswith(f".{domain}") for domain in domains)
+
+
+def media_type(content_type: str | None) -> str:
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def page_key(url: str) -> str:
+    """Stable object key stem for ``url``: ``<host>/<sha1 of the URL>``."""
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return f"{host_of(url).replace(':', '_')}/{digest}"
@@ -1 +1,63 @@
-# HTML/JSON parsing
+"""Page parsing. Runs in a process pool, so everything here is picklable and module-level."""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import List
+
+from ingestion.web.helpers import media_type, normalize_url
+
+_WHITESPACE = re.compile(r"\s+")
+HTML_TYPES = {"text/html", "application/xhtml+xml"}
+
+
+@dataclass
+class ParsedPage:
+    url: str
+    title: str | None = None
+    text: str | None = None
+    links: List[str] = field(default_factory=list)
+    error: str | None = None
+
+
+def parse_html(url: str, body: bytes) -> ParsedPage:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(body, "html.parser")
+    base = url
+    base_tag = soup.find("base", href=True)
+    if base_tag is not None:
+        base = normalize_url(base_tag["href"], url) or url
+    robots = soup.find("meta", attrs={"name": re.compile("^robots$", re.I)})
+    nofollow = robots is not None and "nofollow" in (robots.get("content") or "").lower()
+    links: List[str] = []
+    if not nofollow:
+        for anchor in soup.find_all("a", href=True):
+            if "nofollow" in (anchor.get("rel") or []):
+                continue
+            link = normalize_url(anchor["href"], base)
+            if link:
+                links.append(link)
+    for tag in soup(["script", "style", "noscript", "template"]):
+        tag.decompose()
+    title = soup.title.get_text(strip=True) if soup.title else None
+    text = _WHITESPACE.sub(" ", soup.get_text(" ")).strip()
+    return ParsedPage(url, title=title, text=text, links=list(dict.fromkeys(links)))
+
+
+def parse_page(url: str, body: bytes, content_type: str | None) -> ParsedPage:
+    """Extract title, text and outgoing links; JSON is validated, other types passed through."""
+    kind = media_type(content_type)
+    try:
+        if kind in HTML_TYPES:
+            return parse_html(url, body)
+        if kind == "application/json" or kind.endswith("+json"):
+            json.loads(body)
+            return ParsedPage(url)
+        if kind.startswith("text/"):
+            return ParsedPage(url, text=body.decode("utf-8", errors="replace"))
+    except (ValueError, TypeError) as exc:
+        return ParsedPage(url, error=str(exc))
+    return ParsedPage(url)
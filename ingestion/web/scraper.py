@@ -1 +1,130 @@
-# Scraping via BS4/Scrapy
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+from core.exceptions.ingestion_error import IngestionError
+from core.exceptions.storage_error import ObjectUploadError
+from core.models.datasource import WebDataSource
+from core.models.ingestion_job import IngestionJob
+from infrastructure.db.metadata_store import MetadataStore, RunLedger, get_metadata_store
+from infrastructure.logging.logger import get_logger
+from infrastructure.minio.uploader import upload_from_memory
+from ingestion.web.crawler import FetchedPage, WebCrawler
+from ingestion.web.helpers import EXTENSIONS, media_type, page_key
+from ingestion.web.parser import ParsedPage
+from ingestion.web.settings import CrawlSettings
+
+logger = get_logger(__name__)
+
+
+class WebScraper:
+    """Crawls a ``WebDataSource`` and streams every page into the job's bucket.
+
+    Each page is written as ``pages/<host>/<sha1>.<ext>`` with the raw body. Unless
+    ``store_records`` is off, a ``records/<host>/<sha1>.json`` is written alongside it,
+    holding the URL, title, text and links.
+    """
+
+    def __init__(
+        self,
+        settings: CrawlSettings | None = None,
+        store: MetadataStore | None = None,
+    ) -> None:
+        self.settings = settings or CrawlSettings()
+        self.store = store or get_metadata_store()
+
+    def _assert_web_source(self, job: IngestionJob) -> WebDataSource:
+        if not isinstance(job.source, WebDataSource):
+            raise IngestionError("WebScraper requires a WebDataSource")
+        return job.source
+
+    def _parse_executor(self) -> Executor | None:
+        if self.settings.parse_workers <= 0:
+            return None  # Parse on the event loop's default thread pool instead.
+        # Spawned rather than forked: the scraper may be running inside a threaded service.
+        return ProcessPoolExecutor(
+            max_workers=self.settings.parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def _upload(
+        self, job: IngestionJob, ledger: RunLedger | None, object_name: str, data: bytes, kind: str
+    ) -> str | None:
+        bucket = job.destination.bucket
+        try:
+            await asyncio.to_thread(
+                upload_from_memory, bucket, object_name, io.BytesIO(data), data, kind
+            )
+        except ObjectUploadError as exc:
+            if ledger is not None:
+                ledger.record_object(bucket, object_name, error=str(exc))
+            return None
+        if ledger is not None:
+            ledger.record_object(bucket, object_name, size=len(data))
+        return object_name
+
+    def _record(self, page: FetchedPage, parsed: ParsedPage, page_object: str) -> bytes:
+        record = {
+            "url": page.url,
+            "final_url": page.final_url,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "status": page.status,
+            "content_type": page.content_type,
+            "depth": page.depth,
+            "object": page_object,
+            "title": parsed.title,
+            "text": parsed.text,
+            "links": parsed.links,
+            "parse_error": parsed.error,
+        }
+        return json.dumps(record, ensure_ascii=False).encode("utf-8")
+
+    async def _crawl(self, job: IngestionJob, ledger: RunLedger | None) -> List[str]:
+        source = self._assert_web_source(job)
+        uploaded: List[str] = []
+
+        async def store_page(page: FetchedPage, parsed: ParsedPage) -> None:
+            kind = media_type(page.content_type)
+            key = page_key(page.url)
+            page_object = job.destination.object_name(Path("pages") / f"{key}{EXTENSIONS[kind]}")
+            if await self._upload(job, ledger, page_object, page.body, page.content_type or kind):
+                uploaded.append(page_object)
+            if self.settings.store_records:
+                record_object = job.destination.object_name(Path("records") / f"{key}.json")
+                data = self._record(page, parsed, page_object)
+                if await self._upload(job, ledger, record_object, data, "application/json"):
+                    uploaded.append(record_object)
+
+        executor = self._parse_executor()
+        try:
+            crawler = WebCrawler(self.settings, store_page, parse_executor=executor)
+            await crawler.crawl(
+                source.seeds,
+                source.domains(),
+                max_pages=source.max_pages,
+                max_depth=source.max_depth,
+            )
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        return uploaded
+
+    def scrape(self, job: IngestionJob, ledger: RunLedger | None = None) -> List[str]:
+        return asyncio.run(self._crawl(job, ledger))
+
+    def run(self, job: IngestionJob) -> List[str]:
+        logger.info("Executing web scraping job %s", job.job_id)
+        self._assert_web_source(job)
+        with self.store.run(job, source="web") as ledger:
+            with ledger.stage("crawl") as stage:
+                uploaded = self.scrape(job, ledger)
+                stage.items = len(uploaded)
+        logger.info("Completed job %s (%d objects uploaded)", job.job_id, len(uploaded))
+        return uploaded
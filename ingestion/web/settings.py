@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CrawlSettings:
+    """Crawl tuning: global and per-host concurrency are separate from per-host pacing."""
+
+    concurrency: int = 32
+    per_host_concurrency: int = 2
+    # Minimum seconds between request starts to one host, shared across processes.
+    host_interval: float = 1.0
+    timeout: float = 30.0
+    retries: int = 3
+    max_page_bytes: int = 5 * 1024 * 1024
+    parse_workers: int = os.cpu_count() or 1
+    respect_robots: bool = True
+    user_agent: str = "data-ingestion-crawler/1.0"
+    # Sizes the seen-URL Bloom filter; past this many URLs its false-positive rate climbs.
+    expected_urls: int = 1_000_000
+    seen_error_rate: float = 0.001
+    store_records: bool = True
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules the CLI must not pull in before a job of the matching source actually runs.
+HEAVY_MODULES = ("kaggle", "fitz", "pymupdf", "feedparser", "minio", "sqlalchemy", "PyPDF2")
+
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import scripts.run_ingestion
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+# Time to first job: import the CLI, build an arXiv job and construct its pipeline, which
+# brings in everything a real run needs (HTTP session, metadata store, MinIO settings).
+_FIRST_JOB_PROBE = """
+import json, time
+from pathlib import Path
+started = time.perf_counter()
+import scripts.run_ingestion
+from core.models.datasource import ArxivDataSource
+from core.models.ingestion_job import Destination, IngestionJob
+from ingestion.registry import get_pipeline_for
+job = IngestionJob(
+    job_id="bench",
+    source=ArxivDataSource(name="arxiv::bench", category="cs.LG", dataset_slug="bench"),
+    destination=Destination(bucket="bench"),
+    workspace=Path({workspace!r}),
+)
+get_pipeline_for(job)
+print(json.dumps({{"seconds": time.perf_counter() - started}}))
+"""
+
+
+def _probe(code: str, env: Dict[str, str]) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _process_seconds(argv: List[str], env: Dict[str, str]) -> float:
+    """Wall time of a whole interpreter run, including interpreter start-up."""
+    started = time.perf_counter()
+    subprocess.run(argv, cwd=ROOT, env=env, capture_output=True, check=True)
+    return time.perf_counter() - started
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark CLI start-up time")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per measurement")
+    parser.add_argument(
+        "--import-budget-ms",
+        type=float,
+        default=250.0,
+        help="Fail if the median import time of scripts.run_ingestion exceeds this",
+    )
+    parser.add_argument(
+        "--help-budget-ms",
+        type=float,
+        default=600.0,
+        help="Fail if the median wall time of `run_ingestion --help` exceeds this",
+    )
+    parser.add_argument(
+        "--first-job-budget-ms",
+        type=float,
+        default=1500.0,
+        help="Fail if the median time to a ready arXiv pipeline exceeds this",
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+        env["DATABASE_URL"] = f"sqlite:///{scratch}/metadata.db"
+
+        imports = [
+            _probe(_IMPORT_PROBE.format(heavy=HEAVY_MODULES), env) for _ in range(args.runs)
+        ]
+        helps = [
+            _process_seconds([sys.executable, "-m", "scripts.run_ingestion", "--help"], env)
+            for _ in range(args.runs)
+        ]
+        first_jobs = [
+            _probe(_FIRST_JOB_PROBE.format(workspace=scratch), env)["seconds"]
+            for _ in range(args.runs)
+        ]
+
+    results = {
+        "import_ms": statistics.median(item["seconds"] for item in imports) * 1000,
+        "help_ms": statistics.median(helps) * 1000,
+        "first_job_ms": statistics.median(first_jobs) * 1000,
+        "heavy_modules": sorted({name for item in imports for name in item["heavy"]}),
+    }
+    failures = []
+    if results["heavy_modules"]:
+        failures.append(f"heavy modules imported eagerly: {', '.join(results['heavy_modules'])}")
+    for key, budget in (
+        ("import_ms", args.import_budget_ms),
+        ("help_ms", args.help_budget_ms),
+        ("first_job_ms", args.first_job_budget_ms),
+    ):
+        if results[key] > budget:
+            failures.append(f"{key} {results[key]:.0f} exceeds budget {budget:.0f}")
+    results["failures"] = failures
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(
+            f"import {results['import_ms']:.0f} ms | --help {results['help_ms']:.0f} ms | "
+            f"first job {results['first_job_ms']:.0f} ms (median of {args.runs})"
+        )
+        for failure in failures:
+            print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import argparse
+
+from dotenv import load_dotenv
+
+from infrastructure.logging.logger import get_logger
+from infrastructure.minio.cache import get_object_cache
+
+logger = get_logger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Warm the local MinIO download cache with every object under a prefix"
+    )
+    parser.add_argument("bucket", help="MinIO bucket to read from")
+    parser.add_argument("prefix", nargs="?", default="", help="Object prefix to prefetch")
+    parser.add_argument("--workers", type=int, default=8, help="Objects downloaded at once")
+    return parser.parse_args()
+
+
+def main() -> None:
+    load_dotenv()
+    args = parse_args()
+    cache = get_object_cache()
+    if cache is None:
+        raise SystemExit("Set MINIO_DOWNLOAD_CACHE_DIR to enable the download cache")
+    paths = cache.prefetch(args.bucket, args.prefix, workers=args.workers)
+    logger.info(
+        "Cache at %s holds %d bytes after prefetching %d objects",
+        cache.root,
+        cache.size,
+        len(paths),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import os
+import sys
 from pathlib import Path
 from typing import List, Optional
 
@@ -10,8 +11,12 @@ from dotenv import load_dotenv
 from core.models.datasource import KaggleDataSource, ArxivDataSource
 from core.models.ingestion_job import Destination, IngestionJob
 from infrastructure.logging.logger import get_logger
+from infrastructure.metrics.exporter import write_textfile
+from infrastructure.minio.limits import DEFAULT_PART_SIZE
+from ingestion.arxiv.settings import ArxivFetchSettings, ExtractionSettings
 from ingestion.registry import get_pipeline_for
 from services.job_runner import JobRunner
+from services.orchestrator import BatchSummary
 
 logger = get_logger(__name__)
 
@@ -28,6 +33,18 @@ def parse_args() -> argparse.Namespace:
         dest="job_name",
         help="Name of the job defined in config/kaggle.yaml",
     )
+    group.add_argument(
+        "--jobs",
+        nargs="+",
+        dest="job_names",
+        help="Run several jobs from config/kaggle.yaml concurrently",
+    )
+    group.add_argument(
+        "--all",
+        action="store_true",
+        dest="run_all",
+        help="Run every job defined in config/kaggle.yaml concurrently",
+    )
     group.add_argument(
         "--dataset-id",
         dest="dataset_id",
@@ -55,10 +72,95 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--arxiv-category",
-        type=Path,
         default="cs.LG",
         help="Arxiv category to download papers from (only used with --dataset-id for arxiv source)",
     )
+    parser.add_argument(
+        "--arxiv-max-results",
+        type=int,
+        default=ArxivFetchSettings.max_results,
+        help="Maximum number of arXiv papers to harvest per run (0 for no limit)",
+    )
+    parser.add_argument(
+        "--arxiv-full-harvest",
+        action="store_true",
+        help="Ignore the stored harvest cursor and walk the category from the newest entry",
+    )
+    parser.add_argument(
+        "--arxiv-pdf-workers",
+        type=int,
+        default=ArxivFetchSettings.pdf_workers,
+        help="Number of concurrent PDF downloads (also sizes the HTTP connection pool)",
+    )
+    parser.add_argument(
+        "--arxiv-page-interval",
+        type=float,
+        default=ArxivFetchSettings.page_interval,
+        help="Minimum seconds between arXiv metadata API requests",
+    )
+    parser.add_argument(
+        "--arxiv-retries",
+        type=int,
+        default=ArxivFetchSettings.retries,
+        help="Attempts per arXiv API page or PDF before giving up on it",
+    )
+    parser.add_argument(
+        "--arxiv-stream",
+        action="store_true",
+        help="Stream arXiv PDFs straight into MinIO instead of staging them in the workspace",
+    )
+    parser.add_argument(
+        "--part-size-mb",
+        type=int,
+        default=DEFAULT_PART_SIZE // (1024 * 1024),
+        help="Multipart upload part size in MiB (bounds memory used per streamed object)",
+    )
+    parser.add_argument(
+        "--upload-workers",
+        type=int,
+        default=None,
+        help="Concurrent arXiv uploads to MinIO (defaults to MINIO_UPLOAD_WORKERS or 8)",
+    )
+    parser.add_argument(
+        "--arxiv-extract-text",
+        action="store_true",
+        help="Extract text from harvested PDFs and upload it under <prefix>/text/",
+    )
+    parser.add_argument(
+        "--arxiv-shards",
+        action="store_true",
+        help="Pack arXiv PDFs and texts into indexed tar shards instead of one object each",
+    )
+    parser.add_argument(
+        "--shard-size-mb",
+        type=int,
+        default=ArxivFetchSettings.shard_size // (1024 * 1024),
+        help="Target size of each shard in MiB",
+    )
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=ExtractionSettings.workers,
+        help="Processes used for PDF text extraction",
+    )
+    parser.add_argument(
+        "--extract-timeout",
+        type=float,
+        default=ExtractionSettings.timeout,
+        help="Seconds allowed per document for text extraction before it is skipped",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=os.getenv("METRICS_FILE") or None,
+        help="Write Prometheus-format metrics here when the run ends (or set METRICS_FILE)",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Jobs run at once with --jobs/--all (defaults to concurrency.max_workers)",
+    )
     return parser.parse_args()
 
 
@@ -86,6 +188,12 @@ def run_managed_job(job_name: str) -> List[str]:
     return runner.run(job_name)
 
 
+def run_job_batch(job_names: Optional[List[str]], max_workers: Optional[int]) -> BatchSummary:
+    runner = JobRunner()
+    logger.info("Starting job batch %s", ", ".join(job_names) if job_names else "(all jobs)")
+    return runner.run_many(job_names, max_workers=max_workers)
+
+
 def run_ad_hoc_dataset(
     source: str,
     dataset_id: str,
@@ -93,7 +201,8 @@ def run_ad_hoc_dataset(
     bucket: Optional[str],
     prefix: str,
     workspace: Path,
-    arxiv_category: str
+    arxiv_category: str,
+    arxiv_settings: ArxivFetchSettings | None = None,
 ) -> List[str]:
     bucket = bucket or os.getenv("MINIO_DEFAULT_BUCKET")
     if not bucket:
@@ -132,7 +241,7 @@ def run_ad_hoc_dataset(
             workspace=workspace,
         )
         logger.info("Starting ad-hoc dataset download for %s", dataset_id)
-        pipeline = get_pipeline_for(job, arxiv_category=arxiv_category, dataset_id=dataset_id)
+        pipeline = get_pipeline_for(job, settings=arxiv_settings)
     else:
         raise ValueError(f"Unsupported source type: {source}")
 
@@ -140,9 +249,7 @@ def run_ad_hoc_dataset(
     return pipeline.run(job)
 
 
-def main() -> None:
-    load_dotenv()
-    args = parse_args()
+def _run(args: argparse.Namespace) -> None:
     if args.dataset_id:
         uploaded_objects = run_ad_hoc_dataset(
             dataset_id=args.dataset_id,
@@ -151,13 +258,44 @@ def main() -> None:
             prefix=args.prefix,
             workspace=args.workspace,
             source=args.source,
-            arxiv_category=args.arxiv_category
+            arxiv_category=args.arxiv_category,
+            arxiv_settings=ArxivFetchSettings(
+                pdf_workers=args.arxiv_pdf_workers,
+                page_interval=args.arxiv_page_interval,
+                retries=args.arxiv_retries,
+                max_results=args.arxiv_max_results,
+                incremental=not args.arxiv_full_harvest,
+                stream_to_minio=args.arxiv_stream,
+                part_size=args.part_size_mb * 1024 * 1024,
+                upload_workers=args.upload_workers,
+                extract_text=args.arxiv_extract_text,
+                shard_output=args.arxiv_shards,
+                shard_size=args.shard_size_mb * 1024 * 1024,
+                extraction=ExtractionSettings(
+                    workers=args.extract_workers, timeout=args.extract_timeout
+                ),
+            ),
         )
+    elif args.job_names or args.run_all:
+        summary = run_job_batch(args.job_names, args.max_workers)
+        if summary.failed:
+            sys.exit(1)
+        return
     else:
         uploaded_objects = run_managed_job(args.job_name)
     logger.info("Uploaded objects: %s", uploaded_objects)
 
 
+def main() -> None:
+    load_dotenv()
+    args = parse_args()
+    try:
+        _run(args)
+    finally:
+        if args.metrics_file:
+            logger.info("Wrote metrics to %s", write_textfile(args.metrics_file))
+
+
 if __name__ == "__main__":
     main()
 
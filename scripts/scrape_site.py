@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import argparse
+import re
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from core.models.datasource import WebDataSource
+from core.models.ingestion_job import Destination, IngestionJob
+from infrastructure.logging.logger import get_logger
+from infrastructure.metrics.exporter import write_textfile
+from ingestion.registry import get_pipeline_for
+from ingestion.web.settings import CrawlSettings
+
+logger = get_logger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Crawl a site into the scraped-data bucket")
+    parser.add_argument("seeds", nargs="+", help="URLs to start crawling from")
+    parser.add_argument(
+        "--allowed-domains",
+        nargs="+",
+        help="Domains whose links are followed (defaults to the seeds' hosts)",
+    )
+    parser.add_argument("--max-pages", type=int, default=WebDataSource.max_pages)
+    parser.add_argument("--max-depth", type=int, default=WebDataSource.max_depth)
+    parser.add_argument("--bucket", default="scraped-data", help="MinIO bucket for the pages")
+    parser.add_argument("--prefix", default="", help="Object prefix inside the bucket")
+    parser.add_argument("--job-id", help="Job id for the run ledger (defaults to the first seed)")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=CrawlSettings.concurrency,
+        help="Pages fetched at once across all hosts",
+    )
+    parser.add_argument(
+        "--per-host-concurrency",
+        type=int,
+        default=CrawlSettings.per_host_concurrency,
+        help="Pages fetched at once from one host",
+    )
+    parser.add_argument(
+        "--host-interval",
+        type=float,
+        default=CrawlSettings.host_interval,
+        help="Minimum seconds between requests to one host, shared across processes",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=CrawlSettings.parse_workers,
+        help="Processes parsing pages (0 parses on threads instead)",
+    )
+    parser.add_argument("--ignore-robots", action="store_true", help="Do not honour robots.txt")
+    parser.add_argument(
+        "--no-records",
+        action="store_true",
+        help="Store raw pages only, without the parsed JSON record per page",
+    )
+    parser.add_argument(
+        "--workspace",
+        type=Path,
+        default=Path("data/tmp"),
+        help="Workspace directory for the job",
+    )
+    parser.add_argument("--metrics-file", help="Write Prometheus metrics here when done")
+    return parser.parse_args()
+
+
+def main() -> None:
+    load_dotenv()
+    args = parse_args()
+    job_id = args.job_id or "web::" + re.sub(r"^https?://", "", args.seeds[0]).strip("/")
+    job = IngestionJob(
+        job_id=job_id,
+        source=WebDataSource(
+            name=job_id,
+            seeds=args.seeds,
+            allowed_domains=args.allowed_domains,
+            max_pages=args.max_pages,
+            max_depth=args.max_depth,
+        ),
+        destination=Destination(bucket=args.bucket, prefix=args.prefix),
+        workspace=args.workspace,
+    )
+    settings = CrawlSettings(
+        concurrency=args.concurrency,
+        per_host_concurrency=args.per_host_concurrency,
+        host_interval=args.host_interval,
+        parse_workers=args.parse_workers,
+        respect_robots=not args.ignore_robots,
+        store_records=not args.no_records,
+    )
+    try:
+        uploaded = get_pipeline_for(job, settings=settings).run(job)
+        logger.info("Uploaded %d objects to %s", len(uploaded), args.bucket)
+    finally:
+        if args.metrics_file:
+            logger.info("Wrote metrics to %s", write_textfile(args.metrics_file))
+
+
+if __name__ == "__main__":
+    main()
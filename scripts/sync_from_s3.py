@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from core.models.datasource import S3DataSource
+from core.models.ingestion_job import Destination, IngestionJob
+from infrastructure.logging.logger import get_logger
+from infrastructure.metrics.exporter import write_textfile
+from ingestion.registry import get_pipeline_for
+from ingestion.s3.settings import S3SyncSettings
+
+logger = get_logger(__name__)
+
+MIB = 1024 * 1024
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Mirror an S3 bucket or prefix into MinIO")
+    parser.add_argument("source", help="Source bucket, optionally with a prefix: bucket/prefix")
+    parser.add_argument(
+        "--endpoint-url",
+        help="S3-compatible endpoint of the source; the MinIO endpoint copies server-side",
+    )
+    parser.add_argument("--region", help="Region of the source bucket")
+    parser.add_argument("--profile", help="AWS profile holding the source credentials")
+    parser.add_argument("--bucket", default="raw-data", help="MinIO bucket to sync into")
+    parser.add_argument("--prefix", default="", help="Object prefix inside the bucket")
+    parser.add_argument("--job-id", help="Job id for the run ledger (defaults to the source)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=S3SyncSettings.workers,
+        help="Objects copied at once",
+    )
+    parser.add_argument(
+        "--part-workers",
+        type=int,
+        default=S3SyncSettings.part_workers,
+        help="Parts of large objects copied at once",
+    )
+    parser.add_argument(
+        "--list-workers",
+        type=int,
+        default=S3SyncSettings.list_workers,
+        help="Top-level prefixes listed and compared at once",
+    )
+    parser.add_argument(
+        "--multipart-threshold-mb",
+        type=int,
+        default=S3SyncSettings.multipart_threshold // MIB,
+        help="Objects larger than this are copied in parts",
+    )
+    parser.add_argument(
+        "--part-size-mb",
+        type=int,
+        default=S3SyncSettings.part_size // MIB,
+        help="Part size for multipart copies (at least 5)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Compare and report, without copying"
+    )
+    parser.add_argument(
+        "--workspace",
+        type=Path,
+        default=Path("data/tmp"),
+        help="Workspace directory for the job",
+    )
+    parser.add_argument("--metrics-file", help="Write Prometheus metrics here when done")
+    return parser.parse_args()
+
+
+def main() -> None:
+    load_dotenv()
+    args = parse_args()
+    bucket, _, prefix = args.source.removeprefix("s3://").partition("/")
+    job_id = args.job_id or f"s3::{bucket}/{prefix}".rstrip("/")
+    job = IngestionJob(
+        job_id=job_id,
+        source=S3DataSource(
+            name=job_id,
+            bucket=bucket,
+            prefix=prefix,
+            endpoint_url=args.endpoint_url,
+            region=args.region,
+            profile=args.profile,
+        ),
+        destination=Destination(bucket=args.bucket, prefix=args.prefix),
+        workspace=args.workspace,
+    )
+    settings = S3SyncSettings(
+        workers=args.workers,
+        part_workers=args.part_workers,
+        list_workers=args.list_workers,
+        multipart_threshold=args.multipart_threshold_mb * MIB,
+        part_size=max(args.part_size_mb, 5) * MIB,
+        dry_run=args.dry_run,
+    )
+    try:
+        copied = get_pipeline_for(job, settings=settings).run(job)
+        logger.info("Copied %d objects to %s", len(copied), args.bucket)
+    finally:
+        if args.metrics_file:
+            logger.info("Wrote metrics to %s", write_textfile(args.metrics_file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+from infrastructure.metrics.exporter import CONTENT_TYPE, render
+from services.job_queue import JobQueue, JobRecord, QueueFullError
+from services.orchestrator import IngestionOrchestrator
+
+PROGRESS_POLL_SECONDS = 0.5
+
+
+class JobSubmission(BaseModel):
+    job_name: str
+
+
+@lru_cache()
+def get_orchestrator() -> IngestionOrchestrator:
+    return IngestionOrchestrator(Path(os.getenv("INGESTION_CONFIG", "config/kaggle.yaml")))
+
+
+@lru_cache()
+def get_job_queue() -> JobQueue:
+    return JobQueue.from_env(get_orchestrator().run)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    yield
+    get_job_queue().shutdown()
+
+
+app = FastAPI(title="Data Ingestion Service", lifespan=lifespan)
+
+
+def _record_or_404(job_id: str) -> JobRecord:
+    record = get_job_queue().get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return record
+
+
+@app.get("/health")
+async def health() -> Dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    return Response(render(), media_type=CONTENT_TYPE)
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(submission: JobSubmission) -> Dict[str, Any]:
+    if submission.job_name not in get_orchestrator().job_names():
+        raise HTTPException(status_code=404, detail=f"Unknown job '{submission.job_name}'")
+    try:
+        record = get_job_queue().submit(submission.job_name)
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    return {"id": record.id, "job_name": record.job_name, "status": record.status}
+
+
+@app.get("/jobs")
+async def list_jobs(limit: int = 100) -> List[Dict[str, Any]]:
+    return [record.to_dict() for record in get_job_queue().list(limit)]
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str) -> Dict[str, Any]:
+    return _record_or_404(job_id).to_dict()
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str) -> Dict[str, Any]:
+    record = _record_or_404(job_id)
+    if not record.finished:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still {record.status}")
+    return {"id": record.id, "status": record.status, "result": record.result, "error": record.error}
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str) -> StreamingResponse:
+    """Server-sent events with the job's status and progress whenever they change."""
+    record = _record_or_404(job_id)
+
+    async def stream() -> AsyncIterator[str]:
+        version = -1
+        while True:
+            if record.progress.version != version or record.finished:
+                data = record.to_dict()
+                version = data["progress"]["version"]
+                yield f"event: progress\ndata: {json.dumps(data)}\n\n"
+                if record.finished:
+                    return
+            await asyncio.sleep(PROGRESS_POLL_SECONDS)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from core.utils.progress import ProgressTracker, progress_scope
+from infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+FINISHED = ("succeeded", "failed")
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a submission would exceed the queue's pending-job limit."""
+
+
+@dataclass
+class JobRecord:
+    id: str
+    job_name: str
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: Any = None
+    error: str | None = None
+    progress: ProgressTracker = field(default_factory=ProgressTracker)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "job_name": self.job_name,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "progress": self.progress.snapshot(),
+        }
+
+
+class JobQueue:
+    """Runs blocking jobs on a bounded thread pool and tracks them in memory.
+
+    At most ``max_pending`` jobs may be queued or running; ``submit`` raises
+    ``QueueFullError`` beyond that. Only the newest ``history`` finished jobs are kept.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[str], Any],
+        max_workers: int = 4,
+        max_pending: int = 100,
+        history: int = 1000,
+    ) -> None:
+        self.runner = runner
+        self.max_pending = max_pending
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api-job")
+        self._records: "OrderedDict[str, JobRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, runner: Callable[[str], Any]) -> "JobQueue":
+        return cls(
+            runner,
+            max_workers=int(os.getenv("API_WORKERS", "4")),
+            max_pending=int(os.getenv("API_MAX_PENDING", "100")),
+            history=int(os.getenv("API_JOB_HISTORY", "1000")),
+        )
+
+    def submit(self, job_name: str) -> JobRecord:
+        record = JobRecord(id=uuid.uuid4().hex, job_name=job_name)
+        with self._lock:
+            pending = sum(1 for item in self._records.values() if not item.finished)
+            if pending >= self.max_pending:
+                raise QueueFullError(f"{pending} jobs already pending")
+            self._records[record.id] = record
+            self._prune()
+        self._executor.submit(self._execute, record)
+        return record
+
+    def _prune(self) -> None:
+        finished = [key for key, item in self._records.items() if item.finished]
+        for key in finished[: max(len(finished) - self.history, 0)]:
+            del self._records[key]
+
+    def _execute(self, record: JobRecord) -> None:
+        record.status = "running"
+        record.started_at = time.time()
+        record.progress.set_stage("starting")
+        try:
+            with progress_scope(record.progress):
+                record.result = self.runner(record.job_name)
+            record.status = "succeeded"
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("API job %s (%s) failed: %s", record.id, record.job_name, exc)
+            record.error = str(exc)
+            record.status = "failed"
+        record.finished_at = time.time()
+        record.progress.set_stage(record.status)
+
+    def get(self, job_id: str) -> JobRecord | None:
+        with self._lock:
+            return self._records.get(job_id)
+
+    def list(self, limit: int = 100) -> List[JobRecord]:
+        with self._lock:
+            return list(self._records.values())[-limit:][::-1]
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
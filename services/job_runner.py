@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Sequence
 
-from services.orchestrator import IngestionOrchestrator
+from services.orchestrator import BatchSummary, IngestionOrchestrator
 
 
 class JobRunner:
@@ -12,3 +12,7 @@ class JobRunner:
     def run(self, job_name: str) -> Any:
         return self.orchestrator.run(job_name)
 
+    def run_many(
+        self, job_names: Sequence[str] | None = None, max_workers: int | None = None
+    ) -> BatchSummary:
+        return self.orchestrator.run_many(job_names, max_workers=max_workers)
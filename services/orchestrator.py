@@ -1,46 +1,196 @@
 from __future__ import annotations
 
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Sequence
 
 import yaml
 from dotenv import load_dotenv
 
-from core.models.datasource import KaggleDataSource
+from core.models.datasource import (
+    ApiAuth,
+    ApiDataSource,
+    ArxivDataSource,
+    DownloadDataSource,
+    KaggleDataSource,
+    Pagination,
+    ParquetConversion,
+    RemoteFile,
+    S3DataSource,
+    WebDataSource,
+)
 from core.models.ingestion_job import Destination, IngestionJob
+from infrastructure.logging.logger import get_logger
 from ingestion.registry import get_pipeline_for
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DATASOURCES_PATH = Path("config/datasources.yaml")
+
+
+@dataclass
+class JobResult:
+    job_name: str
+    source: str
+    status: str = "pending"
+    objects: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "succeeded"
+
+
+@dataclass
+class BatchSummary:
+    results: List[JobResult]
+    seconds: float
+
+    @property
+    def succeeded(self) -> List[JobResult]:
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> List[JobResult]:
+        return [result for result in self.results if not result.ok]
+
+    def summary(self) -> str:
+        busy = sum(result.seconds for result in self.results)
+        objects = sum(len(result.objects) for result in self.results)
+        return (
+            f"{len(self.succeeded)}/{len(self.results)} jobs succeeded, {objects} objects "
+            f"in {self.seconds:.1f}s wall ({busy:.1f}s summed across jobs)"
+        )
+
 
 class IngestionOrchestrator:
-    def __init__(self, config_path: Path = Path("config/kaggle.yaml")) -> None:
+    def __init__(
+        self,
+        config_path: Path = Path("config/kaggle.yaml"),
+        datasources_path: Path = DATASOURCES_PATH,
+    ) -> None:
         self.config_path = config_path
+        self.datasources_path = datasources_path
         self._config = self._load_config()
+        self._source_buckets = self._load_source_buckets()
 
     def _load_config(self) -> Dict[str, Any]:
         with self.config_path.open("r", encoding="utf-8") as fp:
             return yaml.safe_load(fp)
 
-    def build_job(self, job_name: str, workspace: Path | None = None) -> IngestionJob:
-        jobs_cfg = self._config.get("jobs", {})
-        job_cfg = jobs_cfg.get(job_name)
+    def _load_source_buckets(self) -> Dict[str, str]:
+        """Each source type's bucket from ``datasources.<name>.config.bucket``."""
+        if not self.datasources_path.exists():
+            return {}
+        with self.datasources_path.open("r", encoding="utf-8") as fp:
+            datasources = (yaml.safe_load(fp) or {}).get("datasources") or {}
+        buckets: Dict[str, str] = {}
+        for entry in datasources.values():
+            bucket = ((entry or {}).get("config") or {}).get("bucket")
+            if entry.get("type") and bucket:
+                buckets.setdefault(entry["type"], bucket)
+        return buckets
+
+    def job_names(self) -> List[str]:
+        return list(self._config.get("jobs") or {})
+
+    def _job_config(self, job_name: str) -> Dict[str, Any]:
+        job_cfg = (self._config.get("jobs") or {}).get(job_name)
         if not job_cfg:
             raise ValueError(f"Job '{job_name}' not defined in {self.config_path}")
+        return job_cfg
+
+    def source_type(self, job_name: str) -> str:
+        return self._job_config(job_name).get("source", "kaggle")
 
+    def priority(self, job_name: str) -> int:
+        return int(self._job_config(job_name).get("priority", 0))
+
+    def build_job(self, job_name: str, workspace: Path | None = None) -> IngestionJob:
+        job_cfg = self._job_config(job_name)
         dataset_cfg = job_cfg["dataset"]
         destination_cfg = job_cfg.get("destination", {})
+        source_type = self.source_type(job_name)
         default_bucket = self._config.get("default_bucket", "")
+        if source_type != "kaggle":
+            # default_bucket in the jobs file is the Kaggle default; other sources use theirs.
+            default_bucket = self._source_buckets.get(source_type) or default_bucket
         destination = Destination(
             bucket=destination_cfg.get("bucket", default_bucket),
             prefix=destination_cfg.get("prefix", ""),
         )
-        source = KaggleDataSource(
-            name=f"kaggle::{dataset_cfg['owner_slug']}/{dataset_cfg['dataset_slug']}",
-            owner_slug=dataset_cfg["owner_slug"],
-            dataset_slug=dataset_cfg["dataset_slug"],
-            file_names=dataset_cfg.get("file_names"),
-        )
+        if source_type == "kaggle":
+            if not dataset_cfg.get("owner_slug") or not dataset_cfg.get("dataset_slug"):
+                raise ValueError(f"Job '{job_name}' needs both owner_slug and dataset_slug")
+            source = KaggleDataSource(
+                name=f"kaggle::{dataset_cfg['owner_slug']}/{dataset_cfg['dataset_slug']}",
+                owner_slug=dataset_cfg["owner_slug"],
+                dataset_slug=dataset_cfg["dataset_slug"],
+                file_names=dataset_cfg.get("file_names"),
+                parquet=(
+                    ParquetConversion(**dataset_cfg["parquet"])
+                    if dataset_cfg.get("parquet")
+                    else None
+                ),
+            )
+        elif source_type == "arxiv":
+            dataset_slug = dataset_cfg.get("dataset_slug", job_name)
+            source = ArxivDataSource(
+                name=f"arxiv::{dataset_slug}",
+                category=dataset_cfg["category"],
+                dataset_slug=dataset_slug,
+            )
+        elif source_type == "web":
+            if not dataset_cfg.get("seeds"):
+                raise ValueError(f"Job '{job_name}' needs at least one seed URL")
+            source = WebDataSource(
+                name=f"web::{job_name}",
+                seeds=list(dataset_cfg["seeds"]),
+                allowed_domains=dataset_cfg.get("allowed_domains"),
+                max_pages=int(dataset_cfg.get("max_pages", 1000)),
+                max_depth=int(dataset_cfg.get("max_depth", 3)),
+            )
+        elif source_type == "api":
+            if not dataset_cfg.get("url"):
+                raise ValueError(f"Job '{job_name}' needs an API url")
+            source = ApiDataSource(
+                name=f"api::{job_name}",
+                url=dataset_cfg["url"],
+                records_path=dataset_cfg.get("records_path"),
+                params=dataset_cfg.get("params"),
+                headers=dataset_cfg.get("headers"),
+                pagination=Pagination(**(dataset_cfg.get("pagination") or {})),
+                auth=ApiAuth(**(dataset_cfg.get("auth") or {})),
+                output_format=dataset_cfg.get("output_format", "ndjson"),
+                target_object_mb=int(dataset_cfg.get("target_object_mb", 64)),
+            )
+        elif source_type == "s3":
+            if not dataset_cfg.get("bucket"):
+                raise ValueError(f"Job '{job_name}' needs a source bucket")
+            source = S3DataSource(
+                name=f"s3::{job_name}",
+                bucket=dataset_cfg["bucket"],
+                prefix=dataset_cfg.get("prefix", ""),
+                endpoint_url=dataset_cfg.get("endpoint_url"),
+                region=dataset_cfg.get("region"),
+                profile=dataset_cfg.get("profile"),
+            )
+        elif source_type == "python_download":
+            files = [
+                RemoteFile(url=entry) if isinstance(entry, str) else RemoteFile(**entry)
+                for entry in dataset_cfg.get("files") or []
+            ]
+            if not files:
+                raise ValueError(f"Job '{job_name}' needs at least one file to download")
+            source = DownloadDataSource(name=f"python_download::{job_name}", files=files)
+        else:
+            raise ValueError(f"Job '{job_name}' has unsupported source '{source_type}'")
         return IngestionJob(
             job_id=job_name,
             source=source,
@@ -53,3 +203,87 @@ class IngestionOrchestrator:
         pipeline = get_pipeline_for(job)
         return pipeline.run(job)
 
+    def _run_one(self, job_name: str) -> JobResult:
+        result = JobResult(job_name=job_name, source=self.source_type(job_name))
+        started = time.perf_counter()
+        try:
+            result.objects = list(self.run(job_name) or [])
+            result.status = "succeeded"
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Job %s failed: %s", job_name, exc)
+            result.status = "failed"
+            result.error = str(exc)
+        result.seconds = time.perf_counter() - started
+        logger.info("Job %s %s in %.1fs", job_name, result.status, result.seconds)
+        return result
+
+    def source_limits(self) -> Dict[str, int]:
+        concurrency = self._config.get("concurrency") or {}
+        limits = {name: int(limit) for name, limit in (concurrency.get("sources") or {}).items()}
+        for name, limit in limits.items():
+            if limit < 1:
+                raise ValueError(f"concurrency.sources.{name} must be at least 1, got {limit}")
+        return limits
+
+    def run_many(
+        self,
+        job_names: Sequence[str] | None = None,
+        max_workers: int | None = None,
+    ) -> BatchSummary:
+        """Run several jobs concurrently; one failing job does not stop the others.
+
+        Jobs start in descending ``priority`` order, limited to ``max_workers`` overall and to
+        ``concurrency.sources.<source>`` per source type. A job whose source is at its limit
+        is passed over for the next eligible one instead of holding a worker idle.
+        """
+        names = list(job_names) if job_names else self.job_names()
+        for name in names:
+            self._job_config(name)
+        concurrency = self._config.get("concurrency") or {}
+        max_workers = max_workers or int(concurrency.get("max_workers", DEFAULT_MAX_WORKERS))
+        limits = self.source_limits()
+        # sorted() is stable, so equal priorities keep their config order.
+        pending = sorted(names, key=self.priority, reverse=True)
+        active: Dict[str, int] = {}
+        running: Dict[Future, str] = {}
+        results: Dict[str, JobResult] = {}
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job") as pool:
+            while pending or running:
+                for name in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    source = self.source_type(name)
+                    if active.get(source, 0) >= limits.get(source, max_workers):
+                        continue
+                    pending.remove(name)
+                    active[source] = active.get(source, 0) + 1
+                    running[pool.submit(self._run_one, name)] = name
+                    logger.info("Started job %s (%s)", name, source)
+                if not running:
+                    # Nothing can start and nothing will finish to make room: give up on the
+                    # rest rather than spin.
+                    for name in pending:
+                        results[name] = JobResult(
+                            job_name=name,
+                            source=self.source_type(name),
+                            status="failed",
+                            error="could not be scheduled within the concurrency limits",
+                        )
+                    pending.clear()
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    result = future.result()
+                    active[result.source] -= 1
+                    results[name] = result
+
+        summary = BatchSummary(
+            results=[results[name] for name in names], seconds=time.perf_counter() - started
+        )
+        logger.info("Batch finished: %s", summary.summary())
+        for result in summary.failed:
+            logger.error("Job %s failed: %s", result.job_name, result.error)
+        return summary